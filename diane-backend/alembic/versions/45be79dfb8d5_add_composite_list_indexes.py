@@ -0,0 +1,115 @@
+"""Add composite and partial indexes for list queries
+
+Revision ID: 45be79dfb8d5
+Revises: 3aab0895a699
+Create Date: 2026-10-18 09:12:40.512837
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "45be79dfb8d5"
+down_revision: Union[str, Sequence[str], None] = "3aab0895a699"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_tasks_user_id_created_at", "tasks", ["user_id", "created_at", "id"], None),
+    ("ix_tasks_user_id_due_date", "tasks", ["user_id", "due_date", "id"], None),
+    (
+        "ix_tasks_incomplete_user_id_created_at",
+        "tasks",
+        ["user_id", "created_at", "id"],
+        "completed = false",
+    ),
+    (
+        "ix_tasks_incomplete_user_id_due_date",
+        "tasks",
+        ["user_id", "due_date", "id"],
+        "completed = false",
+    ),
+    ("ix_shopping_items_user_id", "shopping_items", ["user_id", "id"], None),
+    (
+        "ix_shopping_items_incomplete_user_id",
+        "shopping_items",
+        ["user_id", "id"],
+        "completed = false",
+    ),
+    (
+        "ix_calendar_events_user_id_event_date",
+        "calendar_events",
+        ["user_id", "event_date", "event_time", "id"],
+        None,
+    ),
+]
+
+# Single-column user_id indexes from migrations/001.sql; each is a prefix of
+# one of the composite indexes above and only adds write cost
+REDUNDANT_INDEXES = [
+    ("idx_tasks_user_id", "tasks"),
+    ("idx_shopping_items_user_id", "shopping_items"),
+    ("idx_calendar_events_user_id", "calendar_events"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Build concurrently so existing tables stay writable; CONCURRENTLY cannot
+    # run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        # Described in migrations/002.sql but never created by 3aab0895a699;
+        # subtask loading and summaries filter on parent_task_id
+        op.create_index(
+            "idx_subtasks_parent_task_id",
+            "subtasks",
+            ["parent_task_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        for name, table in REDUNDANT_INDEXES:
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table in REDUNDANT_INDEXES:
+            op.create_index(
+                name,
+                table,
+                ["user_id"],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+        op.drop_index(
+            "idx_subtasks_parent_task_id",
+            table_name="subtasks",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,90 @@
+"""Move raw_input into a brain_dumps table
+
+Revision ID: 8c41d2e7a9f3
+Revises: 45be79dfb8d5
+Create Date: 2026-10-18 11:03:27.184602
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c41d2e7a9f3"
+down_revision: Union[str, Sequence[str], None] = "45be79dfb8d5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ITEM_TABLES = ["tasks", "shopping_items", "calendar_events"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "brain_dumps",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("raw_input", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_brain_dumps_user_id"), "brain_dumps", ["user_id"], unique=False
+    )
+
+    for table in ITEM_TABLES:
+        op.add_column(table, sa.Column("brain_dump_id", sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            f"{table}_brain_dump_id_fkey",
+            table,
+            "brain_dumps",
+            ["brain_dump_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+
+    # Items saved from the same dump share user_id, raw_input and the
+    # created_at of their transaction; UNION collapses each group into one row
+    items = " UNION ".join(
+        f"SELECT user_id, raw_input, created_at FROM {table} "
+        "WHERE raw_input IS NOT NULL"
+        for table in ITEM_TABLES
+    )
+    op.execute(
+        "INSERT INTO brain_dumps (user_id, raw_input, created_at) "
+        f"SELECT user_id, raw_input, created_at FROM ({items}) AS items "
+        "ORDER BY created_at"
+    )
+    for table in ITEM_TABLES:
+        op.execute(
+            f"UPDATE {table} SET brain_dump_id = brain_dumps.id FROM brain_dumps "
+            f"WHERE brain_dumps.user_id = {table}.user_id "
+            f"AND brain_dumps.raw_input = {table}.raw_input "
+            f"AND brain_dumps.created_at = {table}.created_at"
+        )
+        op.drop_column(table, "raw_input")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ITEM_TABLES:
+        op.add_column(table, sa.Column("raw_input", sa.Text(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET raw_input = brain_dumps.raw_input FROM brain_dumps "
+            f"WHERE brain_dumps.id = {table}.brain_dump_id"
+        )
+        op.drop_constraint(f"{table}_brain_dump_id_fkey", table, type_="foreignkey")
+        op.drop_column(table, "brain_dump_id")
+
+    op.drop_index(op.f("ix_brain_dumps_user_id"), table_name="brain_dumps")
+    op.drop_table("brain_dumps")
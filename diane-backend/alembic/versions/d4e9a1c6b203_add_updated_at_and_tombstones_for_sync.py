@@ -0,0 +1,77 @@
+"""Add updated_at columns and tombstones for delta sync
+
+Revision ID: d4e9a1c6b203
+Revises: 8c41d2e7a9f3
+Create Date: 2026-10-18 14:26:51.073419
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e9a1c6b203"
+down_revision: Union[str, Sequence[str], None] = "8c41d2e7a9f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SYNCED_TABLES = ["tasks", "subtasks", "shopping_items", "calendar_events"]
+
+# Tables whose rows belong to a user directly and are synced per user
+USER_TABLES = ["tasks", "shopping_items", "calendar_events"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.TIMESTAMP(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=False,
+            ),
+        )
+        # Existing rows have not changed since they were created
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+    for table in USER_TABLES:
+        op.create_index(
+            f"ix_{table}_user_id_updated_at", table, ["user_id", "updated_at"]
+        )
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entity_type", sa.String(length=32), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "deleted_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_user_id_deleted_at", "tombstones", ["user_id", "deleted_at"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tombstones_user_id_deleted_at", table_name="tombstones")
+    op.drop_table("tombstones")
+
+    for table in USER_TABLES:
+        op.drop_index(f"ix_{table}_user_id_updated_at", table_name=table)
+
+    for table in SYNCED_TABLES:
+        op.drop_column(table, "updated_at")
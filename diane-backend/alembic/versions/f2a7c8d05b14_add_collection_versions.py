@@ -0,0 +1,37 @@
+"""Add collection_versions for list ETags
+
+Revision ID: f2a7c8d05b14
+Revises: d4e9a1c6b203
+Create Date: 2026-10-18 16:02:13.548207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a7c8d05b14"
+down_revision: Union[str, Sequence[str], None] = "d4e9a1c6b203"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # No backfill: a missing counter reads as version 0 until the first write
+    op.create_table(
+        "collection_versions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("collection", sa.String(length=32), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id", "collection"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("collection_versions")
@@ -0,0 +1,304 @@
+"""
+Brain dump database access functions
+"""
+
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db_models import BrainDump, Task, SubTask, ShoppingItem, CalendarEvent
+from app.access.collection_versions import (
+    CALENDAR_EVENTS,
+    SHOPPING_ITEMS,
+    TASKS,
+    bump_collections,
+)
+from app.access.returning import insert_returning
+from app.models import (
+    BrainDumpResponse,
+    BrainDumpSourceResponse,
+    CalendarEventResponse,
+    ProcessedBrainDump,
+    ProcessedCalendarEvent,
+    ProcessedShoppingItem,
+    ProcessedTask,
+    ShoppingItemResponse,
+    SubTask as SubTaskData,
+    SubTaskResponse,
+    TaskResponse,
+)
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    """Convert a YYYY-MM-DD string from the AI into a date"""
+    return datetime.strptime(value, "%Y-%m-%d").date() if value else None
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    """Convert an HH:MM or HH:MM:SS string from the AI into a time"""
+    if not value:
+        return None
+    time_format = "%H:%M:%S" if value.count(":") == 2 else "%H:%M"
+    return datetime.strptime(value, time_format).time()
+
+
+async def save_processed_brain_dump(
+    session: AsyncSession,
+    user_id: int,
+    raw_input: str,
+    processed: ProcessedBrainDump,
+) -> BrainDumpResponse:
+    """Persist a brain dump's text and everything extracted from it
+
+    Uses one INSERT per table (brain dumps, tasks, subtasks, shopping items,
+    calendar events) no matter how many items the dump contains. The text is
+    stored once and the items reference it by brain_dump_id.
+    """
+    brain_dump = await create_brain_dump(
+        session=session, user_id=user_id, raw_input=raw_input
+    )
+    saved = await save_processed_items(
+        session=session,
+        user_id=user_id,
+        brain_dump_id=brain_dump.id,
+        processed=processed,
+    )
+    return saved.model_copy(
+        update={"brain_dump": brain_dump, "degraded": processed.degraded}
+    )
+
+
+async def create_brain_dump(
+    session: AsyncSession, user_id: int, raw_input: str
+) -> BrainDumpSourceResponse:
+    """Store the text of a brain dump"""
+    (brain_dump_row,) = await insert_returning(
+        session, BrainDump, [{"user_id": user_id, "raw_input": raw_input}]
+    )
+    return BrainDumpSourceResponse.model_validate(brain_dump_row)
+
+
+async def save_processed_items(
+    session: AsyncSession,
+    user_id: int,
+    brain_dump_id: int,
+    processed: ProcessedBrainDump,
+) -> BrainDumpResponse:
+    """Persist items extracted from an already stored brain dump
+
+    Uses one INSERT per table that has items to save.
+    """
+    task_rows = await insert_returning(
+        session,
+        Task,
+        [_task_values(task, user_id, brain_dump_id) for task in processed.tasks],
+    )
+
+    # Subtasks of every decomposed task go in one statement, keyed to the
+    # parent ids returned above
+    subtask_rows = await insert_returning(
+        session,
+        SubTask,
+        [
+            _subtask_values(subtask, task_row.id)
+            for task, task_row in zip(processed.tasks, task_rows)
+            if task.should_decompose
+            for subtask in task.subtasks
+        ],
+    )
+
+    subtasks_by_task: Dict[int, List[SubTaskResponse]] = {}
+    for subtask_row in subtask_rows:
+        subtasks_by_task.setdefault(subtask_row.parent_task_id, []).append(
+            SubTaskResponse.model_validate(subtask_row)
+        )
+
+    shopping_item_rows = await insert_returning(
+        session,
+        ShoppingItem,
+        [
+            _shopping_item_values(item, user_id, brain_dump_id)
+            for item in processed.shopping_items
+        ],
+    )
+
+    calendar_event_rows = await insert_returning(
+        session,
+        CalendarEvent,
+        [
+            _calendar_event_values(event, user_id, brain_dump_id)
+            for event in processed.calendar_events
+        ],
+    )
+
+    await _bump_item_versions(
+        session, task_rows, shopping_item_rows, calendar_event_rows
+    )
+
+    return BrainDumpResponse(
+        tasks=[
+            TaskResponse.model_validate(task_row).model_copy(
+                update={"subtasks": subtasks_by_task.get(task_row.id, [])}
+            )
+            for task_row in task_rows
+        ],
+        shopping_items=[
+            ShoppingItemResponse.model_validate(row) for row in shopping_item_rows
+        ],
+        calendar_events=[
+            CalendarEventResponse.model_validate(row) for row in calendar_event_rows
+        ],
+    )
+
+
+async def save_processed_brain_dumps(
+    session: AsyncSession,
+    dumps: Sequence[Tuple[int, str, ProcessedBrainDump]],
+) -> List[int]:
+    """Persist many (user_id, raw_input, processed) brain dumps at once
+
+    Used by bulk imports: still one INSERT per table, now for the whole
+    batch, and no response objects are built. Returns the new brain dump ids
+    in the order given.
+    """
+    brain_dump_rows = await insert_returning(
+        session,
+        BrainDump,
+        [
+            {"user_id": user_id, "raw_input": raw_input}
+            for user_id, raw_input, _ in dumps
+        ],
+    )
+
+    owners = [
+        (user_id, brain_dump_row.id, processed)
+        for (user_id, _, processed), brain_dump_row in zip(dumps, brain_dump_rows)
+    ]
+
+    tasks = [
+        (user_id, brain_dump_id, task)
+        for user_id, brain_dump_id, processed in owners
+        for task in processed.tasks
+    ]
+    task_rows = await insert_returning(
+        session,
+        Task,
+        [
+            _task_values(task, user_id, brain_dump_id)
+            for user_id, brain_dump_id, task in tasks
+        ],
+    )
+
+    await insert_returning(
+        session,
+        SubTask,
+        [
+            _subtask_values(subtask, task_row.id)
+            for (_, _, task), task_row in zip(tasks, task_rows)
+            if task.should_decompose
+            for subtask in task.subtasks
+        ],
+    )
+
+    shopping_item_rows = await insert_returning(
+        session,
+        ShoppingItem,
+        [
+            _shopping_item_values(item, user_id, brain_dump_id)
+            for user_id, brain_dump_id, processed in owners
+            for item in processed.shopping_items
+        ],
+    )
+
+    calendar_event_rows = await insert_returning(
+        session,
+        CalendarEvent,
+        [
+            _calendar_event_values(event, user_id, brain_dump_id)
+            for user_id, brain_dump_id, processed in owners
+            for event in processed.calendar_events
+        ],
+    )
+
+    await _bump_item_versions(
+        session, task_rows, shopping_item_rows, calendar_event_rows
+    )
+
+    return [row.id for row in brain_dump_rows]
+
+
+async def _bump_item_versions(
+    session: AsyncSession,
+    task_rows: Sequence[Any],
+    shopping_item_rows: Sequence[Any],
+    calendar_event_rows: Sequence[Any],
+) -> None:
+    """Bump the lists of every user that got new rows, in one statement
+    (subtasks only come with new tasks, so the task rows cover them)"""
+    await bump_collections(
+        session,
+        [
+            (row.user_id, collection)
+            for collection, rows in (
+                (TASKS, task_rows),
+                (SHOPPING_ITEMS, shopping_item_rows),
+                (CALENDAR_EVENTS, calendar_event_rows),
+            )
+            for row in rows
+        ],
+    )
+
+
+def _task_values(
+    task: ProcessedTask, user_id: int, brain_dump_id: Optional[int]
+) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "description": task.description,
+        "due_date": _parse_date(task.due_date),
+        "estimated_time_minutes": task.estimated_time_minutes,
+        "brain_dump_id": brain_dump_id,
+    }
+
+
+def _subtask_values(subtask: SubTaskData, parent_task_id: int) -> Dict[str, Any]:
+    return {
+        "parent_task_id": parent_task_id,
+        "description": subtask.description,
+        "order": subtask.order,
+        "estimated_time_minutes": subtask.estimated_time_minutes,
+        "due_date": _parse_date(subtask.due_date),
+    }
+
+
+def _shopping_item_values(
+    item: ProcessedShoppingItem, user_id: int, brain_dump_id: Optional[int]
+) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "description": item.description,
+        "brain_dump_id": brain_dump_id,
+    }
+
+
+def _calendar_event_values(
+    event: ProcessedCalendarEvent, user_id: int, brain_dump_id: Optional[int]
+) -> Dict[str, Any]:
+    return {
+        "user_id": user_id,
+        "description": event.description,
+        "event_date": _parse_date(event.event_date),
+        "event_time": _parse_time(event.event_time),
+        "brain_dump_id": brain_dump_id,
+    }
+
+
+async def get_brain_dump_by_id(
+    session: AsyncSession, brain_dump_id: int
+) -> Optional[BrainDumpSourceResponse]:
+    """Get the stored text of a single brain dump"""
+    brain_dump = await session.get(BrainDump, brain_dump_id)
+
+    if not brain_dump:
+        return None
+
+    return BrainDumpSourceResponse.model_validate(brain_dump)
@@ -2,21 +2,40 @@
 Calendar event database access functions
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, Dict, Any, Sequence, Tuple
 from datetime import date, time
-from sqlalchemy.orm import Session
-from sqlalchemy import asc
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db_models import CalendarEvent
-from app.models import CalendarEventResponse
-
-
-def create_calendar_event(
-    session: Session,
+from app.access.pagination import SortKey, paginate, split_page
+from app.access.returning import (
+    delete_returning,
+    update_many_returning,
+    update_returning,
+)
+from app.access.collection_versions import CALENDAR_EVENTS, bump_versions
+from app.access.sync_access import record_deletions
+from app.models import CalendarEventResponse, Page
+
+# Events are listed chronologically; events without a time come last that day
+CALENDAR_EVENT_SORT = "event_date"
+CALENDAR_EVENT_SORT_KEYS = [
+    SortKey(CalendarEvent.event_date),
+    SortKey(CalendarEvent.event_time, nullable=True),
+    SortKey(CalendarEvent.id),
+]
+
+# Columns the update endpoint may change
+CALENDAR_EVENT_UPDATE_COLUMNS = frozenset(["description", "event_date", "event_time"])
+
+
+async def create_calendar_event(
+    session: AsyncSession,
     user_id: int,
     description: str,
     event_date: date,
-    raw_input: str,
     event_time: Optional[time] = None,
+    brain_dump_id: Optional[int] = None,
 ) -> CalendarEventResponse:
     """Create a new calendar event"""
     calendar_event = CalendarEvent(
@@ -24,63 +43,88 @@ def create_calendar_event(
         description=description,
         event_date=event_date,
         event_time=event_time,
-        raw_input=raw_input,
+        brain_dump_id=brain_dump_id,
     )
     session.add(calendar_event)
-    session.flush()
+    await session.flush()
+    await bump_versions(session, CALENDAR_EVENTS, [user_id])
 
     return CalendarEventResponse.model_validate(calendar_event)
 
 
-def get_calendar_events_by_user(
-    session: Session,
+async def get_calendar_events_by_user(
+    session: AsyncSession,
     user_id: int,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-) -> List[CalendarEventResponse]:
-    """Get all calendar events for a user with optional date range filtering"""
-    query = session.query(CalendarEvent).filter(CalendarEvent.user_id == user_id)
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Page[CalendarEventResponse]:
+    """Get a page of calendar events for a user with optional date range filtering"""
+    query = select(CalendarEvent).where(CalendarEvent.user_id == user_id)
 
     # Apply date range filter if provided
     if start_date:
-        query = query.filter(CalendarEvent.event_date >= start_date)
+        query = query.where(CalendarEvent.event_date >= start_date)
     if end_date:
-        query = query.filter(CalendarEvent.event_date <= end_date)
-
-    # Sort by event_date and event_time
-    query = query.order_by(asc(CalendarEvent.event_date), asc(CalendarEvent.event_time))
-
-    events = query.all()
+        query = query.where(CalendarEvent.event_date <= end_date)
+
+    # Sort by event_date and event_time, resuming after the cursor if given
+    query = paginate(
+        query,
+        CALENDAR_EVENT_SORT,
+        CALENDAR_EVENT_SORT_KEYS,
+        limit=limit,
+        cursor=cursor,
+    )
+    events, next_cursor = split_page(
+        await session.scalars(query),
+        CALENDAR_EVENT_SORT,
+        CALENDAR_EVENT_SORT_KEYS,
+        limit=limit,
+    )
 
-    return [CalendarEventResponse.model_validate(event) for event in events]
+    return Page(
+        items=[CalendarEventResponse.model_validate(event) for event in events],
+        next_cursor=next_cursor,
+    )
 
 
-def update_calendar_event(
-    session: Session, event_id: int, update_data: Dict[str, Any]
+async def update_calendar_event(
+    session: AsyncSession, event_id: int, update_data: Dict[str, Any]
 ) -> Optional[CalendarEventResponse]:
-    """Update a calendar event with provided fields"""
-    event = session.query(CalendarEvent).filter(CalendarEvent.id == event_id).first()
+    """Update a calendar event with provided fields in one UPDATE ... RETURNING"""
+    row = await update_returning(
+        session, CalendarEvent, event_id, update_data, CALENDAR_EVENT_UPDATE_COLUMNS
+    )
 
-    if not event:
+    if not row:
         return None
 
-    # Update only the fields that were provided
-    for field, value in update_data.items():
-        if hasattr(event, field):
-            setattr(event, field, value)
-
-    session.flush()
-
-    return CalendarEventResponse.model_validate(event)
+    await bump_versions(session, CALENDAR_EVENTS, [row.user_id])
 
+    return CalendarEventResponse.model_validate(row)
 
-def delete_calendar_event(session: Session, event_id: int) -> bool:
-    """Delete a calendar event"""
-    event = session.query(CalendarEvent).filter(CalendarEvent.id == event_id).first()
 
-    if not event:
-        return False
-
-    session.delete(event)
-    session.flush()
-    return True
+async def update_calendar_events(
+    session: AsyncSession, updates: Sequence[Tuple[int, Dict[str, Any]]]
+) -> Dict[int, CalendarEventResponse]:
+    """Update many calendar events, one UPDATE per distinct set of changes"""
+    rows = await update_many_returning(
+        session, CalendarEvent, updates, CALENDAR_EVENT_UPDATE_COLUMNS
+    )
+    await bump_versions(
+        session, CALENDAR_EVENTS, [row.user_id for row in rows.values()]
+    )
+    return {
+        event_id: CalendarEventResponse.model_validate(row)
+        for event_id, row in rows.items()
+    }
+
+
+async def delete_calendar_event(session: AsyncSession, event_id: int) -> bool:
+    """Delete a calendar event and leave a tombstone for syncing clients"""
+    rows = await delete_returning(session, CalendarEvent, CalendarEvent.id == event_id)
+    await record_deletions(session, CalendarEvent, rows)
+    await bump_versions(session, CALENDAR_EVENTS, [row.user_id for row in rows])
+    return bool(rows)
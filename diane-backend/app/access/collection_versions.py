@@ -0,0 +1,95 @@
+"""
+Per-user version counters for the list endpoints
+
+Write functions in the access layer bump the owning user's counter for the
+list they change, in the same transaction as the change. List endpoints read
+the counter with one primary-key lookup and answer a matching If-None-Match
+with 304 without querying the rows.
+"""
+
+from typing import Iterable, Tuple
+from sqlalchemy import literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db_models import CollectionVersion, Task
+
+# Collections, named after their tables. Subtask writes bump TASKS because
+# the task list embeds subtasks.
+TASKS = "tasks"
+SHOPPING_ITEMS = "shopping_items"
+CALENDAR_EVENTS = "calendar_events"
+
+
+def _insert(session: AsyncSession):
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(CollectionVersion)
+
+
+def _increment_on_conflict(statement):
+    """Add one to counters that already exist instead of inserting them"""
+    return statement.on_conflict_do_update(
+        index_elements=[CollectionVersion.user_id, CollectionVersion.collection],
+        set_={"version": CollectionVersion.version + 1},
+    )
+
+
+async def bump_versions(
+    session: AsyncSession, collection: str, user_ids: Iterable[int]
+) -> None:
+    """Bump ``collection`` for each of ``user_ids`` in one upsert"""
+    await bump_collections(session, [(user_id, collection) for user_id in user_ids])
+
+
+async def bump_collections(
+    session: AsyncSession, changes: Iterable[Tuple[int, str]]
+) -> None:
+    """Bump every (user_id, collection) in ``changes`` in one upsert"""
+    # Sorted so concurrent transactions lock the counters in the same order
+    changes = sorted(set(changes))
+    if not changes:
+        return
+
+    await session.execute(
+        _increment_on_conflict(
+            _insert(session).values(
+                [
+                    {"user_id": user_id, "collection": collection, "version": 1}
+                    for user_id, collection in changes
+                ]
+            )
+        )
+    )
+
+
+async def bump_task_versions(session: AsyncSession, task_ids: Iterable[int]) -> None:
+    """Bump the task lists of the users owning ``task_ids``
+
+    For subtask writes, which know the parent task but not its user; the
+    owners are looked up inside the same upsert.
+    """
+    task_ids = set(task_ids)
+    if not task_ids:
+        return
+
+    owners = (
+        select(Task.user_id, literal(TASKS), literal(1))
+        .where(Task.id.in_(task_ids))
+        .distinct()
+        .order_by(Task.user_id)
+    )
+    await session.execute(
+        _increment_on_conflict(
+            _insert(session).from_select(["user_id", "collection", "version"], owners)
+        )
+    )
+
+
+async def get_version(session: AsyncSession, user_id: int, collection: str) -> int:
+    """Current version of a user's list; 0 if it was never written"""
+    version = await session.scalar(
+        select(CollectionVersion.version).where(
+            CollectionVersion.user_id == user_id,
+            CollectionVersion.collection == collection,
+        )
+    )
+    return version or 0
@@ -0,0 +1,138 @@
+"""
+Keyset (cursor) pagination helpers shared by the list access functions
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any, List, Optional, Sequence, Tuple
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not fit the query"""
+
+
+@dataclass(frozen=True)
+class SortKey:
+    """One column of a keyset sort order
+
+    The last key of every sort order must be unique (the primary key) so that
+    each row has exactly one position. NULLs always sort last.
+    """
+
+    column: InstrumentedAttribute
+    descending: bool = False
+    nullable: bool = False
+
+    def order_by(self):
+        clause = self.column.desc() if self.descending else self.column.asc()
+        return clause.nulls_last() if self.nullable else clause
+
+    def is_after(self, value: Any):
+        """Rows whose value for this key sorts strictly after ``value``"""
+        if value is None:
+            # NULLs sort last, so nothing in this column comes after a NULL
+            return None
+        comparison = self.column < value if self.descending else self.column > value
+        return or_(comparison, self.column.is_(None)) if self.nullable else comparison
+
+    def is_equal(self, value: Any):
+        return self.column.is_(None) if value is None else self.column == value
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+def _deserialize(sort_key: SortKey, value: Any) -> Any:
+    if value is None:
+        return None
+    python_type = sort_key.column.type.python_type
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_name: str, sort_keys: Sequence[SortKey], row: Any) -> str:
+    """Encode the position of ``row`` in the given sort order as an opaque cursor"""
+    values = [_serialize(getattr(row, key.column.key)) for key in sort_keys]
+    payload = json.dumps({"s": sort_name, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, sort_name: str, sort_keys: Sequence[SortKey]
+) -> List[Any]:
+    """Decode a cursor produced by encode_cursor for the same sort order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = payload["v"]
+        if payload["s"] != sort_name or len(values) != len(sort_keys):
+            raise InvalidCursorError("Cursor does not match the requested sort order")
+        return [_deserialize(key, value) for key, value in zip(sort_keys, values)]
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError("Malformed pagination cursor") from e
+
+
+def _after_position(sort_keys: Sequence[SortKey], values: Sequence[Any]):
+    """Build the predicate selecting every row that sorts after ``values``"""
+    branches = []
+    for index, key in enumerate(sort_keys):
+        after = key.is_after(values[index])
+        if after is None:
+            continue
+        equal_prefix = [
+            prior.is_equal(value)
+            for prior, value in zip(sort_keys[:index], values[:index])
+        ]
+        branches.append(and_(*equal_prefix, after))
+    return or_(*branches)
+
+
+def paginate(
+    query: Select,
+    sort_name: str,
+    sort_keys: Sequence[SortKey],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    """Apply the sort order, cursor position and page size to ``query``
+
+    One extra row is fetched beyond ``limit`` so split_page can tell whether
+    there is a next page without a separate COUNT.
+    """
+    if cursor:
+        query = query.where(
+            _after_position(sort_keys, decode_cursor(cursor, sort_name, sort_keys))
+        )
+
+    query = query.order_by(*(key.order_by() for key in sort_keys))
+
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    return query
+
+
+def split_page(
+    rows: Sequence[Any],
+    sort_name: str,
+    sort_keys: Sequence[SortKey],
+    limit: Optional[int] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page"""
+    rows = list(rows)
+    if limit is None or len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(sort_name, sort_keys, rows[-1])
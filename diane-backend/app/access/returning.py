@@ -0,0 +1,115 @@
+"""
+Single-statement writes that hand back the affected rows
+
+Returned rows carry every column, so responses can be built from them with
+``model_validate`` without loading ORM objects or reading the rows again.
+"""
+
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import ColumnElement, Row, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def insert_returning(
+    session: AsyncSession, model: Any, rows: List[Dict[str, Any]]
+) -> List[Any]:
+    """Insert all rows with one multi-row INSERT ... RETURNING
+
+    Returned rows are in the same order as ``rows``.
+    """
+    if not rows:
+        return []
+
+    table = model.__table__
+
+    if session.get_bind().dialect.name == "sqlite":
+        # SQLite does not promise RETURNING order, so SQLAlchemy would fall
+        # back to one INSERT per row to keep it; ids within one statement are
+        # assigned in VALUES order, so sort by id instead
+        result = await session.execute(insert(table).returning(*table.c), rows)
+        return sorted(result, key=lambda row: row.id)
+
+    result = await session.execute(
+        insert(table).returning(*table.c, sort_by_parameter_order=True), rows
+    )
+    return list(result)
+
+
+async def update_returning(
+    session: AsyncSession,
+    model: Any,
+    row_id: int,
+    update_data: Dict[str, Any],
+    columns: Collection[str],
+) -> Optional[Row]:
+    """Apply ``update_data`` to one row with UPDATE ... WHERE id = ... RETURNING
+
+    Only keys in ``columns`` are written; anything else is ignored. Returns
+    the updated row, or None if there is no row with that id.
+    """
+    table = model.__table__
+    values = _allowed_values(update_data, columns)
+
+    if not values:
+        # Nothing to write, but the caller still needs the current row
+        statement = select(*table.c).where(table.c.id == row_id)
+    else:
+        statement = (
+            update(table).where(table.c.id == row_id).values(values).returning(*table.c)
+        )
+
+    result = await session.execute(statement)
+    return result.first()
+
+
+async def update_many_returning(
+    session: AsyncSession,
+    model: Any,
+    updates: Sequence[Tuple[int, Dict[str, Any]]],
+    columns: Collection[str],
+) -> Dict[int, Row]:
+    """Apply (id, update_data) pairs with as few UPDATE ... RETURNING as possible
+
+    Rows getting identical changes share one ``UPDATE ... WHERE id IN (...)``,
+    so checking off many items at once is a single statement. Only keys in
+    ``columns`` are written. Returns the updated rows by id; ids without a
+    row are missing from the result.
+    """
+    table = model.__table__
+
+    ids_by_values: Dict[Tuple[Tuple[str, Any], ...], List[int]] = {}
+    for row_id, update_data in updates:
+        values = tuple(sorted(_allowed_values(update_data, columns).items()))
+        ids_by_values.setdefault(values, []).append(row_id)
+
+    rows: Dict[int, Row] = {}
+    for values, ids in ids_by_values.items():
+        if not values:
+            statement = select(*table.c).where(table.c.id.in_(ids))
+        else:
+            statement = (
+                update(table)
+                .where(table.c.id.in_(ids))
+                .values(dict(values))
+                .returning(*table.c)
+            )
+        for row in await session.execute(statement):
+            rows[row.id] = row
+    return rows
+
+
+async def delete_returning(
+    session: AsyncSession, model: Any, *conditions: ColumnElement[bool]
+) -> List[Row]:
+    """DELETE every row matching ``conditions`` in one statement
+
+    Child rows go through the foreign keys' ON DELETE actions rather than the
+    ORM, so nothing is loaded first. Returns the deleted rows.
+    """
+    table = model.__table__
+    result = await session.execute(delete(table).where(*conditions).returning(*table.c))
+    return list(result)
+
+
+def _allowed_values(update_data: Dict[str, Any], columns: Collection[str]):
+    return {field: value for field, value in update_data.items() if field in columns}
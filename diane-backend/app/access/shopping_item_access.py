@@ -2,66 +2,129 @@
 Shopping item database access functions
 """
 
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+from sqlalchemy import false, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db_models import ShoppingItem
-from app.models import ShoppingItemResponse
-
-
-def create_shopping_item(
-    session: Session, user_id: int, description: str, raw_input: str
+from app.access.pagination import SortKey, paginate, split_page
+from app.access.returning import (
+    delete_returning,
+    update_many_returning,
+    update_returning,
+)
+from app.access.collection_versions import SHOPPING_ITEMS, bump_versions
+from app.access.sync_access import record_deletions
+from app.models import Page, ShoppingItemResponse
+
+# Shopping items are listed in insertion order
+SHOPPING_ITEM_SORT = "id"
+SHOPPING_ITEM_SORT_KEYS = [SortKey(ShoppingItem.id)]
+
+# Columns the update endpoint may change
+SHOPPING_ITEM_UPDATE_COLUMNS = frozenset(["description", "completed"])
+
+
+async def create_shopping_item(
+    session: AsyncSession,
+    user_id: int,
+    description: str,
+    brain_dump_id: Optional[int] = None,
 ) -> ShoppingItemResponse:
     """Create a new shopping item"""
     shopping_item = ShoppingItem(
-        user_id=user_id, description=description, raw_input=raw_input
+        user_id=user_id, description=description, brain_dump_id=brain_dump_id
     )
     session.add(shopping_item)
-    session.flush()
+    await session.flush()
+    await bump_versions(session, SHOPPING_ITEMS, [user_id])
 
     return ShoppingItemResponse.model_validate(shopping_item)
 
 
-def get_shopping_items_by_user(
-    session: Session, user_id: int, completed: Optional[bool] = None
-) -> List[ShoppingItemResponse]:
-    """Get all shopping items for a user with optional filtering"""
-    query = session.query(ShoppingItem).filter(ShoppingItem.user_id == user_id)
+async def get_shopping_items_by_user(
+    session: AsyncSession,
+    user_id: int,
+    completed: Optional[bool] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Page[ShoppingItemResponse]:
+    """Get a page of shopping items for a user with optional filtering"""
+    query = select(ShoppingItem).where(ShoppingItem.user_id == user_id)
 
     # Apply completed filter if provided
     if completed is not None:
-        query = query.filter(ShoppingItem.completed == completed)
+        # Inline the literal so the partial index on incomplete rows applies
+        query = query.where(
+            ShoppingItem.completed == (true() if completed else false())
+        )
 
-    items = query.all()
+    query = paginate(
+        query, SHOPPING_ITEM_SORT, SHOPPING_ITEM_SORT_KEYS, limit=limit, cursor=cursor
+    )
+    items, next_cursor = split_page(
+        await session.scalars(query),
+        SHOPPING_ITEM_SORT,
+        SHOPPING_ITEM_SORT_KEYS,
+        limit=limit,
+    )
 
-    return [ShoppingItemResponse.model_validate(item) for item in items]
+    return Page(
+        items=[ShoppingItemResponse.model_validate(item) for item in items],
+        next_cursor=next_cursor,
+    )
 
 
-def update_shopping_item(
-    session: Session, item_id: int, update_data: Dict[str, Any]
+async def update_shopping_item(
+    session: AsyncSession, item_id: int, update_data: Dict[str, Any]
 ) -> Optional[ShoppingItemResponse]:
-    """Update a shopping item with provided fields"""
-    item = session.query(ShoppingItem).filter(ShoppingItem.id == item_id).first()
+    """Update a shopping item with provided fields in one UPDATE ... RETURNING"""
+    row = await update_returning(
+        session, ShoppingItem, item_id, update_data, SHOPPING_ITEM_UPDATE_COLUMNS
+    )
 
-    if not item:
+    if not row:
         return None
 
-    # Update only the fields that were provided
-    for field, value in update_data.items():
-        if hasattr(item, field):
-            setattr(item, field, value)
+    await bump_versions(session, SHOPPING_ITEMS, [row.user_id])
 
-    session.flush()
+    return ShoppingItemResponse.model_validate(row)
 
-    return ShoppingItemResponse.model_validate(item)
 
-
-def delete_shopping_item(session: Session, item_id: int) -> bool:
-    """Delete a shopping item"""
-    item = session.query(ShoppingItem).filter(ShoppingItem.id == item_id).first()
-
-    if not item:
-        return False
-
-    session.delete(item)
-    session.flush()
-    return True
+async def update_shopping_items(
+    session: AsyncSession, updates: Sequence[Tuple[int, Dict[str, Any]]]
+) -> Dict[int, ShoppingItemResponse]:
+    """Update many shopping items, one UPDATE per distinct set of changes"""
+    rows = await update_many_returning(
+        session, ShoppingItem, updates, SHOPPING_ITEM_UPDATE_COLUMNS
+    )
+    await bump_versions(session, SHOPPING_ITEMS, [row.user_id for row in rows.values()])
+    return {
+        item_id: ShoppingItemResponse.model_validate(row)
+        for item_id, row in rows.items()
+    }
+
+
+async def delete_shopping_item(session: AsyncSession, item_id: int) -> bool:
+    """Delete a shopping item and leave a tombstone for syncing clients"""
+    rows = await delete_returning(session, ShoppingItem, ShoppingItem.id == item_id)
+    await record_deletions(session, ShoppingItem, rows)
+    await bump_versions(session, SHOPPING_ITEMS, [row.user_id for row in rows])
+    return bool(rows)
+
+
+async def delete_completed_shopping_items(
+    session: AsyncSession, user_id: int
+) -> List[int]:
+    """Delete all of a user's completed shopping items in one statement
+
+    Returns the ids of the deleted items.
+    """
+    rows = await delete_returning(
+        session,
+        ShoppingItem,
+        ShoppingItem.user_id == user_id,
+        ShoppingItem.completed == true(),
+    )
+    await record_deletions(session, ShoppingItem, rows)
+    await bump_versions(session, SHOPPING_ITEMS, [row.user_id for row in rows])
+    return [row.id for row in rows]
@@ -2,21 +2,40 @@
 Task database access functions
 """
 
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import asc, desc
+from sqlalchemy import case, false, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload, selectinload
 from app.db_models import Task, SubTask
-from app.models import TaskResponse, SubTaskResponse
-
-
-def create_task(
-    session: Session,
+from app.access.pagination import SortKey, paginate, split_page
+from app.access.returning import (
+    delete_returning,
+    update_many_returning,
+    update_returning,
+)
+from app.access.collection_versions import (
+    TASKS,
+    bump_task_versions,
+    bump_versions,
+)
+from app.access.sync_access import record_deletions
+from app.models import (
+    Page,
+    TaskResponse,
+    SubTaskResponse,
+    SubTaskSummary,
+    SubtaskInclusion,
+)
+
+
+async def create_task(
+    session: AsyncSession,
     user_id: int,
     description: str,
-    raw_input: str,
     due_date: Optional[date] = None,
     estimated_time_minutes: Optional[int] = None,
+    brain_dump_id: Optional[int] = None,
 ) -> TaskResponse:
     """Create a new task"""
     task = Task(
@@ -24,16 +43,19 @@ def create_task(
         description=description,
         due_date=due_date,
         estimated_time_minutes=estimated_time_minutes,
-        raw_input=raw_input,
+        brain_dump_id=brain_dump_id,
+        # Initialize the collection so serializing it never needs a lazy load
+        subtasks=[],
     )
     session.add(task)
-    session.flush()
+    await session.flush()
+    await bump_versions(session, TASKS, [user_id])
 
     return TaskResponse.model_validate(task)
 
 
-def create_subtasks(
-    session: Session,
+async def create_subtasks(
+    session: AsyncSession,
     parent_task_id: int,
     subtasks: List[dict],
 ) -> List[SubTaskResponse]:
@@ -50,42 +72,126 @@ def create_subtasks(
     ]
 
     session.add_all(subtask_objects)
-    session.flush()
+    await session.flush()
+    await bump_task_versions(session, [parent_task_id])
 
     return [SubTaskResponse.model_validate(subtask) for subtask in subtask_objects]
 
 
-def _task_to_response(task: Task) -> TaskResponse:
+# Columns the update endpoints may change
+TASK_UPDATE_COLUMNS = frozenset(
+    ["description", "due_date", "estimated_time_minutes", "completed"]
+)
+SUBTASK_UPDATE_COLUMNS = TASK_UPDATE_COLUMNS
+
+# Keyset sort orders for task listing; each ends with the unique id
+TASK_SORT_KEYS = {
+    "created_at": [
+        SortKey(Task.created_at, descending=True),
+        SortKey(Task.id, descending=True),
+    ],
+    "due_date": [SortKey(Task.due_date, nullable=True), SortKey(Task.id)],
+}
+
+
+def _task_to_response(
+    task: Task,
+    include_subtasks: SubtaskInclusion = SubtaskInclusion.FULL,
+    subtask_summary: Optional[SubTaskSummary] = None,
+) -> TaskResponse:
     """Helper function to convert Task ORM model to TaskResponse"""
-    return TaskResponse.model_validate(task)
+    response = TaskResponse.model_validate(task)
+
+    if include_subtasks != SubtaskInclusion.FULL:
+        # Subtasks were not loaded, so leave them out rather than report []
+        response.subtasks = None
+        response.subtask_summary = subtask_summary
+
+    return response
 
 
-def get_tasks_by_user(
-    session: Session,
+async def _get_subtask_summaries(
+    session: AsyncSession, task_ids: List[int]
+) -> Dict[int, SubTaskSummary]:
+    """Count total and completed subtasks per task in a single query"""
+    if not task_ids:
+        return {}
+
+    rows = await session.execute(
+        select(
+            SubTask.parent_task_id,
+            func.count(SubTask.id),
+            func.sum(case((SubTask.completed, 1), else_=0)),
+        )
+        .where(SubTask.parent_task_id.in_(task_ids))
+        .group_by(SubTask.parent_task_id)
+    )
+
+    return {
+        parent_task_id: SubTaskSummary(total=total, completed=completed or 0)
+        for parent_task_id, total, completed in rows
+    }
+
+
+async def get_tasks_by_user(
+    session: AsyncSession,
     user_id: int,
     completed: Optional[bool] = None,
     sort_by: str = "created_at",
-) -> List[TaskResponse]:
-    """Get all tasks for a user with optional filtering and sorting"""
-    query = session.query(Task).filter(Task.user_id == user_id)
+    include_subtasks: SubtaskInclusion = SubtaskInclusion.FULL,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Page[TaskResponse]:
+    """Get a page of tasks for a user with optional filtering and sorting"""
+    query = select(Task).where(Task.user_id == user_id)
+
+    # Full subtasks cost one extra SELECT for all tasks (never one per task);
+    # summaries cost one aggregate query; otherwise they are not loaded at all
+    if include_subtasks == SubtaskInclusion.FULL:
+        query = query.options(selectinload(Task.subtasks))
+    else:
+        query = query.options(noload(Task.subtasks))
 
     # Apply completed filter if provided
     if completed is not None:
-        query = query.filter(Task.completed == completed)
+        # Inline the literal so the partial index on incomplete rows applies
+        query = query.where(Task.completed == (true() if completed else false()))
 
-    # Apply sorting
-    if sort_by == "due_date":
-        query = query.order_by(asc(Task.due_date))
-    elif sort_by == "created_at":
-        query = query.order_by(desc(Task.created_at))
+    # Apply sorting and keyset pagination
+    sort_keys = TASK_SORT_KEYS.get(sort_by, [SortKey(Task.id)])
+    query = paginate(query, sort_by, sort_keys, limit=limit, cursor=cursor)
 
-    tasks = query.all()
-    return [_task_to_response(task) for task in tasks]
+    tasks, next_cursor = split_page(
+        await session.scalars(query), sort_by, sort_keys, limit=limit
+    )
 
+    summaries: Dict[int, SubTaskSummary] = {}
+    if include_subtasks == SubtaskInclusion.SUMMARY:
+        summaries = await _get_subtask_summaries(session, [task.id for task in tasks])
+
+    items = [
+        _task_to_response(
+            task,
+            include_subtasks=include_subtasks,
+            subtask_summary=summaries.get(task.id, SubTaskSummary())
+            if include_subtasks == SubtaskInclusion.SUMMARY
+            else None,
+        )
+        for task in tasks
+    ]
+    return Page(items=items, next_cursor=next_cursor)
+
+
+async def _get_task_with_subtasks(
+    session: AsyncSession, task_id: int
+) -> Optional[Task]:
+    """Load a task together with its subtasks"""
+    return await session.get(Task, task_id, options=[selectinload(Task.subtasks)])
 
-def get_task_by_id(session: Session, task_id: int) -> Optional[TaskResponse]:
+
+async def get_task_by_id(session: AsyncSession, task_id: int) -> Optional[TaskResponse]:
     """Get a single task by ID with its subtasks"""
-    task = session.query(Task).filter(Task.id == task_id).first()
+    task = await _get_task_with_subtasks(session, task_id)
 
     if not task:
         return None
@@ -93,62 +199,117 @@ def get_task_by_id(session: Session, task_id: int) -> Optional[TaskResponse]:
     return _task_to_response(task)
 
 
-def update_task(
-    session: Session, task_id: int, update_data: Dict[str, Any]
+async def update_task(
+    session: AsyncSession,
+    task_id: int,
+    update_data: Dict[str, Any],
+    include_subtasks: SubtaskInclusion = SubtaskInclusion.FULL,
 ) -> Optional[TaskResponse]:
-    """Update a task with provided fields"""
-    task = session.query(Task).filter(Task.id == task_id).first()
+    """Update a task with provided fields
 
-    if not task:
+    The update is one UPDATE ... RETURNING; subtasks (or their summary) cost
+    one more query unless ``include_subtasks`` is NONE.
+    """
+    row = await update_returning(
+        session, Task, task_id, update_data, TASK_UPDATE_COLUMNS
+    )
+
+    if not row:
         return None
 
-    # Update only the fields that were provided
-    for field, value in update_data.items():
-        if hasattr(task, field):
-            setattr(task, field, value)
+    await bump_versions(session, TASKS, [row.user_id])
 
-    session.flush()
-    return _task_to_response(task)
+    (response,) = await _updated_task_responses(session, [row], include_subtasks)
+    return response
 
 
-def delete_task(session: Session, task_id: int) -> bool:
-    """Delete a task (subtasks will be cascade deleted)"""
-    task = session.query(Task).filter(Task.id == task_id).first()
+async def update_tasks(
+    session: AsyncSession,
+    updates: Sequence[Tuple[int, Dict[str, Any]]],
+    include_subtasks: SubtaskInclusion = SubtaskInclusion.FULL,
+) -> Dict[int, TaskResponse]:
+    """Update many tasks, one UPDATE per distinct set of changes
 
-    if not task:
-        return False
-
-    session.delete(task)
-    session.flush()
-    return True
+    Returns the updated tasks by id; ids that do not exist are left out.
+    """
+    rows = await update_many_returning(session, Task, updates, TASK_UPDATE_COLUMNS)
+    await bump_versions(session, TASKS, [row.user_id for row in rows.values()])
+    responses = await _updated_task_responses(
+        session, list(rows.values()), include_subtasks
+    )
+    return {response.id: response for response in responses}
 
 
-def update_subtask(
-    session: Session, subtask_id: int, update_data: Dict[str, Any]
+async def _updated_task_responses(
+    session: AsyncSession, rows: List[Any], include_subtasks: SubtaskInclusion
+) -> List[TaskResponse]:
+    """Responses for task rows returned by an UPDATE, with at most one more
+    query for all of their subtasks (or subtask counts)"""
+    responses = [TaskResponse.model_validate(row) for row in rows]
+    task_ids = [response.id for response in responses]
+
+    if include_subtasks == SubtaskInclusion.FULL and task_ids:
+        subtasks_by_task: Dict[int, List[SubTaskResponse]] = {}
+        for subtask in await session.scalars(
+            select(SubTask)
+            .where(SubTask.parent_task_id.in_(task_ids))
+            .order_by(SubTask.order, SubTask.id)
+        ):
+            subtasks_by_task.setdefault(subtask.parent_task_id, []).append(
+                SubTaskResponse.model_validate(subtask)
+            )
+        for response in responses:
+            response.subtasks = subtasks_by_task.get(response.id, [])
+    elif include_subtasks == SubtaskInclusion.SUMMARY:
+        summaries = await _get_subtask_summaries(session, task_ids)
+        for response in responses:
+            response.subtask_summary = summaries.get(response.id, SubTaskSummary())
+
+    return responses
+
+
+async def delete_task(session: AsyncSession, task_id: int) -> bool:
+    """Delete a task in one statement (the database cascades to its subtasks)
+    and leave a tombstone for syncing clients"""
+    rows = await delete_returning(session, Task, Task.id == task_id)
+    await record_deletions(session, Task, rows)
+    await bump_versions(session, TASKS, [row.user_id for row in rows])
+    return bool(rows)
+
+
+async def update_subtask(
+    session: AsyncSession, subtask_id: int, update_data: Dict[str, Any]
 ) -> Optional[SubTaskResponse]:
-    """Update a subtask with provided fields"""
-    subtask = session.query(SubTask).filter(SubTask.id == subtask_id).first()
+    """Update a subtask with provided fields in one UPDATE ... RETURNING"""
+    row = await update_returning(
+        session, SubTask, subtask_id, update_data, SUBTASK_UPDATE_COLUMNS
+    )
 
-    if not subtask:
+    if not row:
         return None
 
-    # Update only the fields that were provided
-    for field, value in update_data.items():
-        if hasattr(subtask, field):
-            setattr(subtask, field, value)
+    await bump_task_versions(session, [row.parent_task_id])
 
-    session.flush()
+    return SubTaskResponse.model_validate(row)
 
-    return SubTaskResponse.model_validate(subtask)
 
-
-def delete_subtask(session: Session, subtask_id: int) -> bool:
-    """Delete a subtask"""
-    subtask = session.query(SubTask).filter(SubTask.id == subtask_id).first()
-
-    if not subtask:
-        return False
-
-    session.delete(subtask)
-    session.flush()
-    return True
+async def update_subtasks(
+    session: AsyncSession, updates: Sequence[Tuple[int, Dict[str, Any]]]
+) -> Dict[int, SubTaskResponse]:
+    """Update many subtasks, one UPDATE per distinct set of changes"""
+    rows = await update_many_returning(
+        session, SubTask, updates, SUBTASK_UPDATE_COLUMNS
+    )
+    await bump_task_versions(session, [row.parent_task_id for row in rows.values()])
+    return {
+        subtask_id: SubTaskResponse.model_validate(row)
+        for subtask_id, row in rows.items()
+    }
+
+
+async def delete_subtask(session: AsyncSession, subtask_id: int) -> bool:
+    """Delete a subtask and leave a tombstone for syncing clients"""
+    rows = await delete_returning(session, SubTask, SubTask.id == subtask_id)
+    await record_deletions(session, SubTask, rows)
+    await bump_task_versions(session, [row.parent_task_id for row in rows])
+    return bool(rows)
@@ -2,17 +2,18 @@
 User database access functions
 """
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db_models import User
 from app.models import UserResponse
 
 
-def get_or_create_user(
-    session: Session, email: str, first_name: str | None = None
+async def get_or_create_user(
+    session: AsyncSession, email: str, first_name: str | None = None
 ) -> UserResponse:
     """Get existing user or create new one by email"""
     # Check if user exists
-    user = session.query(User).filter(User.email == email).first()
+    user = await session.scalar(select(User).where(User.email == email))
 
     if user:
         return UserResponse(id=user.id, email=user.email, first_name=user.first_name)
@@ -20,6 +21,6 @@ def get_or_create_user(
     # Create new user
     user = User(email=email, first_name=first_name)
     session.add(user)
-    session.flush()
+    await session.flush()
 
     return UserResponse(id=user.id, email=user.email, first_name=user.first_name)
@@ -0,0 +1,250 @@
+"""
+Chat model backends for AIService
+
+AIService talks to any LangChain ``BaseChatModel``. AI_BACKEND selects it:
+
+- ``anthropic`` (default): Claude through ChatAnthropic; needs ANTHROPIC_API_KEY
+- ``replay``: ReplayChatModel, which answers from recorded ProcessedBrainDump
+  fixtures after a simulated latency and never touches the network, so the
+  full request path can be load tested offline
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterator, AsyncIterator, List, Literal, Optional
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+from app.models import (
+    BatchedBrainDumps,
+    IndexedBrainDump,
+    ProcessedBrainDump,
+    ProcessedCalendarEvent,
+    ProcessedShoppingItem,
+    ProcessedTask,
+)
+
+MODEL_NAME = "claude-3-5-haiku-20241022"
+
+# Matches the documents AIService._extract_batch sends in one request
+BATCH_DOCUMENT = re.compile(r'<brain_dump index="(\d+)">\n(.*?)\n</brain_dump>', re.S)
+
+# Answers used when no fixture file is configured
+DEFAULT_FIXTURES = [
+    ProcessedBrainDump(
+        tasks=[
+            ProcessedTask(
+                description="Call the babysitter",
+                estimated_time_minutes=10,
+                should_decompose=False,
+            )
+        ],
+        shopping_items=[ProcessedShoppingItem(description="Milk")],
+    ),
+    ProcessedBrainDump(
+        shopping_items=[
+            ProcessedShoppingItem(description="Eggs"),
+            ProcessedShoppingItem(description="Bread"),
+        ],
+        calendar_events=[
+            ProcessedCalendarEvent(
+                description="Soccer practice",
+                event_date="2026-10-22",
+                event_time="16:00",
+            )
+        ],
+    ),
+]
+
+
+def load_fixtures(path: str) -> Dict[Optional[str], List[ProcessedBrainDump]]:
+    """Read recorded results from a JSONL file
+
+    Each line is {"text": "...", "result": {...ProcessedBrainDump...}}. Lines
+    without "text" are used for any input that was not recorded.
+    """
+    fixtures: Dict[Optional[str], List[ProcessedBrainDump]] = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            result = ProcessedBrainDump.model_validate(entry["result"])
+            fixtures.setdefault(entry.get("text"), []).append(result)
+    return fixtures
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that replays recorded brain dump results
+
+    An input recorded in ``recorded`` gets its own result; any other input
+    gets one of ``fixtures``, chosen by a hash of the text so repeated
+    inputs get the same answer. Batched requests get one result per
+    document. Every call first sleeps for a latency drawn from
+    ``latency_distribution``:
+
+    - ``fixed``: always ``latency_ms``
+    - ``uniform``: ``latency_ms`` +/- ``latency_jitter_ms``
+    - ``lognormal``: median ``latency_ms`` with a long tail, shaped by
+      ``latency_jitter_ms`` as the approximate standard deviation
+    """
+
+    fixtures: List[ProcessedBrainDump] = DEFAULT_FIXTURES
+    recorded: Dict[str, ProcessedBrainDump] = {}
+    latency_ms: float = 800.0
+    latency_jitter_ms: float = 0.0
+    latency_distribution: Literal["fixed", "uniform", "lognormal"] = "fixed"
+    seed: Optional[int] = None
+
+    _random: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        if not self.fixtures:
+            raise ValueError("ReplayChatModel needs at least one fixture")
+        self._random = random.Random(self.seed)
+
+    @classmethod
+    def from_env(cls) -> "ReplayChatModel":
+        """Configured by AI_REPLAY_FIXTURES (JSONL path, see load_fixtures),
+        AI_REPLAY_LATENCY_MS, AI_REPLAY_LATENCY_JITTER_MS and
+        AI_REPLAY_LATENCY_DISTRIBUTION"""
+        options: Dict[str, Any] = {
+            "latency_ms": float(os.getenv("AI_REPLAY_LATENCY_MS", "800")),
+            "latency_jitter_ms": float(os.getenv("AI_REPLAY_LATENCY_JITTER_MS", "0")),
+            "latency_distribution": os.getenv(
+                "AI_REPLAY_LATENCY_DISTRIBUTION", "fixed"
+            ).lower(),
+        }
+        fixtures_path = os.getenv("AI_REPLAY_FIXTURES")
+        if fixtures_path:
+            fixtures = load_fixtures(fixtures_path)
+            unrecorded = fixtures.pop(None, [])
+            options["recorded"] = {
+                text: results[0] for text, results in fixtures.items()
+            }
+            options["fixtures"] = unrecorded or [
+                result for results in fixtures.values() for result in results
+            ]
+        return cls(**options)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def sample_latency(self) -> float:
+        """Seconds the next call takes"""
+        if self.latency_distribution == "uniform":
+            milliseconds = self._random.uniform(
+                self.latency_ms - self.latency_jitter_ms,
+                self.latency_ms + self.latency_jitter_ms,
+            )
+        elif self.latency_distribution == "lognormal" and self.latency_ms > 0:
+            sigma = math.log1p(self.latency_jitter_ms / self.latency_ms)
+            milliseconds = self._random.lognormvariate(math.log(self.latency_ms), sigma)
+        else:
+            milliseconds = self.latency_ms
+        return max(milliseconds, 0) / 1000
+
+    def _result_for(self, text: str) -> ProcessedBrainDump:
+        if text in self.recorded:
+            return self.recorded[text]
+        return self.fixtures[zlib.crc32(text.encode()) % len(self.fixtures)]
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = messages[-1].content
+        documents = BATCH_DOCUMENT.findall(prompt)
+        if documents:
+            content = BatchedBrainDumps(
+                results=[
+                    IndexedBrainDump(index=int(index), result=self._result_for(text))
+                    for index, text in documents
+                ]
+            ).model_dump_json(
+                exclude={"results": {"__all__": {"result": {"degraded"}}}}
+            )
+        else:
+            content = self._result_for(prompt).model_dump_json(exclude={"degraded"})
+
+        # Rough token counts so the usage metrics move as they would
+        input_tokens = sum(len(str(message.content)) for message in messages) // 4
+        output_tokens = len(content) // 4
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.sample_latency())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.sample_latency())
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages)
+        time.sleep(self.sample_latency())
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content=message.content, usage_metadata=message.usage_metadata
+            )
+        )
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """Spreads the latency over the chunks, like tokens arriving"""
+        message = self._respond(messages)
+        content = message.content
+        chunk_size = 40
+        pieces = [
+            content[start : start + chunk_size]
+            for start in range(0, len(content), chunk_size)
+        ]
+        delay = self.sample_latency() / len(pieces)
+        for position, piece in enumerate(pieces):
+            await asyncio.sleep(delay)
+            last = position == len(pieces) - 1
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=piece,
+                    usage_metadata=message.usage_metadata if last else None,
+                )
+            )
+
+
+def create_llm_from_env() -> BaseChatModel:
+    """Build the chat model selected by AI_BACKEND"""
+    backend = os.getenv("AI_BACKEND", "anthropic").lower()
+
+    if backend == "replay":
+        return ReplayChatModel.from_env()
+    if backend == "anthropic":
+        anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
+        if not anthropic_api_key:
+            raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
+        return ChatAnthropic(
+            model=MODEL_NAME,
+            anthropic_api_key=anthropic_api_key,
+            temperature=0.3,
+            max_tokens=2048,
+            # Retries are handled by AIService's retry policy
+            max_retries=0,
+        )
+
+    raise ValueError(f"Unknown AI_BACKEND: {backend}")
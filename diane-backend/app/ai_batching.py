@@ -0,0 +1,81 @@
+"""
+Micro-batching of concurrent brain dumps into one model request
+
+Dumps submitted within ``window_seconds`` of each other (up to
+``max_batch_size``) are handed to ``process_batch`` together, so a burst of
+small dumps pays for the system prompt and the round trip once. Each caller
+still gets back only its own result.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple, Union
+from app.models import ProcessedBrainDump
+
+# Processes a batch of texts; returns one result (or the exception raised for
+# it) per text, in the same order
+BatchProcessor = Callable[
+    [List[str]], Awaitable[List[Union[ProcessedBrainDump, BaseException]]]
+]
+
+
+class BrainDumpBatcher:
+    """Collects concurrent submissions into batches for ``process_batch``"""
+
+    def __init__(
+        self,
+        process_batch: BatchProcessor,
+        max_batch_size: int = 8,
+        window_seconds: float = 0.05,
+    ):
+        if max_batch_size < 2:
+            raise ValueError("max_batch_size must be at least 2")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks, so running
+        # batches are held here until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> ProcessedBrainDump:
+        """Process ``text`` as part of the next batch"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_after_window())
+
+        return await future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.window_seconds)
+        self._timer = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await self.process_batch([text for text, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller gave up (e.g. the request was cancelled)
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,36 @@
+"""
+Errors raised by AIService instead of degrading to the fallback result
+
+Routes map these to HTTP statuses so clients can back off and retry.
+"""
+
+from typing import Optional
+
+
+class AIServiceError(Exception):
+    """Base class for AI processing errors that should reach the client"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AIOverloadedError(AIServiceError):
+    """Too many brain dumps are already waiting for the model (HTTP 503)"""
+
+
+class AIRateLimitedError(AIServiceError):
+    """The model provider rejected the call with a rate limit (HTTP 429)"""
+
+
+class AICircuitOpenError(AIServiceError):
+    """Recent calls to the provider kept failing; failing fast (HTTP 503)"""
+
+
+class AIProviderUnavailableError(AIServiceError):
+    """The provider kept failing with transient errors until the retries ran
+    out (HTTP 503)"""
+
+
+class AITimeoutError(AIServiceError):
+    """The call did not finish within the latency budget (HTTP 504)"""
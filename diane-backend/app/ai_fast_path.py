@@ -0,0 +1,269 @@
+"""
+Rule-based fast path for brain dumps too simple to need the model
+
+Two shapes are recognised with high confidence:
+
+- plain shopping lists ("milk, eggs and bread", "buy 2 gallons of milk"),
+  where every comma/"and"-separated item is in the grocery lexicon
+- a single simple event ("dentist Friday at 2pm", "soccer practice
+  tomorrow at 4:30pm"), with an event keyword, a date and optionally a time
+
+Anything else, including mixtures, returns None and goes to the model.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import List, Optional
+from app.models import ProcessedBrainDump, ProcessedCalendarEvent, ProcessedShoppingItem
+
+GROCERY_LEXICON = frozenset(
+    """
+    apple apples avocado avocados bacon bagel bagels banana bananas basil beans
+    beef berries blueberries bread broccoli broth butter cabbage cake carrot
+    carrots cereal cheese cherries chicken chips chocolate cilantro cinnamon
+    coffee cookies corn crackers cream cucumber cucumbers diapers eggs egg flour
+    fish garlic ginger granola grapes ham honey hummus ice jam juice kale
+    ketchup lemon lemons lettuce lime limes mango mayo mayonnaise meat melon
+    milk mushrooms mustard noodles nuts oatmeal oats oil olive olives onion
+    onions orange oranges pasta peaches peanut pears peas pepper peppers pickles
+    pizza popcorn pork potato potatoes pretzels raisins rice salad salami salmon
+    salsa salt sausage shampoo soap soda soup spinach squash steak strawberries
+    sugar syrup tea toilet tofu tomato tomatoes tortillas tuna turkey vanilla
+    vinegar water watermelon wipes yogurt zucchini
+    detergent napkins foil toothpaste sponges tissues formula
+    """.split()
+)
+
+# Words that make a list item still clearly a grocery ("whole milk",
+# "paper towels", "ice cream") when the item's last word is not itself listed
+GROCERY_PHRASES = frozenset(
+    [
+        "ice cream",
+        "paper towels",
+        "toilet paper",
+        "dish soap",
+        "olive oil",
+        "peanut butter",
+        "orange juice",
+        "apple juice",
+        "sour cream",
+        "cream cheese",
+        "baby wipes",
+        "trash bags",
+        "garbage bags",
+        "sparkling water",
+    ]
+)
+
+EVENT_KEYWORDS = frozenset(
+    """
+    appointment appt dentist doctor orthodontist pediatrician vet checkup
+    check-up practice game match recital rehearsal meeting class lesson party
+    playdate haircut conference concert tournament dinner lunch brunch
+    """.split()
+)
+
+# Leading verbs that make an item a task rather than an event or a grocery
+TASK_VERBS = frozenset(
+    """
+    call email text buy book schedule reschedule plan pay remind send order
+    pick cancel make fix clean organize prepare finish write sign renew
+    cook bake feed defrost thaw return water wash fry grill boil roast heat
+    microwave chop cut peel slice marinate season serve eat drink pack unpack
+    put take bring drop move store freeze refill replace throw toss use try
+    check find ask tell help walk mow mop sweep vacuum fold iron repair
+    """.split()
+)
+
+# Words around an event that change its date, make it recur or call it off
+# ("next Friday", "every Tuesday", "no practice tomorrow"); left to the model
+EVENT_QUALIFIERS = frozenset(
+    """
+    next this last every each other weekly biweekly daily monthly until
+    through after before from except instead no not don't isn't won't never
+    cancel cancelled canceled cancelling canceling skip skipped skipping move
+    moved moving postpone postponed reschedule rescheduled off maybe might
+    possibly tentative tentatively or
+    """.split()
+)
+
+SHOPPING_PREFIX = re.compile(
+    r"^(?:(?:i|we)\s+)?(?:need\s+to\s+)?(?:buy|get|grab|pick\s+up|need)\b\s*:?\s*"
+    r"|^(?:shopping|grocery)\s+list\s*:?\s*|^groceries\s*:\s*",
+    re.IGNORECASE,
+)
+ITEM_SEPARATOR = re.compile(r"\s*(?:,|;|\n|&|\+|\band\b)\s*", re.IGNORECASE)
+QUANTITY = re.compile(
+    r"^(?:\d+(?:\.\d+)?|an?|one|two|three|four|five|six|some|a\s+few|a\s+dozen|dozen)"
+    r"\s+(?:(?:lbs?|pounds?|kg|g|oz|gallons?|liters?|litres?|bottles?|boxes?"
+    r"|bags?|cans?|cartons?|packs?|loaf|loaves|bunch(?:es)?|jars?|dozen|"
+    r"heads?|bunches)\s+(?:of\s+)?)?",
+    re.IGNORECASE,
+)
+
+WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+DAY = re.compile(
+    r"\b(?:on\s+)?(?:(?P<relative>today|tonight|tomorrow)"
+    r"|(?P<weekday>monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"|(?P<month>jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?\s+"
+    r"(?P<month_day>\d{1,2})(?:st|nd|rd|th)?"
+    r"|(?P<numeric_month>\d{1,2})/(?P<numeric_day>\d{1,2}))\b",
+    re.IGNORECASE,
+)
+TIME = re.compile(
+    r"\b(?:at\s+)?(?:(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>[ap])\.?m\.?"
+    r"|(?P<hour24>\d{1,2}):(?P<minute24>\d{2})|(?P<noon>noon))(?!\w)",
+    re.IGNORECASE,
+)
+
+
+def _capitalize(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def _is_grocery_name(name: str) -> bool:
+    if name in GROCERY_PHRASES or name in GROCERY_LEXICON:
+        return True
+    return " " not in name and name.rstrip("s") in GROCERY_LEXICON
+
+
+def _is_grocery(item: str) -> bool:
+    """A lexicon word or phrase, after an optional quantity ("2 gallons of")
+    and at most one qualifier that is not a verb ("whole milk", but not
+    "make soup" or "feed the fish")"""
+    words = QUANTITY.sub("", item).lower().strip(" .!").split()
+    if not words:
+        return False
+    if _is_grocery_name(" ".join(words)):
+        return True
+    qualifier, name = words[0], " ".join(words[1:])
+    return qualifier not in TASK_VERBS and bool(name) and _is_grocery_name(name)
+
+
+def _shopping_list(text: str) -> Optional[ProcessedBrainDump]:
+    items = [
+        item.strip(" .!")
+        for item in ITEM_SEPARATOR.split(SHOPPING_PREFIX.sub("", text.strip()))
+    ]
+    items = [item for item in items if item]
+    if not items or not all(_is_grocery(item) for item in items):
+        return None
+
+    return ProcessedBrainDump(
+        shopping_items=[
+            ProcessedShoppingItem(description=_capitalize(item)) for item in items
+        ]
+    )
+
+
+def _resolve_day(match: re.Match, today: date) -> Optional[date]:
+    if match.group("relative"):
+        offset = 1 if match.group("relative").lower() == "tomorrow" else 0
+        return today + timedelta(days=offset)
+
+    if match.group("weekday"):
+        offset = (WEEKDAYS.index(match.group("weekday").lower()) - today.weekday()) % 7
+        # "Friday" said on a Friday could mean today or next week
+        return today + timedelta(days=offset) if offset else None
+
+    if match.group("month"):
+        month = MONTHS.index(match.group("month").lower()[:3]) + 1
+        day = int(match.group("month_day"))
+    else:
+        month, day = int(match.group("numeric_month")), int(match.group("numeric_day"))
+
+    try:
+        resolved = date(today.year, month, day)
+        return resolved if resolved >= today else date(today.year + 1, month, day)
+    except ValueError:
+        return None
+
+
+def _resolve_time(match: re.Match) -> Optional[str]:
+    if match.group("noon"):
+        return "12:00"
+
+    if match.group("hour24"):
+        hour, minute = int(match.group("hour24")), int(match.group("minute24"))
+    else:
+        hour, minute = int(match.group("hour")), int(match.group("minute") or 0)
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if match.group("meridiem").lower() == "p" else 0)
+
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _simple_event(text: str, today: date) -> Optional[ProcessedBrainDump]:
+    text = text.strip().rstrip(".!")
+    if len(ITEM_SEPARATOR.split(text)) > 1:
+        return None
+
+    day_matches: List[re.Match] = list(DAY.finditer(text))
+    time_matches: List[re.Match] = list(TIME.finditer(text))
+    if len(day_matches) != 1 or len(time_matches) > 1:
+        return None
+
+    event_date = _resolve_day(day_matches[0], today)
+    if event_date is None:
+        return None
+    event_time = _resolve_time(time_matches[0]) if time_matches else None
+    if time_matches and event_time is None:
+        return None
+
+    description = text
+    for match in sorted(day_matches + time_matches, key=lambda m: -m.start()):
+        description = description[: match.start()] + description[match.end() :]
+    words = description.split()
+
+    # Confident only for short descriptions naming an event, not a task
+    if not words or len(words) > 6 or words[0].lower() in TASK_VERBS:
+        return None
+    if not any(word.lower().strip(",.'s") in EVENT_KEYWORDS for word in words):
+        return None
+    if any(word.lower().strip(",.!?") in EVENT_QUALIFIERS for word in words):
+        return None
+    # Leftover numbers are times or dates that were not understood ("at 2")
+    if any(char.isdigit() for char in description):
+        return None
+
+    return ProcessedBrainDump(
+        calendar_events=[
+            ProcessedCalendarEvent(
+                description=_capitalize(" ".join(words)),
+                event_date=event_date.isoformat(),
+                event_time=event_time,
+            )
+        ]
+    )
+
+
+def classify(text: str, today: date) -> Optional[ProcessedBrainDump]:
+    """Process ``text`` without the model, or None if it is not clearly simple"""
+    if not text.strip() or len(text) > 300:
+        return None
+    return _shopping_list(text) or _simple_event(text, today)
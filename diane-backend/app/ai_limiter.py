@@ -0,0 +1,50 @@
+"""
+Concurrency limit and bounded wait queue for outbound model calls
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from app.ai_errors import AIOverloadedError
+from app.metrics import metrics
+
+
+class ConcurrencyLimiter:
+    """Allows ``max_concurrent`` calls at once and ``max_waiting`` queued calls
+
+    Callers beyond that are rejected immediately with AIOverloadedError rather
+    than piling up behind the provider's rate limit. Time spent waiting for a
+    slot is recorded in the ai_queue_wait_* counters.
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_waiting: int = 32):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the concurrent call slots for the duration of the block"""
+        if self._semaphore.locked() and self.waiting >= self.max_waiting:
+            metrics.increment("ai_queue_rejections")
+            raise AIOverloadedError(
+                "Too many brain dumps are being processed", retry_after=1
+            )
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        metrics.increment("ai_queue_waits")
+        metrics.increment("ai_queue_wait_seconds_total", time.monotonic() - started)
+
+        try:
+            yield
+        finally:
+            self._semaphore.release()
@@ -0,0 +1,115 @@
+"""
+Retry policy and circuit breaker for model calls
+
+Transient provider failures (connection errors, timeouts, 5xx/529 overloads,
+429 rate limits) are retried with jittered exponential backoff. Repeated
+failures open the circuit so further calls fail fast until the provider has
+had time to recover.
+"""
+
+import random
+import time
+from typing import Callable, Optional
+import anthropic
+from app.ai_errors import AICircuitOpenError
+from app.metrics import metrics
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed model call may succeed if tried again"""
+    return isinstance(
+        error,
+        (
+            anthropic.APIConnectionError,  # includes APITimeoutError
+            anthropic.RateLimitError,
+            anthropic.InternalServerError,  # 5xx, including 529 overloaded
+        ),
+    )
+
+
+class RetryPolicy:
+    """Bounded retries with "full jitter" exponential backoff"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)
+
+        A Retry-After sent by the provider is honoured as the minimum delay.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+        response = getattr(error, "response", None)
+        retry_after = (
+            response.headers.get("retry-after") if response is not None else None
+        )
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+
+        return delay
+
+
+class CircuitBreaker:
+    """Stops calling the provider after ``failure_threshold`` consecutive failures
+
+    While open, check() raises AICircuitOpenError. Every ``reset_timeout``
+    seconds one trial call is let through (half-open); its success closes the
+    circuit, its failure keeps it open for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def check(self) -> None:
+        """Raise AICircuitOpenError unless a call may be made now"""
+        if self.opened_at is None:
+            return
+
+        remaining = self.opened_at + self.reset_timeout - self._clock()
+        if remaining > 0:
+            metrics.increment("ai_circuit_rejections")
+            raise AICircuitOpenError(
+                "AI provider is unavailable, try again shortly",
+                retry_after=max(remaining, 1),
+            )
+
+        # Half-open: let this call through as a trial and hold everyone else
+        # back for another reset_timeout until it reports back
+        self.opened_at = self._clock()
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                metrics.increment("ai_circuit_opened")
+            self.opened_at = self._clock()
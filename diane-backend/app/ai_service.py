@@ -1,48 +1,47 @@
+import asyncio
+import hashlib
 import os
+import time
+import anthropic
 from datetime import datetime
-from langchain_anthropic import ChatAnthropic
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
+from pydantic import BaseModel
+from app.ai_backends import MODEL_NAME, create_llm_from_env
+from app.ai_batching import BrainDumpBatcher
+from app.ai_errors import (
+    AIProviderUnavailableError,
+    AIRateLimitedError,
+    AIServiceError,
+    AITimeoutError,
+)
+from app.ai_fast_path import classify
+from app.ai_limiter import ConcurrencyLimiter
+from app.ai_resilience import CircuitBreaker, RetryPolicy, is_retryable
+from app.ai_streaming import ITEM_MODELS, BrainDumpStreamParser, chunk_text
+from app.cache import CacheBackend, create_cache_from_env
+from app.metrics import metrics
 from app.models import (
+    BatchedBrainDumps,
     ProcessedTask,
     ProcessedBrainDump,
 )
 
+T = TypeVar("T")
 
-class AIService:
-    """Service for processing brain dumps using two-step categorization with Anthropic"""
-
-    def __init__(self):
-        self.anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not self.anthropic_api_key:
-            raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
-
-        # Initialize ChatAnthropic model
-        self.llm = ChatAnthropic(
-            model="claude-3-5-haiku-20241022",
-            anthropic_api_key=self.anthropic_api_key,
-            temperature=0.3,
-            max_tokens=2048,
-        )
-
-    async def process_brain_dump(self, text: str) -> ProcessedBrainDump:
-        """
-        Process a brain dump and extract all tasks, shopping items, and calendar events
-
-        Args:
-            text: The user's brain dump text
-
-        Returns:
-            ProcessedBrainDump containing lists of tasks, shopping items, and calendar events
-        """
-        parser = PydanticOutputParser(pydantic_object=ProcessedBrainDump)
-        today = datetime.now().strftime("%Y-%m-%d")
-
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                (
-                    "system",
-                    """You are an AI assistant helping busy parents organize their mental load.
+SYSTEM_PROMPT = """You are an AI assistant helping busy parents organize their mental load.
 
 Your job is to extract ALL items from the user's brain dump and categorize them into:
 1. **Tasks** - Things to do, actions to complete
@@ -125,41 +124,457 @@ SHOPPING ITEMS:
 CALENDAR EVENTS:
 - Extract description (5-10 words max)
 - Event date (YYYY-MM-DD format) - REQUIRED
-- Event time (HH:MM 24-hour format) if mentioned
+- Event time (HH:MM 24-hour format) if mentioned"""
 
-Current date: {today}
+BATCH_INSTRUCTIONS = """BATCHED REQUESTS:
+The user message contains several independent brain dumps, each wrapped in
+<brain_dump index="N"> tags. Process every brain dump on its own exactly as
+described above, then return one result per brain dump with its index.
+Never move items between brain dumps.
 
-{format_instructions}""",
-                ),
-                ("human", "{input}"),
-            ]
+Respond with:
+{format_instructions}"""
+
+# Bump whenever the prompt or output format changes so cached results from
+# the old prompt are no longer used
+PROMPT_VERSION = "1"
+
+
+def brain_dump_cache_key(text: str, today: str) -> str:
+    """Content address of a brain dump's AI result
+
+    Whitespace is normalized so resubmitting the same text (retries, double
+    clicks) hits the cache. The date is part of the key because relative dates
+    like "tomorrow" resolve differently each day.
+    """
+    normalized = " ".join(text.split())
+    content = "\n".join([MODEL_NAME, PROMPT_VERSION, today, normalized])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class AIService:
+    """Service for processing brain dumps using two-step categorization with Anthropic"""
+
+    def __init__(
+        self,
+        llm: Optional[BaseChatModel] = None,
+        cache: Optional[CacheBackend] = None,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        latency_budget: Optional[float] = None,
+        fast_path: Optional[bool] = None,
+    ):
+        # Claude unless AI_BACKEND selects another backend (see app.ai_backends)
+        self.llm = llm if llm is not None else create_llm_from_env()
+
+        # Bounds concurrent model calls (AI_MAX_CONCURRENCY) and how many more
+        # may wait for a slot (AI_MAX_QUEUE) before requests are rejected
+        self.limiter = limiter or ConcurrencyLimiter(
+            max_concurrent=int(os.getenv("AI_MAX_CONCURRENCY", "8")),
+            max_waiting=int(os.getenv("AI_MAX_QUEUE", "32")),
         )
 
-        try:
-            chain = prompt | self.llm | parser
-            result = await chain.ainvoke(
-                {
-                    "input": text,
-                    "today": today,
-                    "format_instructions": parser.get_format_instructions(),
-                }
+        # Transient failures are retried (AI_MAX_ATTEMPTS) within an overall
+        # per-request latency budget (AI_LATENCY_BUDGET_SECONDS); repeated
+        # failures open the circuit (AI_CIRCUIT_FAILURE_THRESHOLD) for
+        # AI_CIRCUIT_RESET_SECONDS
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=int(os.getenv("AI_MAX_ATTEMPTS", "3"))
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("AI_CIRCUIT_RESET_SECONDS", "30")),
+        )
+        self.latency_budget = latency_budget or float(
+            os.getenv("AI_LATENCY_BUDGET_SECONDS", "45")
+        )
+
+        # Everything except the user's text and today's date is fixed, so the
+        # parser and the static system prompt are built once. The static
+        # block is marked as a cacheable prefix for Anthropic prompt caching;
+        # the date follows it so the prefix is identical on every call.
+        self.parser = PydanticOutputParser(pydantic_object=ProcessedBrainDump)
+        self.static_system_block = {
+            "type": "text",
+            "text": f"{SYSTEM_PROMPT}\n\n{self.parser.get_format_instructions()}",
+            "cache_control": {"type": "ephemeral"},
+        }
+
+        # Chain with today's date filled in, rebuilt when the date changes
+        self._chain_date: Optional[str] = None
+        self._chain = None
+
+        # Optional micro-batching of concurrent dumps into one model request
+        # (AI_BATCH_MAX_SIZE of 2 or more enables it; AI_BATCH_WINDOW_MS is
+        # how long to wait for a batch to fill)
+        self.batch_parser = PydanticOutputParser(pydantic_object=BatchedBrainDumps)
+        self.batch_system_block = {
+            "type": "text",
+            "text": BATCH_INSTRUCTIONS.format(
+                format_instructions=self.batch_parser.get_format_instructions()
+            ),
+        }
+        batch_size = int(os.getenv("AI_BATCH_MAX_SIZE", "0"))
+        self.batcher = (
+            BrainDumpBatcher(
+                self._process_batch,
+                max_batch_size=batch_size,
+                window_seconds=float(os.getenv("AI_BATCH_WINDOW_MS", "50")) / 1000,
             )
-            return result
+            if batch_size >= 2
+            else None
+        )
+
+        # Plain shopping lists and simple events are handled without the
+        # model unless AI_FAST_PATH=false
+        self.fast_path = (
+            fast_path
+            if fast_path is not None
+            else os.getenv("AI_FAST_PATH", "true").lower() != "false"
+        )
+
+        # Results of identical brain dumps, configured by BRAIN_DUMP_CACHE_*
+        self.cache = (
+            cache if cache is not None else create_cache_from_env("BRAIN_DUMP_CACHE")
+        )
+
+    async def process_brain_dump(self, text: str) -> ProcessedBrainDump:
+        """
+        Process a brain dump and extract all tasks, shopping items, and calendar events
+
+        Args:
+            text: The user's brain dump text
+
+        Returns:
+            ProcessedBrainDump containing lists of tasks, shopping items, and calendar events
+        """
+        now = datetime.now()
+        fast_result = self._fast_path(text, now)
+        if fast_result is not None:
+            return fast_result
+
+        today = now.strftime("%Y-%m-%d")
+        cache_key = brain_dump_cache_key(text, today)
+
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return ProcessedBrainDump.model_validate_json(cached)
+
+        try:
+            if self.batcher is not None:
+                result = await self.batcher.submit(text)
+            else:
+                result = await self._extract_with_retries(
+                    lambda: self._extract(text, today)
+                )
+        except AIServiceError:
+            raise
+        except anthropic.RateLimitError as e:
+            raise _rate_limited(e) from e
+        except Exception as e:
+            # The provider answered but the request failed (e.g. unparseable
+            # output): keep the whole dump as one task, flagged as degraded
+            # (not cached, so a retry can succeed)
+            print(f"Error processing brain dump, returning fallback: {e}")
+            metrics.increment("ai_fallbacks")
+            return _fallback_result(text)
+
+        if self.cache is not None:
+            await self.cache.set(cache_key, result.model_dump_json())
+
+        return result
+
+    async def stream_brain_dump(
+        self, text: str
+    ) -> AsyncIterator[Tuple[str, BaseModel]]:
+        """
+        Process a brain dump, yielding each extracted item as soon as the model
+        has finished writing it
+
+        Yields:
+            (field, item) pairs where field is the ProcessedBrainDump list the
+            item belongs to ("tasks", "shopping_items" or "calendar_events")
+        """
+        now = datetime.now()
+        fast_result = self._fast_path(text, now)
+        if fast_result is not None:
+            for item in _items_of(fast_result):
+                yield item
+            return
+
+        today = now.strftime("%Y-%m-%d")
+        cache_key = brain_dump_cache_key(text, today)
 
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                for item in _items_of(ProcessedBrainDump.model_validate_json(cached)):
+                    yield item
+                return
+
+        parser = BrainDumpStreamParser()
+        result = ProcessedBrainDump()
+        message = None
+        try:
+            # Items may already have been sent when a stream fails, so streams
+            # are not retried; they still count towards the circuit breaker
+            async with self.limiter.slot():
+                self.circuit_breaker.check()
+                async for chunk in self._chain_for(today).astream({"input": text}):
+                    message = chunk if message is None else message + chunk
+                    for field, item in parser.feed(chunk_text(chunk.content)):
+                        getattr(result, field).append(item)
+                        yield field, item
+
+            for field, item in parser.finish():
+                getattr(result, field).append(item)
+                yield field, item
+        except AIServiceError:
+            raise
+        except anthropic.RateLimitError as e:
+            self.circuit_breaker.record_failure()
+            raise _rate_limited(e) from e
         except Exception as e:
-            print(f"Error processing brain dump: {e}")
-            # Fallback: treat as simple task
-            return ProcessedBrainDump(
-                tasks=[
-                    ProcessedTask(
-                        description=text[:100] + ("..." if len(text) > 100 else ""),
-                        due_date=None,
-                        estimated_time_minutes=15,
-                        should_decompose=False,
-                        reasoning="Error occurred during processing",
-                        subtasks=[],
+            if is_retryable(e):
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            metrics.increment("ai_stream_errors")
+            if any(_items_of(result)):
+                # Part of the result has been sent; raise so the caller
+                # reports the failure instead of ending as if complete
+                raise
+            metrics.increment("ai_fallbacks")
+            for item in _items_of(_fallback_result(text)):
+                yield item
+            return
+
+        self.circuit_breaker.record_success()
+        if message is not None:
+            _record_token_usage(message)
+
+        if self.cache is not None:
+            await self.cache.set(cache_key, result.model_dump_json())
+
+    def _fast_path(self, text: str, now: datetime) -> Optional[ProcessedBrainDump]:
+        """The rule-based result for ``text``, or None if the model is needed
+
+        Hits add the average model call latency seen so far, less the time
+        spent classifying, to ai_fast_path_seconds_saved.
+        """
+        if not self.fast_path:
+            return None
+
+        started = time.perf_counter()
+        result = classify(text, now.date())
+        elapsed = time.perf_counter() - started
+
+        if result is None:
+            metrics.increment("ai_fast_path_misses")
+            return None
+
+        metrics.increment("ai_fast_path_hits")
+        model_calls = metrics.get("ai_model_calls")
+        if model_calls:
+            average = metrics.get("ai_model_call_seconds_total") / model_calls
+            metrics.increment("ai_fast_path_seconds_saved", max(average - elapsed, 0))
+        return result
+
+    async def _extract_with_retries(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Make a model call, retrying transient failures within the latency budget
+
+        Raises:
+            AICircuitOpenError: if the circuit breaker is open
+            AITimeoutError: if the latency budget runs out
+            AIRateLimitedError: if the provider still rate limits the last attempt
+            AIProviderUnavailableError: if the last attempt still fails with
+                another transient error
+        """
+        deadline = time.monotonic() + self.latency_budget
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self.limiter.slot():
+                    self.circuit_breaker.check()
+                    started = time.monotonic()
+                    remaining = deadline - started
+                    result = await asyncio.wait_for(call(), timeout=max(remaining, 0))
+                    metrics.increment("ai_model_calls")
+                    metrics.increment(
+                        "ai_model_call_seconds_total", time.monotonic() - started
                     )
-                ],
-                shopping_items=[],
-                calendar_events=[],
+            except AIServiceError:
+                raise
+            except asyncio.TimeoutError as e:
+                self.circuit_breaker.record_failure()
+                metrics.increment("ai_timeouts")
+                raise AITimeoutError(
+                    "AI processing took longer than the latency budget"
+                ) from e
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered (e.g. with unparseable output), so
+                    # it is healthy even though this request failed
+                    self.circuit_breaker.record_success()
+                    raise
+                self.circuit_breaker.record_failure()
+
+                delay = self.retry_policy.delay(attempt, e)
+                out_of_time = time.monotonic() + delay >= deadline
+                if attempt >= self.retry_policy.max_attempts or out_of_time:
+                    if isinstance(e, anthropic.RateLimitError):
+                        raise _rate_limited(e) from e
+                    raise AIProviderUnavailableError(
+                        "AI provider is unavailable", retry_after=max(delay, 1)
+                    ) from e
+                print(f"Retrying brain dump in {delay:.1f}s after error: {e}")
+                metrics.increment("ai_retries")
+                await asyncio.sleep(delay)
+            else:
+                self.circuit_breaker.record_success()
+                return result
+
+    async def _process_batch(
+        self, texts: List[str]
+    ) -> List[Union[ProcessedBrainDump, BaseException]]:
+        """Process a batch from the batcher with one model request
+
+        Dumps the model left out of its answer, or every dump if the batched
+        call fails outright, are processed individually instead.
+        """
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        def process_individually(text: str):
+            return self._extract_with_retries(lambda: self._extract(text, today))
+
+        if len(texts) == 1:
+            return await asyncio.gather(
+                process_individually(texts[0]), return_exceptions=True
             )
+
+        try:
+            batched = await self._extract_with_retries(
+                lambda: self._extract_batch(texts, today)
+            )
+        except AIServiceError as e:
+            return [e] * len(texts)
+        except Exception as e:
+            print(f"Error processing batch of {len(texts)} brain dumps: {e}")
+            batched = BatchedBrainDumps()
+
+        by_index = {
+            indexed.index: indexed.result
+            for indexed in batched.results
+            if 0 <= indexed.index < len(texts)
+        }
+        metrics.increment("ai_batches")
+        metrics.increment("ai_batched_dumps", len(by_index))
+
+        return await asyncio.gather(
+            *(
+                _completed(by_index[index])
+                if index in by_index
+                else process_individually(text)
+                for index, text in enumerate(texts)
+            ),
+            return_exceptions=True,
+        )
+
+    async def _extract_batch(self, texts: List[str], today: str) -> BatchedBrainDumps:
+        """Ask the model to categorize several brain dumps in one request"""
+        system_message = SystemMessage(
+            content=[
+                self.static_system_block,
+                self.batch_system_block,
+                {"type": "text", "text": f"Current date: {today}"},
+            ]
+        )
+        documents = "\n\n".join(
+            f'<brain_dump index="{index}">\n{text}\n</brain_dump>'
+            for index, text in enumerate(texts)
+        )
+        message = await self.llm.ainvoke(
+            [system_message, HumanMessage(content=documents)]
+        )
+        _record_token_usage(message)
+        return self.batch_parser.invoke(message)
+
+    def _chain_for(self, today: str):
+        """The prompt | model chain for ``today``, built once per day"""
+        if self._chain_date != today:
+            system_message = SystemMessage(
+                content=[
+                    self.static_system_block,
+                    {"type": "text", "text": f"Current date: {today}"},
+                ]
+            )
+            prompt = ChatPromptTemplate.from_messages(
+                [system_message, ("human", "{input}")]
+            )
+            self._chain = prompt | self.llm
+            self._chain_date = today
+        return self._chain
+
+    async def _extract(self, text: str, today: str) -> ProcessedBrainDump:
+        """Ask the model to categorize a brain dump"""
+        message = await self._chain_for(today).ainvoke({"input": text})
+        _record_token_usage(message)
+        return self.parser.invoke(message)
+
+
+async def _completed(value: T) -> T:
+    return value
+
+
+def _rate_limited(error: anthropic.RateLimitError) -> AIRateLimitedError:
+    """Translate a provider 429 so the client is told to back off"""
+    retry_after = error.response.headers.get("retry-after")
+    return AIRateLimitedError(
+        "AI provider rate limit reached",
+        retry_after=float(retry_after) if retry_after else None,
+    )
+
+
+def _fallback_result(text: str) -> ProcessedBrainDump:
+    """Treat the whole brain dump as one simple task, marked as degraded"""
+    return ProcessedBrainDump(
+        degraded=True,
+        tasks=[
+            ProcessedTask(
+                description=text[:100] + ("..." if len(text) > 100 else ""),
+                due_date=None,
+                estimated_time_minutes=15,
+                should_decompose=False,
+                reasoning="Error occurred during processing",
+                subtasks=[],
+            )
+        ],
+        shopping_items=[],
+        calendar_events=[],
+    )
+
+
+def _items_of(processed: ProcessedBrainDump):
+    """(field, item) pairs of every item in a processed brain dump"""
+    for field in ITEM_MODELS:
+        for item in getattr(processed, field):
+            yield field, item
+
+
+def _record_token_usage(message: AIMessage) -> None:
+    """Count input/output tokens, including prompt cache reads and writes"""
+    usage = message.usage_metadata
+    if not usage:
+        return
+
+    details = usage.get("input_token_details", {})
+    metrics.increment("ai_requests")
+    metrics.increment("ai_input_tokens", usage["input_tokens"])
+    metrics.increment("ai_output_tokens", usage["output_tokens"])
+    metrics.increment("ai_cache_read_input_tokens", details.get("cache_read", 0))
+    metrics.increment(
+        "ai_cache_creation_input_tokens", details.get("cache_creation", 0)
+    )
@@ -0,0 +1,117 @@
+"""
+Incremental parsing of a streamed brain dump completion
+
+The model writes one JSON object with ``tasks``, ``shopping_items`` and
+``calendar_events`` lists. BrainDumpStreamParser scans each piece of text
+once as it arrives, keeping its place, nesting depth and string state between
+pieces, and hands out a list element as soon as its closing brace arrives.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from langchain_core.utils.json import parse_partial_json
+from pydantic import BaseModel, ValidationError
+from app.models import ProcessedCalendarEvent, ProcessedShoppingItem, ProcessedTask
+
+# ProcessedBrainDump field -> model of one element of that list
+ITEM_MODELS: Dict[str, Type[BaseModel]] = {
+    "tasks": ProcessedTask,
+    "shopping_items": ProcessedShoppingItem,
+    "calendar_events": ProcessedCalendarEvent,
+}
+
+
+def chunk_text(content: Union[str, List[Any]]) -> str:
+    """Text of a streamed message chunk's content"""
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") if isinstance(block, dict) else block for block in content
+    )
+
+
+class BrainDumpStreamParser:
+    """Turns streamed completion text into complete processed items
+
+    Depth 1 is inside the top-level object, depth 2 inside one of its lists
+    and depth 3 inside a list element. Only a finished element is sliced out
+    of the buffer and decoded, so the work per stream is linear in its length.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # Start of the string being scanned and the last one closed at
+        # depth 1, which becomes the current key when a colon follows it
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._field: Optional[str] = None
+        self._element_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Tuple[str, BaseModel]]:
+        """Add streamed text; returns items completed by it"""
+        self._text += text
+        return self._scan()
+
+    def finish(self) -> List[Tuple[str, BaseModel]]:
+        """End of the stream; returns the item cut off by it, if any"""
+        if self._element_start is None:
+            return []
+        # A truncated completion may still hold a usable last element
+        try:
+            element = parse_partial_json(self._text[self._element_start :])
+        except (json.JSONDecodeError, ValueError):
+            return []
+        self._element_start = None
+        return self._validate(element)
+
+    def _scan(self) -> List[Tuple[str, BaseModel]]:
+        items = []
+        text = self._text
+        for position in range(self._position, len(text)):
+            char = text[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = text[self._string_start : position + 1]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char == ":" and self._depth == 1 and self._last_key is not None:
+                self._field = json.loads(self._last_key)
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 3 and char == "{":
+                    self._element_start = position
+            elif char in "}]" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 2 and self._element_start is not None:
+                    element = text[self._element_start : position + 1]
+                    self._element_start = None
+                    try:
+                        items.extend(self._validate(json.loads(element)))
+                    except json.JSONDecodeError as e:
+                        print(f"Skipping malformed {self._field} item from stream: {e}")
+                elif self._depth == 1:
+                    self._field = None
+
+        self._position = len(text)
+        return items
+
+    def _validate(self, element: Any) -> List[Tuple[str, BaseModel]]:
+        if self._field not in ITEM_MODELS:
+            return []
+        try:
+            return [(self._field, ITEM_MODELS[self._field].model_validate(element))]
+        except ValidationError as e:
+            print(f"Skipping invalid {self._field} item from stream: {e}")
+            return []
@@ -0,0 +1,221 @@
+"""
+Bulk import of brain dumps from a JSONL file
+
+Usage (from diane-backend/):
+    python -m app.bulk_import notes.jsonl --user-id 1
+
+Each line is a JSON object {"text": "...", "user_id": 1}; user_id may be left
+out when --user-id is given. Lines are processed in chunks with bounded
+parallelism, and each chunk is saved with one INSERT per table. After every
+chunk the next line number is written to the checkpoint file, so rerunning
+the same command resumes where it stopped. Lines that fail, that only
+produced the degraded fallback, or that cannot be saved (e.g. an unknown
+user_id) are copied to the failed file for a later rerun instead of being
+saved.
+
+A chunk interrupted between its commit and its checkpoint is imported again
+on resume, so keep chunks small when that matters.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.access import brain_dump_access
+from app.models import ProcessedBrainDump
+
+
+@dataclass
+class ImportSummary:
+    imported: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+def read_checkpoint(path: str) -> int:
+    """Line number to resume from (0 when there is no checkpoint yet)"""
+    if not os.path.exists(path):
+        return 0
+    with open(path) as f:
+        return json.load(f)["next_line"]
+
+
+def write_checkpoint(path: str, next_line: int) -> None:
+    """Atomically record that every line before ``next_line`` is done"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump({"next_line": next_line}, f)
+    os.replace(temp_path, path)
+
+
+async def _process_line(
+    ai_service, line: str, default_user_id: Optional[int]
+) -> Tuple[int, str, ProcessedBrainDump]:
+    entry = json.loads(line)
+    user_id = entry.get("user_id", default_user_id)
+    if user_id is None:
+        raise ValueError("Line has no user_id and --user-id was not given")
+
+    processed = await ai_service.process_brain_dump(entry["text"])
+    if processed.degraded:
+        raise ValueError("AI processing failed; only the fallback was produced")
+    return user_id, entry["text"], processed
+
+
+async def _save(
+    session_factory: async_sessionmaker,
+    dumps: List[Tuple[int, str, ProcessedBrainDump]],
+) -> None:
+    async with session_factory() as db:
+        await brain_dump_access.save_processed_brain_dumps(session=db, dumps=dumps)
+        await db.commit()
+
+
+async def _save_chunk(
+    session_factory: async_sessionmaker,
+    processed: List[Tuple[str, Tuple[int, str, ProcessedBrainDump]]],
+) -> List[str]:
+    """Save a chunk's (line, dump) pairs; returns the lines that could not be saved
+
+    The chunk is saved in one transaction. If that fails, each dump is saved
+    on its own so one bad line (e.g. an unknown user_id) does not block the
+    rest of the chunk, or the checkpoint, on every resume.
+    """
+    try:
+        await _save(session_factory, [dump for _, dump in processed])
+        return []
+    except SQLAlchemyError as e:
+        print(f"Failed to save chunk, saving one brain dump at a time: {e}")
+
+    unsaved = []
+    for line, dump in processed:
+        try:
+            await _save(session_factory, [dump])
+        except SQLAlchemyError as e:
+            print(f"Failed to save brain dump: {e}")
+            unsaved.append(line)
+    return unsaved
+
+
+async def import_brain_dumps(
+    path: str,
+    ai_service,
+    session_factory: async_sessionmaker,
+    default_user_id: Optional[int] = None,
+    concurrency: int = 4,
+    chunk_size: int = 100,
+    checkpoint_path: Optional[str] = None,
+    failed_path: Optional[str] = None,
+) -> ImportSummary:
+    """Import every not yet checkpointed line of ``path``"""
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint"
+    failed_path = failed_path or f"{path}.failed"
+    start_line = read_checkpoint(checkpoint_path)
+    summary = ImportSummary(skipped=start_line)
+
+    # Bounds model calls in flight so the import leaves provider capacity
+    # (and connections) for live traffic
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(line: str):
+        async with semaphore:
+            return await _process_line(ai_service, line, default_user_id)
+
+    with open(path) as f:
+        lines = f.read().splitlines()
+
+    for chunk_start in range(start_line, len(lines), chunk_size):
+        chunk = [
+            line
+            for line in lines[chunk_start : chunk_start + chunk_size]
+            if line.strip()
+        ]
+        results = await asyncio.gather(
+            *(process(line) for line in chunk), return_exceptions=True
+        )
+
+        processed: List[Tuple[str, Tuple[int, str, ProcessedBrainDump]]] = []
+        failed_lines: List[str] = []
+        for line, result in zip(chunk, results):
+            if isinstance(result, Exception):
+                print(f"Failed to import brain dump: {result}")
+                failed_lines.append(line)
+            else:
+                processed.append((line, result))
+
+        unsaved = await _save_chunk(session_factory, processed) if processed else []
+        failed_lines.extend(unsaved)
+
+        if failed_lines:
+            with open(failed_path, "a") as failed:
+                failed.write("".join(f"{line}\n" for line in failed_lines))
+
+        summary.imported += len(processed) - len(unsaved)
+        summary.failed += len(failed_lines)
+        next_line = min(chunk_start + chunk_size, len(lines))
+        write_checkpoint(checkpoint_path, next_line)
+        print(
+            f"Imported lines {chunk_start + 1}-{next_line} of {len(lines)} "
+            f"({summary.imported} saved, {summary.failed} failed)"
+        )
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import brain dumps")
+    parser.add_argument("path", help="JSONL file with one brain dump per line")
+    parser.add_argument("--user-id", type=int, help="user_id for lines without one")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="model calls in flight"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=100, help="lines saved per transaction"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=0,
+        help="send up to this many dumps per model request (see AI_BATCH_MAX_SIZE)",
+    )
+    parser.add_argument("--checkpoint", help="default: <path>.checkpoint")
+    parser.add_argument("--failed", help="default: <path>.failed")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.batch_size:
+        os.environ["AI_BATCH_MAX_SIZE"] = str(args.batch_size)
+
+    # Imported late so .env and the options above are applied first
+    from app.ai_service import AIService
+    from app.database import SessionLocal, engine
+
+    async def run():
+        try:
+            return await import_brain_dumps(
+                args.path,
+                AIService(),
+                SessionLocal,
+                default_user_id=args.user_id,
+                concurrency=args.concurrency,
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+                failed_path=args.failed,
+            )
+        finally:
+            await engine.dispose()
+
+    summary = asyncio.run(run())
+    print(
+        f"Done: {summary.imported} imported, {summary.failed} failed, "
+        f"{summary.skipped} lines skipped from an earlier run"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Pluggable key/value caches for expensive results (processed brain dumps,
+serialized list responses)
+
+Values are strings so every backend can store them; callers serialize their
+own objects. The in-process cache is the default; a shared Redis cache can be
+enabled with environment variables when several workers should share results.
+"""
+
+import os
+import sys
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+
+class CacheBackend(ABC):
+    """Interface for an async string cache with per-entry expiry"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """The value stored under ``key``, or None if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key``, replacing any earlier value"""
+
+
+class InMemoryCache(CacheBackend):
+    """In-process cache with a TTL and least-recently-used eviction
+
+    Holds at most ``max_entries`` entries and, if ``max_bytes`` is set, at
+    most that much memory in keys and values; the least recently used
+    entries are evicted to stay within both.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        # key -> (expires_at, value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory held by the cached keys and values"""
+        return self._bytes
+
+    @staticmethod
+    def _entry_bytes(key: str, value: str) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(value)
+
+    def _discard(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= self._entry_bytes(key, value)
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self._discard(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        if key in self._entries:
+            self._discard(key)
+
+        size = self._entry_bytes(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Would evict everything else and still not fit
+            return
+
+        self._entries[key] = (self._clock() + self.ttl_seconds, value)
+        self._bytes += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            self._discard(next(iter(self._entries)))
+
+
+class RedisCache(CacheBackend):
+    """Cache shared between processes, backed by Redis
+
+    Requires the optional ``redis`` package. Redis handles expiry; LRU
+    eviction follows the server's ``maxmemory-policy``. Connection errors are
+    treated as cache misses so an unavailable Redis never fails a request.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 3600, prefix: str = "diane:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ValueError(
+                "RedisCache requires the redis package (pip install redis)"
+            ) from e
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await self.client.get(self.prefix + key)
+        except Exception as e:
+            print(f"Error reading from Redis cache: {e}")
+            return None
+
+    async def set(self, key: str, value: str) -> None:
+        try:
+            await self.client.set(
+                self.prefix + key, value, px=int(self.ttl_seconds * 1000)
+            )
+        except Exception as e:
+            print(f"Error writing to Redis cache: {e}")
+
+
+def create_cache_from_env(
+    prefix: str, max_entries: int = 1024, max_bytes: Optional[int] = None
+) -> Optional[CacheBackend]:
+    """Build the cache configured by ``<prefix>_BACKEND`` and friends
+
+    ``<prefix>_BACKEND`` is ``memory`` (default), ``redis`` or ``none``.
+    ``<prefix>_TTL_SECONDS``, ``<prefix>_MAX_ENTRIES`` and
+    ``<prefix>_MAX_BYTES`` size the in-memory cache (the last two default to
+    ``max_entries`` and ``max_bytes``); the Redis backend connects to
+    ``REDIS_URL``.
+    """
+    backend = os.getenv(f"{prefix}_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv(f"{prefix}_TTL_SECONDS", "3600"))
+
+    if backend == "none":
+        return None
+    if backend == "memory":
+        max_entries = int(os.getenv(f"{prefix}_MAX_ENTRIES", str(max_entries)))
+        max_bytes_env = os.getenv(f"{prefix}_MAX_BYTES")
+        if max_bytes_env:
+            max_bytes = int(max_bytes_env)
+        return InMemoryCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds, max_bytes=max_bytes
+        )
+    if backend == "redis":
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            raise ValueError("REDIS_URL not found in environment variables")
+        return RedisCache(
+            redis_url, ttl_seconds=ttl_seconds, prefix=f"diane:{prefix.lower()}:"
+        )
+
+    raise ValueError(f"Unknown {prefix}_BACKEND: {backend}")
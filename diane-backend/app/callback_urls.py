@@ -0,0 +1,92 @@
+"""
+Checks for user-supplied callback URLs
+
+The server POSTs finished jobs to these URLs, so an unchecked one would let
+a client make it call internal services or the cloud metadata endpoint
+(169.254.169.254). Callbacks must use https, may be limited to the hosts in
+CALLBACK_ALLOWED_HOSTS (comma-separated), and must resolve only to public
+addresses. The request is then sent to the address that was checked, so a
+second DNS lookup cannot point it somewhere else.
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+from typing import FrozenSet
+from urllib.parse import urlsplit
+
+
+class UnsafeCallbackURLError(ValueError):
+    """Raised for a callback URL the server must not call"""
+
+
+def allowed_hosts() -> FrozenSet[str]:
+    """Hosts from CALLBACK_ALLOWED_HOSTS; empty means any public host"""
+    hosts = os.getenv("CALLBACK_ALLOWED_HOSTS", "")
+    return frozenset(host.strip().lower() for host in hosts.split(",") if host.strip())
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_url(url: str) -> str:
+    """Reject a callback URL by its text alone; returns its host
+
+    Raises:
+        UnsafeCallbackURLError: if the URL is not https, its host is not
+            allowed, or it is a literal non-public IP address
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if parts.scheme != "https":
+        raise UnsafeCallbackURLError("Callback URL must use https")
+    if not host:
+        raise UnsafeCallbackURLError("Callback URL has no host")
+
+    hosts = allowed_hosts()
+    if hosts and host not in hosts:
+        raise UnsafeCallbackURLError(f"Callback host {host} is not allowed")
+
+    try:
+        public = _is_public(host)
+    except ValueError:
+        # A name rather than an address; checked once it is resolved
+        return host
+    if not public:
+        raise UnsafeCallbackURLError(f"Callback address {host} is not public")
+    return host
+
+
+async def resolve_callback_host(url: str) -> str:
+    """Check ``url`` and resolve its host to a public address to connect to
+
+    Every address the name resolves to must be public, so a name with one
+    public and one internal record is refused too.
+
+    Raises:
+        UnsafeCallbackURLError: if the URL fails check_callback_url, cannot
+            be resolved, or resolves to a non-public address
+    """
+    host = check_callback_url(url)
+    port = urlsplit(url).port or 443
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as e:
+        raise UnsafeCallbackURLError(f"Cannot resolve callback host {host}: {e}")
+
+    addresses = [info[4][0] for info in infos]
+    if not addresses:
+        raise UnsafeCallbackURLError(f"Cannot resolve callback host {host}")
+    for address in addresses:
+        if not _is_public(address):
+            raise UnsafeCallbackURLError(
+                f"Callback host {host} resolves to non-public address {address}"
+            )
+    return addresses[0]
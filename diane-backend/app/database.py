@@ -1,45 +1,100 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from app.db_models import Base
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in environment variables")
 
-engine = create_engine(
-    DATABASE_URL,
+# Async drivers used in place of the sync ones configured in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a sync database URL to use the matching async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Unsupported database backend for async engine: {backend}")
+
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    # asyncpg spells libpq's sslmode as ssl (e.g. Supabase's ?sslmode=require)
+    if backend == "postgresql" and "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+
+    return parsed.render_as_string(hide_password=False)
+
+
+def enable_sqlite_foreign_keys(sync_engine: Engine) -> None:
+    """Make SQLite enforce foreign keys, including ON DELETE CASCADE
+
+    SQLite ignores them unless every connection turns them on, and deletes
+    rely on the database cascading to subtasks.
+    """
+
+    @event.listens_for(sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+engine = create_async_engine(
+    to_async_url(DATABASE_URL),
     echo=False,
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if engine.dialect.name == "sqlite":
+    enable_sqlite_foreign_keys(engine.sync_engine)
+
+# expire_on_commit=False so ORM objects stay readable after commit without
+# triggering implicit (and unsupported) async refreshes
+SessionLocal = async_sessionmaker(
+    bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 
-def init_db():
+async def init_db():
     """Create all database tables. Call this on app startup."""
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
 
 
-def get_db():
+def get_session_factory():
+    """Dependency for routes that open their own short-lived sessions
+
+    Used where a request outlives a single transaction (e.g. streaming
+    responses) so each unit of work gets its own session.
+    """
+    return SessionLocal
+
+
+async def get_db():
     """Dependency for basic database session - caller manages transactions"""
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_db_transactional():
+async def get_db_transactional():
     """Database session with automatic commit/rollback"""
-    db = SessionLocal()
-    try:
-        yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+    async with SessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
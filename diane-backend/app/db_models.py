@@ -2,13 +2,22 @@
 SQLAlchemy ORM models for database tables
 """
 
-from sqlalchemy import String, Text, Date, Time, ForeignKey, TIMESTAMP
+from sqlalchemy import String, Text, Date, Time, ForeignKey, Index, TIMESTAMP, false
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
+from sqlalchemy.sql.functions import now
 from datetime import datetime, date, time
 from typing import Optional
 
 
+@compiles(now, "sqlite")
+def _sqlite_now(element, compiler, **kw):
+    """Render now() on SQLite in the same microsecond format SQLAlchemy binds
+    datetimes with, so server-set timestamps compare correctly with cursors"""
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 class Base(DeclarativeBase):
     pass
 
@@ -25,15 +34,37 @@ class User(Base):
 
     # Relationships
     tasks: Mapped[list["Task"]] = relationship(
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
     shopping_items: Mapped[list["ShoppingItem"]] = relationship(
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
     )
     calendar_events: Mapped[list["CalendarEvent"]] = relationship(
-        back_populates="user", cascade="all, delete-orphan"
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+    brain_dumps: Mapped[list["BrainDump"]] = relationship(
+        back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+
+class BrainDump(Base):
+    """The original text of a brain dump, stored once and referenced by the
+    tasks, shopping items and calendar events extracted from it"""
+
+    __tablename__ = "brain_dumps"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), index=True
+    )
+    raw_input: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
     )
 
+    # Relationships
+    user: Mapped["User"] = relationship(back_populates="brain_dumps")
+
 
 class Task(Base):
     __tablename__ = "tasks"
@@ -44,15 +75,25 @@ class Task(Base):
     due_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
     estimated_time_minutes: Mapped[Optional[int]] = mapped_column(nullable=True)
     completed: Mapped[bool] = mapped_column(default=False, server_default="false")
-    raw_input: Mapped[str] = mapped_column(Text)
+    brain_dump_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("brain_dumps.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="tasks")
+    # passive_deletes: ON DELETE CASCADE removes subtasks, so deleting a
+    # task never loads them
     subtasks: Mapped[list["SubTask"]] = relationship(
-        back_populates="parent_task", cascade="all, delete-orphan"
+        back_populates="parent_task",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="SubTask.order, SubTask.id",
     )
 
 
@@ -63,10 +104,15 @@ class ShoppingItem(Base):
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     description: Mapped[str] = mapped_column(Text)
     completed: Mapped[bool] = mapped_column(default=False, server_default="false")
-    raw_input: Mapped[str] = mapped_column(Text)
+    brain_dump_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("brain_dumps.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="shopping_items")
@@ -80,10 +126,15 @@ class CalendarEvent(Base):
     description: Mapped[str] = mapped_column(Text)
     event_date: Mapped[date] = mapped_column(Date)
     event_time: Mapped[Optional[time]] = mapped_column(Time, nullable=True)
-    raw_input: Mapped[str] = mapped_column(Text)
+    brain_dump_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("brain_dumps.id", ondelete="SET NULL"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     user: Mapped["User"] = relationship(back_populates="calendar_events")
@@ -104,6 +155,108 @@ class SubTask(Base):
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
 
     # Relationships
     parent_task: Mapped["Task"] = relationship(back_populates="subtasks")
+
+
+class Tombstone(Base):
+    """Record of a deleted task, subtask, shopping item or calendar event
+
+    Rows are deleted outright; the tombstone written in the same transaction
+    is what tells syncing clients to drop their copy.
+    """
+
+    __tablename__ = "tombstones"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # Table name of the deleted row, e.g. "subtasks"
+    entity_type: Mapped[str] = mapped_column(String(32))
+    entity_id: Mapped[int] = mapped_column()
+    deleted_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now()
+    )
+
+
+class CollectionVersion(Base):
+    """Change counter for one of a user's lists
+
+    ``collection`` is ``tasks`` (which includes their subtasks),
+    ``shopping_items`` or ``calendar_events``. Every access function that
+    writes to a list bumps its counter in the same transaction, and the list
+    endpoints build their ETags from it.
+    """
+
+    __tablename__ = "collection_versions"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    collection: Mapped[str] = mapped_column(String(32), primary_key=True)
+    version: Mapped[int] = mapped_column()
+
+
+# Indexes matching the list queries in app/access. Every list filters by user
+# and reads rows in its keyset order (see SortKey lists), so each index leads
+# with user_id followed by the sort columns; descending orders scan backwards.
+# The partial indexes only hold incomplete rows, which is what the list
+# screens filter on; queries must compare ``completed == false()`` (inlined
+# literal, not a bound parameter) for the planner to match the predicate.
+_INCOMPLETE_TASKS = {
+    "postgresql_where": Task.completed == false(),
+    "sqlite_where": Task.completed == false(),
+}
+_INCOMPLETE_SHOPPING_ITEMS = {
+    "postgresql_where": ShoppingItem.completed == false(),
+    "sqlite_where": ShoppingItem.completed == false(),
+}
+
+Index("ix_tasks_user_id_created_at", Task.user_id, Task.created_at, Task.id)
+Index("ix_tasks_user_id_due_date", Task.user_id, Task.due_date, Task.id)
+Index(
+    "ix_tasks_incomplete_user_id_created_at",
+    Task.user_id,
+    Task.created_at,
+    Task.id,
+    **_INCOMPLETE_TASKS,
+)
+Index(
+    "ix_tasks_incomplete_user_id_due_date",
+    Task.user_id,
+    Task.due_date,
+    Task.id,
+    **_INCOMPLETE_TASKS,
+)
+Index("ix_shopping_items_user_id", ShoppingItem.user_id, ShoppingItem.id)
+Index(
+    "ix_shopping_items_incomplete_user_id",
+    ShoppingItem.user_id,
+    ShoppingItem.id,
+    **_INCOMPLETE_SHOPPING_ITEMS,
+)
+Index(
+    "ix_calendar_events_user_id_event_date",
+    CalendarEvent.user_id,
+    CalendarEvent.event_date,
+    CalendarEvent.event_time,
+    CalendarEvent.id,
+)
+Index("idx_subtasks_parent_task_id", SubTask.parent_task_id)
+
+# Delta sync reads each user's rows changed after a timestamp
+Index("ix_tasks_user_id_updated_at", Task.user_id, Task.updated_at)
+Index(
+    "ix_shopping_items_user_id_updated_at",
+    ShoppingItem.user_id,
+    ShoppingItem.updated_at,
+)
+Index(
+    "ix_calendar_events_user_id_updated_at",
+    CalendarEvent.user_id,
+    CalendarEvent.updated_at,
+)
+Index("ix_tombstones_user_id_deleted_at", Tombstone.user_id, Tombstone.deleted_at)
@@ -0,0 +1,173 @@
+"""
+Background job queue for work that should not hold an HTTP request open
+
+Submitted work goes into a bounded in-process queue drained by a fixed pool
+of worker tasks. Job status and results are kept in a CacheBackend: in-process
+by default, or Redis (BRAIN_DUMP_JOB_STORE_BACKEND=redis) so any API worker
+can answer status polls. The work itself always runs in the process that
+accepted it.
+"""
+
+import asyncio
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, List, Optional
+import httpx
+from pydantic import BaseModel
+from app.cache import CacheBackend, InMemoryCache, create_cache_from_env
+from app.callback_urls import UnsafeCallbackURLError, resolve_callback_host
+from app.models import JobStatus
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class Job(BaseModel):
+    """Stored state of one job; ``result`` is the JSON of the work's return value"""
+
+    id: str
+    status: JobStatus
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    callback_url: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+
+class JobQueue:
+    """Bounded queue of async work items processed by a pool of workers"""
+
+    def __init__(
+        self,
+        store: Optional[CacheBackend] = None,
+        workers: int = 4,
+        max_queue_size: int = 100,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.store = store if store is not None else InMemoryCache()
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """Configured by BRAIN_DUMP_JOB_WORKERS, BRAIN_DUMP_JOB_QUEUE_SIZE and
+        BRAIN_DUMP_JOB_STORE_* (see app.cache.create_cache_from_env)"""
+        return cls(
+            store=create_cache_from_env("BRAIN_DUMP_JOB_STORE"),
+            workers=int(os.getenv("BRAIN_DUMP_JOB_WORKERS", "4")),
+            max_queue_size=int(os.getenv("BRAIN_DUMP_JOB_QUEUE_SIZE", "100")),
+        )
+
+    def _start(self) -> None:
+        """Create the queue and workers on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still queued are abandoned"""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+
+    async def submit(
+        self,
+        work: Callable[[], Awaitable[BaseModel]],
+        callback_url: Optional[str] = None,
+    ) -> Job:
+        """Queue ``work`` and return its pending job without waiting for it
+
+        Raises:
+            QueueFullError: if max_queue_size jobs are already waiting
+        """
+        if self._queue is None:
+            self._start()
+        if self._queue.full():
+            raise QueueFullError("Job queue is full")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            status=JobStatus.PENDING,
+            callback_url=callback_url,
+            created_at=datetime.now(timezone.utc),
+        )
+        await self._save(job)
+        self._queue.put_nowait((job.id, work))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Job]:
+        value = await self.store.get(job_id)
+        return Job.model_validate_json(value) if value is not None else None
+
+    async def _save(self, job: Job) -> None:
+        await self.store.set(job.id, job.model_dump_json())
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, work = await self._queue.get()
+            try:
+                await self._run(job_id, work)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str, work: Callable[[], Awaitable[BaseModel]]):
+        job = await self.get(job_id)
+        if job is None:
+            # Expired or evicted from the store before it was picked up
+            return
+
+        job.status = JobStatus.RUNNING
+        await self._save(job)
+
+        try:
+            result = await work()
+            job.status = JobStatus.SUCCEEDED
+            job.result = result.model_dump(mode="json")
+        except Exception as e:
+            print(f"Error running job {job_id}: {e}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+
+        job.completed_at = datetime.now(timezone.utc)
+        await self._save(job)
+
+        if job.callback_url:
+            await self._notify(job)
+
+    async def _notify(self, job: Job) -> None:
+        """POST the finished job to its callback URL; failures are only logged
+
+        The URL was checked when the job was submitted, but its host is
+        resolved and checked again here and the request goes to the checked
+        address (with the original Host header and TLS server name), so DNS
+        cannot redirect it to an internal service in between.
+        """
+        try:
+            address = await resolve_callback_host(job.callback_url)
+            url = httpx.URL(job.callback_url)
+            async with httpx.AsyncClient(timeout=10) as client:
+                response = await client.post(
+                    url.copy_with(host=address),
+                    json=job.model_dump(mode="json", exclude={"callback_url"}),
+                    headers={"Host": url.netloc.decode("ascii")},
+                    extensions={"sni_hostname": url.host},
+                )
+                response.raise_for_status()
+        except (UnsafeCallbackURLError, httpx.HTTPError) as e:
+            print(f"Error calling back for job {job.id}: {e}")
+
+
+job_queue = JobQueue.from_env()
+
+
+def get_job_queue() -> JobQueue:
+    """Dependency for routes that submit or poll background jobs"""
+    return job_queue
@@ -3,12 +3,23 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+import os
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import auth, brain_dumps, tasks, shopping_items, calendar_events
-from app.database import init_db
+from app.routes import (
+    auth,
+    brain_dumps,
+    tasks,
+    shopping_items,
+    calendar_events,
+    metrics,
+    sync,
+)
+from app.database import engine, init_db
+from app.jobs import job_queue
+from app.routes.pagination import NEXT_CURSOR_HEADER
 
 
 @asynccontextmanager
@@ -16,15 +27,22 @@ async def lifespan(app: FastAPI):
     """Lifespan event handler for startup and shutdown"""
     # Startup: Initialize database tables
     try:
-        init_db()
+        await init_db()
         print("✓ Database connected and initialized")
     except Exception as e:
         print(f"⚠ Warning: Could not connect to database: {e}")
         print("  Server will start but database operations will fail.")
         print("  Please check your DATABASE_URL and ensure Supabase is unpaused.")
 
+    # The AI service is otherwise built by the first brain dump request
+    if os.getenv("AI_WARM_UP", "false").lower() == "true":
+        brain_dumps.get_ai_service()
+        print("✓ AI service warmed up")
+
     yield
-    # Shutdown: Add cleanup code here if needed
+    # Shutdown: Stop background job workers and release pooled connections
+    await job_queue.stop()
+    await engine.dispose()
 
 
 # Initialize FastAPI app
@@ -43,6 +61,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Include routers
@@ -51,6 +70,8 @@ app.include_router(brain_dumps.router)
 app.include_router(tasks.router)
 app.include_router(shopping_items.router)
 app.include_router(calendar_events.router)
+app.include_router(sync.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -0,0 +1,36 @@
+"""
+In-process counters for operational metrics (token usage, cache hits, ...)
+
+Counters are per worker process and reset on restart; GET /metrics returns
+the current values.
+"""
+
+import threading
+from typing import Dict
+
+
+class Metrics:
+    """Thread-safe named counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = Metrics()
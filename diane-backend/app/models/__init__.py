@@ -7,10 +7,18 @@ from app.models.requests import (
     UserLoginRequest,
     UserSignupRequest,
     BrainDumpRequest,
+    BrainDumpJobRequest,
     TaskUpdateRequest,
+    TaskBatchUpdate,
     SubTaskUpdateRequest,
+    SubTaskBatchUpdate,
+    SubtaskInclusion,
     ShoppingItemUpdateRequest,
+    ShoppingItemBatchUpdate,
     CalendarEventUpdateRequest,
+    CalendarEventBatchUpdate,
+    BatchUpdateRequest,
+    MAX_BATCH_SIZE,
 )
 
 # Response models
@@ -18,14 +26,26 @@ from app.models.responses import (
     UserResponse,
     TaskResponse,
     SubTaskResponse,
+    SubTaskSummary,
     ShoppingItemResponse,
     CalendarEventResponse,
     BrainDumpResponse,
+    BrainDumpSourceResponse,
+    BrainDumpJobResponse,
+    JobStatus,
+    Page,
+    BatchItemResult,
+    BatchItemStatus,
+    BatchUpdateResponse,
+    SyncDeletions,
+    SyncResponse,
 )
 
 # AI processing models
 from app.models.ai import (
     ProcessedBrainDump,
+    IndexedBrainDump,
+    BatchedBrainDumps,
     ProcessedTask,
     ProcessedShoppingItem,
     ProcessedCalendarEvent,
@@ -37,19 +57,39 @@ __all__ = [
     "UserLoginRequest",
     "UserSignupRequest",
     "BrainDumpRequest",
+    "BrainDumpJobRequest",
     "TaskUpdateRequest",
+    "TaskBatchUpdate",
     "SubTaskUpdateRequest",
+    "SubTaskBatchUpdate",
+    "SubtaskInclusion",
     "ShoppingItemUpdateRequest",
+    "ShoppingItemBatchUpdate",
     "CalendarEventUpdateRequest",
+    "CalendarEventBatchUpdate",
+    "BatchUpdateRequest",
+    "MAX_BATCH_SIZE",
     # Responses
     "UserResponse",
     "TaskResponse",
     "SubTaskResponse",
+    "SubTaskSummary",
     "ShoppingItemResponse",
     "CalendarEventResponse",
     "BrainDumpResponse",
+    "BrainDumpSourceResponse",
+    "BrainDumpJobResponse",
+    "JobStatus",
+    "Page",
+    "BatchItemResult",
+    "BatchItemStatus",
+    "BatchUpdateResponse",
+    "SyncDeletions",
+    "SyncResponse",
     # AI Processing
     "ProcessedBrainDump",
+    "IndexedBrainDump",
+    "BatchedBrainDumps",
     "ProcessedTask",
     "ProcessedShoppingItem",
     "ProcessedCalendarEvent",
@@ -1,5 +1,7 @@
 from app.models.ai.processing import (
     ProcessedBrainDump,
+    IndexedBrainDump,
+    BatchedBrainDumps,
     ProcessedTask,
     ProcessedShoppingItem,
     ProcessedCalendarEvent,
@@ -8,6 +10,8 @@ from app.models.ai.processing import (
 
 __all__ = [
     "ProcessedBrainDump",
+    "IndexedBrainDump",
+    "BatchedBrainDumps",
     "ProcessedTask",
     "ProcessedShoppingItem",
     "ProcessedCalendarEvent",
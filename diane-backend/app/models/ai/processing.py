@@ -1,4 +1,5 @@
 from pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from typing import Optional, List
 
 
@@ -59,3 +60,21 @@ class ProcessedBrainDump(BaseModel):
         default_factory=list,
         description="Calendar events extracted from the brain dump",
     )
+    # Set by AIService (never by the model, so it is left out of the schema
+    # in the format instructions) when the result is the fallback task
+    degraded: SkipJsonSchema[bool] = False
+
+
+class IndexedBrainDump(BaseModel):
+    """Result for one brain dump of a batched request"""
+
+    index: int = Field(description="Index of the brain dump this result is for")
+    result: ProcessedBrainDump
+
+
+class BatchedBrainDumps(BaseModel):
+    """Results of several brain dumps processed in one request"""
+
+    results: List[IndexedBrainDump] = Field(
+        default_factory=list, description="One result per brain dump, by index"
+    )
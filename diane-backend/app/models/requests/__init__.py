@@ -1,15 +1,36 @@
 from app.models.requests.auth import UserLoginRequest, UserSignupRequest
-from app.models.requests.brain_dump import BrainDumpRequest
-from app.models.requests.task import TaskUpdateRequest, SubTaskUpdateRequest
-from app.models.requests.shopping_item import ShoppingItemUpdateRequest
-from app.models.requests.calendar_event import CalendarEventUpdateRequest
+from app.models.requests.brain_dump import BrainDumpRequest, BrainDumpJobRequest
+from app.models.requests.task import (
+    TaskUpdateRequest,
+    TaskBatchUpdate,
+    SubTaskUpdateRequest,
+    SubTaskBatchUpdate,
+    SubtaskInclusion,
+)
+from app.models.requests.shopping_item import (
+    ShoppingItemUpdateRequest,
+    ShoppingItemBatchUpdate,
+)
+from app.models.requests.calendar_event import (
+    CalendarEventUpdateRequest,
+    CalendarEventBatchUpdate,
+)
+from app.models.requests.batch import BatchUpdateRequest, MAX_BATCH_SIZE
 
 __all__ = [
     "UserLoginRequest",
     "UserSignupRequest",
     "BrainDumpRequest",
+    "BrainDumpJobRequest",
     "TaskUpdateRequest",
+    "TaskBatchUpdate",
     "SubTaskUpdateRequest",
+    "SubTaskBatchUpdate",
+    "SubtaskInclusion",
     "ShoppingItemUpdateRequest",
+    "ShoppingItemBatchUpdate",
     "CalendarEventUpdateRequest",
+    "CalendarEventBatchUpdate",
+    "BatchUpdateRequest",
+    "MAX_BATCH_SIZE",
 ]
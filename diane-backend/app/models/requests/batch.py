@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Generic, List, TypeVar
+
+# Largest number of rows one batch request may change
+MAX_BATCH_SIZE = 500
+
+U = TypeVar("U", bound=BaseModel)
+
+
+class BatchUpdateRequest(BaseModel, Generic[U]):
+    """Changes for many rows, applied together in one transaction
+
+    Each entry is an ``id`` plus the fields to change for that row; fields
+    left out are not touched.
+    """
+
+    updates: List[U] = Field(min_length=1, max_length=MAX_BATCH_SIZE)
+
+    @field_validator("updates")
+    @classmethod
+    def ids_are_unique(cls, updates: List[U]) -> List[U]:
+        ids = [update.id for update in updates]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Each id may only appear once per batch")
+        return updates
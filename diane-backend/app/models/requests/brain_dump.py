@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import AnyHttpUrl, BaseModel, field_validator
+from app.callback_urls import check_callback_url
 
 
 class BrainDumpRequest(BaseModel):
@@ -6,3 +8,17 @@ class BrainDumpRequest(BaseModel):
 
     text: str
     user_id: int
+
+
+class BrainDumpJobRequest(BrainDumpRequest):
+    """Brain dump to process in the background"""
+
+    callback_url: Optional[AnyHttpUrl] = None
+
+    @field_validator("callback_url")
+    @classmethod
+    def callback_url_is_safe(cls, value: Optional[AnyHttpUrl]):
+        """https only, and not an internal address (see app.callback_urls)"""
+        if value is not None:
+            check_callback_url(str(value))
+        return value
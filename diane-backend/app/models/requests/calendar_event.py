@@ -9,3 +9,9 @@ class CalendarEventUpdateRequest(BaseModel):
     description: Optional[str] = None
     event_date: Optional[date] = None
     event_time: Optional[time] = None
+
+
+class CalendarEventBatchUpdate(CalendarEventUpdateRequest):
+    """Changes for one calendar event within a batch update"""
+
+    id: int
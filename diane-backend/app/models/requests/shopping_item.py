@@ -7,3 +7,9 @@ class ShoppingItemUpdateRequest(BaseModel):
 
     description: Optional[str] = None
     completed: Optional[bool] = None
+
+
+class ShoppingItemBatchUpdate(ShoppingItemUpdateRequest):
+    """Changes for one shopping item within a batch update"""
+
+    id: int
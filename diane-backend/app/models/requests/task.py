@@ -1,8 +1,17 @@
+from enum import Enum
 from pydantic import BaseModel
 from typing import Optional
 from datetime import date
 
 
+class SubtaskInclusion(str, Enum):
+    """How much subtask data to return alongside tasks"""
+
+    NONE = "false"
+    FULL = "true"
+    SUMMARY = "summary"
+
+
 class TaskUpdateRequest(BaseModel):
     """Request model for updating a task"""
 
@@ -12,6 +21,12 @@ class TaskUpdateRequest(BaseModel):
     completed: Optional[bool] = None
 
 
+class TaskBatchUpdate(TaskUpdateRequest):
+    """Changes for one task within a batch update"""
+
+    id: int
+
+
 class SubTaskUpdateRequest(BaseModel):
     """Request model for updating a subtask"""
 
@@ -19,3 +34,9 @@ class SubTaskUpdateRequest(BaseModel):
     due_date: Optional[date] = None
     estimated_time_minutes: Optional[int] = None
     completed: Optional[bool] = None
+
+
+class SubTaskBatchUpdate(SubTaskUpdateRequest):
+    """Changes for one subtask within a batch update"""
+
+    id: int
@@ -1,14 +1,36 @@
 from app.models.responses.user import UserResponse
-from app.models.responses.task import TaskResponse, SubTaskResponse
+from app.models.responses.task import TaskResponse, SubTaskResponse, SubTaskSummary
 from app.models.responses.shopping_item import ShoppingItemResponse
 from app.models.responses.calendar_event import CalendarEventResponse
-from app.models.responses.brain_dump import BrainDumpResponse
+from app.models.responses.brain_dump import (
+    BrainDumpResponse,
+    BrainDumpSourceResponse,
+    BrainDumpJobResponse,
+    JobStatus,
+)
+from app.models.responses.pagination import Page
+from app.models.responses.batch import (
+    BatchItemResult,
+    BatchItemStatus,
+    BatchUpdateResponse,
+)
+from app.models.responses.sync import SyncDeletions, SyncResponse
 
 __all__ = [
     "UserResponse",
     "TaskResponse",
     "SubTaskResponse",
+    "SubTaskSummary",
     "ShoppingItemResponse",
     "CalendarEventResponse",
     "BrainDumpResponse",
+    "BrainDumpSourceResponse",
+    "BrainDumpJobResponse",
+    "JobStatus",
+    "Page",
+    "BatchItemResult",
+    "BatchItemStatus",
+    "BatchUpdateResponse",
+    "SyncDeletions",
+    "SyncResponse",
 ]
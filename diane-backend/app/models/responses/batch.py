@@ -0,0 +1,26 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+from enum import Enum
+
+T = TypeVar("T")
+
+
+class BatchItemStatus(str, Enum):
+    """Outcome for one row of a batch update"""
+
+    UPDATED = "updated"
+    NOT_FOUND = "not_found"
+
+
+class BatchItemResult(BaseModel, Generic[T]):
+    """Result for one id of a batch update; ``item`` is set when it was updated"""
+
+    id: int
+    status: BatchItemStatus
+    item: Optional[T] = None
+
+
+class BatchUpdateResponse(BaseModel, Generic[T]):
+    """Per-item results of a batch update, in request order"""
+
+    results: List[BatchItemResult[T]] = Field(default_factory=list)
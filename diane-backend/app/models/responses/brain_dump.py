@@ -1,13 +1,49 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional
+from datetime import datetime
+from enum import Enum
 from app.models.responses.task import TaskResponse
 from app.models.responses.shopping_item import ShoppingItemResponse
 from app.models.responses.calendar_event import CalendarEventResponse
 
 
+class BrainDumpSourceResponse(BaseModel):
+    """The stored text of a brain dump that items were extracted from"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    raw_input: str
+    created_at: datetime
+
+
 class BrainDumpResponse(BaseModel):
     """Response after processing and saving a brain dump"""
 
+    brain_dump: Optional[BrainDumpSourceResponse] = None
     tasks: List[TaskResponse] = Field(default_factory=list)
     shopping_items: List[ShoppingItemResponse] = Field(default_factory=list)
     calendar_events: List[CalendarEventResponse] = Field(default_factory=list)
+    # True when AI processing failed and the whole dump was saved as one task
+    degraded: bool = False
+
+
+class JobStatus(str, Enum):
+    """Lifecycle of a background brain dump job"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class BrainDumpJobResponse(BaseModel):
+    """Status of a brain dump processed in the background"""
+
+    id: str
+    status: JobStatus
+    result: Optional[BrainDumpResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
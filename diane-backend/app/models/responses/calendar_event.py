@@ -13,5 +13,6 @@ class CalendarEventResponse(BaseModel):
     description: str
     event_date: date
     event_time: Optional[time] = None
-    raw_input: str
+    brain_dump_id: Optional[int] = None
     created_at: datetime
+    updated_at: datetime
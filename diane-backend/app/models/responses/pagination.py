@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """One page of a list query and the cursor for the page after it"""
+
+    items: List[T] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
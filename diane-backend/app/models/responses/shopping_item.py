@@ -1,4 +1,5 @@
 from pydantic import BaseModel, ConfigDict
+from typing import Optional
 from datetime import datetime
 
 
@@ -11,5 +12,6 @@ class ShoppingItemResponse(BaseModel):
     user_id: int
     description: str
     completed: bool = False
-    raw_input: str
+    brain_dump_id: Optional[int] = None
     created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List
+from app.models.responses.task import TaskResponse, SubTaskResponse
+from app.models.responses.shopping_item import ShoppingItemResponse
+from app.models.responses.calendar_event import CalendarEventResponse
+
+
+class SyncDeletions(BaseModel):
+    """Ids deleted since the sync token, per entity type"""
+
+    tasks: List[int] = Field(default_factory=list)
+    subtasks: List[int] = Field(default_factory=list)
+    shopping_items: List[int] = Field(default_factory=list)
+    calendar_events: List[int] = Field(default_factory=list)
+
+
+class SyncResponse(BaseModel):
+    """Rows created, updated or deleted since the sync token
+
+    Tasks come without nested subtasks; changed subtasks are listed on their
+    own. Pass ``next_since`` as ``since`` on the next sync.
+    """
+
+    tasks: List[TaskResponse] = Field(default_factory=list)
+    subtasks: List[SubTaskResponse] = Field(default_factory=list)
+    shopping_items: List[ShoppingItemResponse] = Field(default_factory=list)
+    calendar_events: List[CalendarEventResponse] = Field(default_factory=list)
+    deleted: SyncDeletions = Field(default_factory=SyncDeletions)
+    next_since: str
@@ -16,6 +16,14 @@ class SubTaskResponse(BaseModel):
     order: int
     completed: bool
     created_at: datetime
+    updated_at: datetime
+
+
+class SubTaskSummary(BaseModel):
+    """Subtask counts for a task, used when full subtasks are not requested"""
+
+    total: int = 0
+    completed: int = 0
 
 
 class TaskResponse(BaseModel):
@@ -27,6 +35,8 @@ class TaskResponse(BaseModel):
     due_date: Optional[date] = None
     estimated_time_minutes: Optional[int] = None
     completed: bool = False
-    raw_input: str
+    brain_dump_id: Optional[int] = None
     subtasks: Optional[List[SubTaskResponse]] = None
+    subtask_summary: Optional[SubTaskSummary] = None
     created_at: datetime
+    updated_at: datetime
@@ -0,0 +1,35 @@
+"""
+Shared handling of batch update requests
+"""
+
+from typing import Any, Dict, List, Tuple, TypeVar
+from app.models import (
+    BatchItemResult,
+    BatchItemStatus,
+    BatchUpdateRequest,
+    BatchUpdateResponse,
+)
+
+T = TypeVar("T")
+
+
+def batch_changes(request: BatchUpdateRequest) -> List[Tuple[int, Dict[str, Any]]]:
+    """(id, fields to change) for every entry of a batch request"""
+    return [
+        (update.id, update.model_dump(exclude_unset=True, exclude={"id"}))
+        for update in request.updates
+    ]
+
+
+def batch_response(
+    request: BatchUpdateRequest, updated: Dict[int, T]
+) -> BatchUpdateResponse[T]:
+    """One result per requested id, in request order"""
+    return BatchUpdateResponse(
+        results=[
+            BatchItemResult(id=update.id, status=BatchItemStatus.UPDATED, item=item)
+            if (item := updated.get(update.id)) is not None
+            else BatchItemResult(id=update.id, status=BatchItemStatus.NOT_FOUND)
+            for update in request.updates
+        ]
+    )
@@ -1,112 +1,217 @@
+import json
+import math
+from typing import TYPE_CHECKING, AsyncIterator, Optional, Union
 from fastapi import APIRouter, HTTPException, Depends
-from datetime import datetime
-from typing import Union, List
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from app.models import (
     BrainDumpRequest,
+    BrainDumpJobRequest,
     BrainDumpResponse,
+    BrainDumpSourceResponse,
+    BrainDumpJobResponse,
+    ProcessedBrainDump,
 )
-from app.access import task_access, shopping_item_access, calendar_event_access
-from app.database import get_db
-from app.ai_service import AIService
+from app.access import brain_dump_access
+from app.database import get_db, get_session_factory
+from app.jobs import JobQueue, QueueFullError, get_job_queue
+from app.ai_errors import (
+    AICircuitOpenError,
+    AIOverloadedError,
+    AIProviderUnavailableError,
+    AIServiceError,
+    AITimeoutError,
+)
+
+if TYPE_CHECKING:
+    from app.ai_service import AIService
 
 router = APIRouter(prefix="/brain-dumps", tags=["brain-dumps"])
 
-# Initialize AI service
-ai_service = AIService()
+_ai_service: Optional["AIService"] = None
+
+
+def get_ai_service() -> "AIService":
+    """Dependency returning the shared AIService, built on first use
+
+    AIService pulls in LangChain and the Anthropic client, which would
+    otherwise be imported by every worker at startup even when it only
+    serves CRUD requests. Set AI_WARM_UP=true to build it during startup
+    instead (see app.main).
+    """
+    global _ai_service
+    if _ai_service is None:
+        from app.ai_service import AIService
+
+        _ai_service = AIService()
+    return _ai_service
+
+
+async def _process_and_save(
+    request: BrainDumpRequest,
+    ai_service: "AIService",
+    session_factory: async_sessionmaker,
+) -> BrainDumpResponse:
+    """Process a brain dump, then save it in one short transaction
+
+    No session is opened until the AI result is in, so a pooled connection
+    is only held for the INSERTs and never for the model's latency.
+    """
+    processed = await ai_service.process_brain_dump(request.text)
+
+    async with session_factory() as db:
+        saved = await brain_dump_access.save_processed_brain_dump(
+            session=db,
+            user_id=request.user_id,
+            raw_input=request.text,
+            processed=processed,
+        )
+        await db.commit()
+
+    return saved
+
+
+def _ai_unavailable(error: AIServiceError) -> HTTPException:
+    """503 when we are shedding load or the provider is down, 504 when the
+    latency budget ran out and 429 when the provider rate limits us"""
+    headers = None
+    if error.retry_after is not None:
+        headers = {"Retry-After": str(math.ceil(error.retry_after))}
+    if isinstance(
+        error, (AIOverloadedError, AICircuitOpenError, AIProviderUnavailableError)
+    ):
+        status_code = 503
+    elif isinstance(error, AITimeoutError):
+        status_code = 504
+    else:
+        status_code = 429
+    return HTTPException(status_code=status_code, detail=str(error), headers=headers)
 
 
 @router.post("/", response_model=BrainDumpResponse)
-async def process_brain_dump(request: BrainDumpRequest, db: Session = Depends(get_db)):
+async def process_brain_dump(
+    request: BrainDumpRequest,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    ai_service: "AIService" = Depends(get_ai_service),
+):
     """Process a brain dump using AI and save all extracted items to database"""
     try:
-        # Process the brain dump with AI
-        processed = await ai_service.process_brain_dump(request.text)
-
-        # Save all tasks
-        saved_tasks = []
-        for task in processed.tasks:
-            # Create the parent task
-            saved_task = task_access.create_task(
-                session=db,
-                user_id=request.user_id,
-                description=task.description,
-                due_date=datetime.strptime(task.due_date, "%Y-%m-%d").date()
-                if task.due_date
-                else None,
-                estimated_time_minutes=task.estimated_time_minutes,
-                raw_input=request.text,
+        return await _process_and_save(request, ai_service, session_factory)
+    except AIServiceError as e:
+        raise _ai_unavailable(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+
+# ProcessedBrainDump field -> "type" of the streamed event for its items
+STREAM_EVENT_TYPES = {
+    "tasks": "task",
+    "shopping_items": "shopping_item",
+    "calendar_events": "calendar_event",
+}
+
+
+def _stream_event(event_type: str, data: Union[BaseModel, dict]) -> str:
+    """One NDJSON line of the brain dump stream"""
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    return json.dumps({"type": event_type, "data": data}) + "\n"
+
+
+async def _stream_brain_dump_events(
+    request: BrainDumpRequest,
+    ai_service: "AIService",
+    session_factory: async_sessionmaker,
+) -> AsyncIterator[str]:
+    """Save and emit each item as soon as the model has produced it"""
+    async with session_factory() as db:
+        try:
+            brain_dump = await brain_dump_access.create_brain_dump(
+                session=db, user_id=request.user_id, raw_input=request.text
             )
+            await db.commit()
+            yield _stream_event("brain_dump", brain_dump)
 
-            # If task was decomposed, create subtasks
-            if task.should_decompose and task.subtasks:
-                subtasks_data = [
-                    {
-                        "description": subtask.description,
-                        "order": subtask.order,
-                        "estimated_time_minutes": subtask.estimated_time_minutes,
-                        "due_date": datetime.strptime(
-                            subtask.due_date, "%Y-%m-%d"
-                        ).date()
-                        if subtask.due_date
-                        else None,
-                    }
-                    for subtask in task.subtasks
-                ]
-                subtask_responses = task_access.create_subtasks(
+            async for field, item in ai_service.stream_brain_dump(request.text):
+                # One short transaction per item so it is visible to other
+                # requests as soon as the client sees it
+                saved = await brain_dump_access.save_processed_items(
                     session=db,
-                    parent_task_id=saved_task.id,
-                    subtasks=subtasks_data,
-                )
-                # Update task with subtasks
-                saved_task.subtasks = subtask_responses
-
-            saved_tasks.append(saved_task)
-
-        # Save all shopping items
-        saved_shopping_items = []
-        for item in processed.shopping_items:
-            saved_item = shopping_item_access.create_shopping_item(
-                session=db,
-                user_id=request.user_id,
-                description=item.description,
-                raw_input=request.text,
-            )
-            saved_shopping_items.append(saved_item)
-
-        # Save all calendar events
-        saved_calendar_events = []
-        for event in processed.calendar_events:
-            # Convert event_date string to date object
-            event_date_obj = datetime.strptime(event.event_date, "%Y-%m-%d").date()
-
-            # Convert event_time string to time object if provided
-            event_time_obj = None
-            if event.event_time:
-                # Handle both HH:MM and HH:MM:SS formats
-                time_format = (
-                    "%H:%M:%S" if event.event_time.count(":") == 2 else "%H:%M"
+                    user_id=request.user_id,
+                    brain_dump_id=brain_dump.id,
+                    processed=ProcessedBrainDump(**{field: [item]}),
                 )
-                event_time_obj = datetime.strptime(event.event_time, time_format).time()
-
-            saved_event = calendar_event_access.create_calendar_event(
-                session=db,
-                user_id=request.user_id,
-                description=event.description,
-                event_date=event_date_obj,
-                event_time=event_time_obj,
-                raw_input=request.text,
-            )
-            saved_calendar_events.append(saved_event)
+                await db.commit()
+                yield _stream_event(STREAM_EVENT_TYPES[field], getattr(saved, field)[0])
+
+            yield _stream_event("done", {"brain_dump_id": brain_dump.id})
+
+        except Exception as e:
+            await db.rollback()
+            yield _stream_event("error", {"detail": f"Processing failed: {str(e)}"})
+
+
+@router.post("/stream")
+async def stream_brain_dump(
+    request: BrainDumpRequest,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    ai_service: "AIService" = Depends(get_ai_service),
+):
+    """Process a brain dump, streaming each saved item as newline-delimited JSON
 
-        db.commit()
+    Every line is {"type": ..., "data": ...}. The first event is the stored
+    "brain_dump", followed by one "task", "shopping_item" or "calendar_event"
+    per item as soon as it is saved, and finally "done" (or "error").
+    """
+    return StreamingResponse(
+        _stream_brain_dump_events(request, ai_service, session_factory),
+        media_type="application/x-ndjson",
+    )
 
-        return BrainDumpResponse(
-            tasks=saved_tasks,
-            shopping_items=saved_shopping_items,
-            calendar_events=saved_calendar_events,
+
+@router.post("/jobs", response_model=BrainDumpJobResponse, status_code=202)
+async def create_brain_dump_job(
+    request: BrainDumpJobRequest,
+    session_factory: async_sessionmaker = Depends(get_session_factory),
+    job_queue: JobQueue = Depends(get_job_queue),
+    ai_service: "AIService" = Depends(get_ai_service),
+):
+    """Queue a brain dump for background processing and return its job id
+
+    Poll GET /brain-dumps/jobs/{job_id} for the result, or pass callback_url
+    to have the finished job POSTed there.
+    """
+    brain_dump = BrainDumpRequest(text=request.text, user_id=request.user_id)
+    try:
+        job = await job_queue.submit(
+            lambda: _process_and_save(brain_dump, ai_service, session_factory),
+            callback_url=str(request.callback_url) if request.callback_url else None,
         )
+    except QueueFullError:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many brain dumps are waiting to be processed",
+            headers={"Retry-After": "5"},
+        )
+    return job.model_dump()
 
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+
+@router.get("/jobs/{job_id}", response_model=BrainDumpJobResponse)
+async def get_brain_dump_job(job_id: str, job_queue: JobQueue = Depends(get_job_queue)):
+    """Get the status, and once finished the result, of a brain dump job"""
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.model_dump()
+
+
+@router.get("/{brain_dump_id}", response_model=BrainDumpSourceResponse)
+async def get_brain_dump(brain_dump_id: int, db: AsyncSession = Depends(get_db)):
+    """Get the original text of a brain dump that items reference"""
+    brain_dump = await brain_dump_access.get_brain_dump_by_id(
+        session=db, brain_dump_id=brain_dump_id
+    )
+    if not brain_dump:
+        raise HTTPException(status_code=404, detail="Brain dump not found")
+    return brain_dump
@@ -1,10 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
-from app.models import CalendarEventResponse, CalendarEventUpdateRequest
+from app.models import (
+    BatchUpdateRequest,
+    BatchUpdateResponse,
+    CalendarEventBatchUpdate,
+    CalendarEventResponse,
+    CalendarEventUpdateRequest,
+)
 from app.access import calendar_event_access
+from app.access.collection_versions import CALENDAR_EVENTS
+from app.cache import CacheBackend
 from app.database import get_db, get_db_transactional
+from app.routes.batch import batch_changes, batch_response
+from app.routes.list_cache import get_list_cache, list_response
+from app.routes.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/calendar-events", tags=["calendar-events"])
 
@@ -12,29 +23,68 @@ router = APIRouter(prefix="/calendar-events", tags=["calendar-events"])
 @router.get("/{user_id}", response_model=List[CalendarEventResponse])
 async def get_calendar_events(
     user_id: int,
+    request: Request,
+    response: Response,
     start_date: Optional[date] = Query(
         None, description="Filter by start date (YYYY-MM-DD)"
     ),
     end_date: Optional[date] = Query(
         None, description="Filter by end date (YYYY-MM-DD)"
     ),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from X-Next-Cursor of the previous page"
+    ),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[CacheBackend] = Depends(get_list_cache),
+):
+    """Get all calendar events for a user with optional date range filtering
+
+    Answers 304 when If-None-Match carries the current ETag, and serves
+    repeated queries from the list cache until the user's next write.
+    """
+    return await list_response(
+        request,
+        response,
+        db,
+        cache,
+        collection=CALENDAR_EVENTS,
+        user_id=user_id,
+        item_type=CalendarEventResponse,
+        load=lambda: calendar_event_access.get_calendar_events_by_user(
+            session=db,
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            limit=limit,
+            cursor=cursor,
+        ),
+    )
+
+
+@router.patch("/batch", response_model=BatchUpdateResponse[CalendarEventResponse])
+async def update_calendar_events(
+    request: BatchUpdateRequest[CalendarEventBatchUpdate],
+    db: AsyncSession = Depends(get_db_transactional),
 ):
-    """Get all calendar events for a user with optional date range filtering"""
-    return calendar_event_access.get_calendar_events_by_user(
-        session=db, user_id=user_id, start_date=start_date, end_date=end_date
+    """Update many calendar events in one transaction"""
+    updated = await calendar_event_access.update_calendar_events(
+        session=db, updates=batch_changes(request)
     )
+    return batch_response(request, updated)
 
 
 @router.put("/{event_id}", response_model=CalendarEventResponse)
 async def update_calendar_event(
     event_id: int,
     request: CalendarEventUpdateRequest,
-    db: Session = Depends(get_db_transactional),
+    db: AsyncSession = Depends(get_db_transactional),
 ):
     """Update a calendar event"""
     update_data = request.model_dump(exclude_unset=True)
-    updated_event = calendar_event_access.update_calendar_event(
+    updated_event = await calendar_event_access.update_calendar_event(
         session=db, event_id=event_id, update_data=update_data
     )
 
@@ -46,10 +96,12 @@ async def update_calendar_event(
 
 @router.delete("/{event_id}")
 async def delete_calendar_event(
-    event_id: int, db: Session = Depends(get_db_transactional)
+    event_id: int, db: AsyncSession = Depends(get_db_transactional)
 ):
     """Delete a calendar event"""
-    deleted = calendar_event_access.delete_calendar_event(session=db, event_id=event_id)
+    deleted = await calendar_event_access.delete_calendar_event(
+        session=db, event_id=event_id
+    )
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Calendar event not found")
@@ -0,0 +1,56 @@
+"""
+Conditional GET (ETag / If-None-Match) for the list endpoints
+"""
+
+import hashlib
+from typing import Optional
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from app.metrics import metrics
+
+# Browsers may store list responses but must revalidate them every time,
+# which turns a repeated fetch into an If-None-Match request
+CACHE_CONTROL = "private, no-cache"
+
+
+def query_digest(request: Request) -> str:
+    """Short hash of the query string, independent of parameter order"""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    return hashlib.blake2b(query.encode(), digest_size=8).hexdigest()
+
+
+def list_etag(collection: str, version: int, request: Request) -> str:
+    """ETag for one list response
+
+    The body depends on the collection version and on the query string
+    (filters, sort, page size, cursor), so both are part of the tag.
+    """
+    return f'"{collection}-{version}-{query_digest(request)}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
+
+
+def not_modified(
+    request: Request, response: Response, collection: str, version: int
+) -> Optional[Response]:
+    """Set the list's ETag on ``response`` and return a 304 to send instead
+    if the client already has this version; None if the list must be built"""
+    etag = list_etag(collection, version, request)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        metrics.increment("list_not_modified")
+        return Response(status_code=304, headers=dict(response.headers))
+
+    return None
@@ -0,0 +1,91 @@
+"""
+Read-through cache of serialized list responses
+
+Entries are keyed by list, user, list version (see
+app.access.collection_versions) and query string. Every create, update and
+delete in app/access bumps the version in its own transaction, so a write
+makes all of the user's older entries unreachable at once, in every worker,
+and they age out of the LRU. LIST_CACHE_BACKEND=redis shares the entries
+between workers as well.
+"""
+
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Optional, Type
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.access import collection_versions
+from app.access.pagination import InvalidCursorError
+from app.cache import CacheBackend, create_cache_from_env
+from app.metrics import metrics
+from app.models import Page
+from app.routes.conditional import not_modified, query_digest
+from app.routes.pagination import NEXT_CURSOR_HEADER
+
+# Size of the in-process cache unless LIST_CACHE_MAX_ENTRIES/_MAX_BYTES are set
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_list_cache = create_cache_from_env(
+    "LIST_CACHE", max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES
+)
+
+
+def get_list_cache() -> Optional[CacheBackend]:
+    """Dependency returning the shared list cache (None when disabled)"""
+    return _list_cache
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(item_type: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[item_type])
+
+
+async def list_response(
+    request: Request,
+    response: Response,
+    session: AsyncSession,
+    cache: Optional[CacheBackend],
+    collection: str,
+    user_id: int,
+    item_type: Type[BaseModel],
+    load: Callable[[], Awaitable[Page]],
+) -> Response:
+    """Answer a list endpoint as cheaply as its version allows
+
+    304 if If-None-Match carries the current ETag; otherwise the cached body
+    for this version and query string; otherwise ``load()``, serialized once
+    and cached. List endpoints keep returning a plain JSON array so existing
+    clients are unaffected; the next-page cursor goes in X-Next-Cursor.
+    """
+    # Read the version before the rows, so a write landing in between can
+    # only make the ETag and cache key older than the body, never newer
+    version = await collection_versions.get_version(session, user_id, collection)
+    unchanged = not_modified(request, response, collection, version)
+    if unchanged:
+        return unchanged
+
+    key = f"{collection}:{user_id}:{version}:{query_digest(request)}"
+    cached = await cache.get(key) if cache is not None else None
+
+    if cached is not None:
+        metrics.increment("list_cache_hits")
+        next_cursor, body = cached.split("\n", 1)
+    else:
+        if cache is not None:
+            metrics.increment("list_cache_misses")
+        try:
+            page = await load()
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        next_cursor = page.next_cursor or ""
+        body = _list_adapter(item_type).dump_json(page.items).decode()
+        if cache is not None:
+            # Cursors are URL-safe base64, so the first newline ends it
+            await cache.set(key, f"{next_cursor}\n{body}")
+
+    headers = dict(response.headers)
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
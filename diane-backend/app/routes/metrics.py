@@ -0,0 +1,12 @@
+from typing import Dict
+from fastapi import APIRouter
+
+from app.metrics import metrics
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/", response_model=Dict[str, float])
+async def get_metrics():
+    """Current values of this worker's counters"""
+    return metrics.snapshot()
@@ -0,0 +1,9 @@
+"""
+Shared settings of cursor-paginated list responses
+"""
+
+# Upper bound for the ``limit`` query parameter of list endpoints
+MAX_PAGE_SIZE = 500
+
+# Response header carrying the cursor for the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
@@ -1,9 +1,20 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.models import ShoppingItemResponse, ShoppingItemUpdateRequest
+from app.models import (
+    BatchUpdateRequest,
+    BatchUpdateResponse,
+    ShoppingItemBatchUpdate,
+    ShoppingItemResponse,
+    ShoppingItemUpdateRequest,
+)
 from app.access import shopping_item_access
+from app.access.collection_versions import SHOPPING_ITEMS
+from app.cache import CacheBackend
 from app.database import get_db, get_db_transactional
+from app.routes.batch import batch_changes, batch_response
+from app.routes.list_cache import get_list_cache, list_response
+from app.routes.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/shopping-items", tags=["shopping-items"])
 
@@ -11,12 +22,38 @@ router = APIRouter(prefix="/shopping-items", tags=["shopping-items"])
 @router.get("/{user_id}", response_model=List[ShoppingItemResponse])
 async def get_shopping_items(
     user_id: int,
+    request: Request,
+    response: Response,
     completed: Optional[bool] = Query(None, description="Filter by completion status"),
-    db: Session = Depends(get_db),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from X-Next-Cursor of the previous page"
+    ),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[CacheBackend] = Depends(get_list_cache),
 ):
-    """Get all shopping items for a user with optional filtering"""
-    return shopping_item_access.get_shopping_items_by_user(
-        session=db, user_id=user_id, completed=completed
+    """Get all shopping items for a user with optional filtering
+
+    Answers 304 when If-None-Match carries the current ETag, and serves
+    repeated queries from the list cache until the user's next write.
+    """
+    return await list_response(
+        request,
+        response,
+        db,
+        cache,
+        collection=SHOPPING_ITEMS,
+        user_id=user_id,
+        item_type=ShoppingItemResponse,
+        load=lambda: shopping_item_access.get_shopping_items_by_user(
+            session=db,
+            user_id=user_id,
+            completed=completed,
+            limit=limit,
+            cursor=cursor,
+        ),
     )
 
 
@@ -24,11 +61,11 @@ async def get_shopping_items(
 async def update_shopping_item(
     item_id: int,
     request: ShoppingItemUpdateRequest,
-    db: Session = Depends(get_db_transactional),
+    db: AsyncSession = Depends(get_db_transactional),
 ):
     """Update a shopping item"""
     update_data = request.model_dump(exclude_unset=True)
-    updated_item = shopping_item_access.update_shopping_item(
+    updated_item = await shopping_item_access.update_shopping_item(
         session=db, item_id=item_id, update_data=update_data
     )
 
@@ -38,12 +75,46 @@ async def update_shopping_item(
     return updated_item
 
 
+@router.patch("/batch", response_model=BatchUpdateResponse[ShoppingItemResponse])
+async def update_shopping_items(
+    request: BatchUpdateRequest[ShoppingItemBatchUpdate],
+    db: AsyncSession = Depends(get_db_transactional),
+):
+    """Update many shopping items in one transaction
+
+    Items getting the same changes (e.g. checking off everything bought) are
+    updated by one statement. Each id gets a result with status "updated" or
+    "not_found".
+    """
+    updated = await shopping_item_access.update_shopping_items(
+        session=db, updates=batch_changes(request)
+    )
+    return batch_response(request, updated)
+
+
+@router.delete("/{user_id}/completed")
+async def clear_completed_shopping_items(
+    user_id: int, db: AsyncSession = Depends(get_db_transactional)
+):
+    """Delete all of a user's completed shopping items in one statement"""
+    deleted_ids = await shopping_item_access.delete_completed_shopping_items(
+        session=db, user_id=user_id
+    )
+
+    return {
+        "message": f"Deleted {len(deleted_ids)} completed shopping items",
+        "deleted_ids": deleted_ids,
+    }
+
+
 @router.delete("/{item_id}")
 async def delete_shopping_item(
-    item_id: int, db: Session = Depends(get_db_transactional)
+    item_id: int, db: AsyncSession = Depends(get_db_transactional)
 ):
     """Delete a shopping item"""
-    deleted = shopping_item_access.delete_shopping_item(session=db, item_id=item_id)
+    deleted = await shopping_item_access.delete_shopping_item(
+        session=db, item_id=item_id
+    )
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Shopping item not found")
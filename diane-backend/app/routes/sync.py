@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.models import SyncResponse
+from app.access import sync_access
+from app.access.sync_access import InvalidSyncTokenError
+from app.database import get_db
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("/{user_id}", response_model=SyncResponse)
+async def sync(
+    user_id: int,
+    since: Optional[str] = Query(
+        None, description="next_since from the previous sync; omit to get everything"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get the tasks, subtasks, shopping items and calendar events created,
+    updated or deleted since the last sync"""
+    try:
+        return await sync_access.get_changes(session=db, user_id=user_id, since=since)
+    except InvalidSyncTokenError as e:
+        raise HTTPException(status_code=400, detail=str(e))
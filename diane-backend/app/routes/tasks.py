@@ -1,14 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.models import (
+    BatchUpdateRequest,
+    BatchUpdateResponse,
+    TaskBatchUpdate,
     TaskResponse,
     TaskUpdateRequest,
+    SubTaskBatchUpdate,
     SubTaskUpdateRequest,
     SubTaskResponse,
+    SubtaskInclusion,
 )
 from app.access import task_access
+from app.access.collection_versions import TASKS
+from app.cache import CacheBackend
 from app.database import get_db, get_db_transactional
+from app.routes.batch import batch_changes, batch_response
+from app.routes.list_cache import get_list_cache, list_response
+from app.routes.pagination import MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
@@ -16,20 +26,52 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 @router.get("/{user_id}", response_model=List[TaskResponse])
 async def get_tasks(
     user_id: int,
+    request: Request,
+    response: Response,
     completed: Optional[bool] = Query(None, description="Filter by completion status"),
     sort_by: str = Query("created_at", description="Sort by: created_at or due_date"),
-    db: Session = Depends(get_db),
+    include_subtasks: SubtaskInclusion = Query(
+        SubtaskInclusion.FULL,
+        description="Subtasks to include: true (full), summary (counts) or false",
+    ),
+    limit: Optional[int] = Query(
+        None, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of items to return"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from X-Next-Cursor of the previous page"
+    ),
+    db: AsyncSession = Depends(get_db),
+    cache: Optional[CacheBackend] = Depends(get_list_cache),
 ):
-    """Get all tasks for a user with optional filtering and sorting"""
-    return task_access.get_tasks_by_user(
-        session=db, user_id=user_id, completed=completed, sort_by=sort_by
+    """Get all tasks for a user with optional filtering and sorting
+
+    Answers 304 when If-None-Match carries the current ETag, and serves
+    repeated queries from the list cache until the user's next write.
+    """
+    return await list_response(
+        request,
+        response,
+        db,
+        cache,
+        collection=TASKS,
+        user_id=user_id,
+        item_type=TaskResponse,
+        load=lambda: task_access.get_tasks_by_user(
+            session=db,
+            user_id=user_id,
+            completed=completed,
+            sort_by=sort_by,
+            include_subtasks=include_subtasks,
+            limit=limit,
+            cursor=cursor,
+        ),
     )
 
 
 @router.get("/task/{task_id}", response_model=TaskResponse)
-async def get_task(task_id: int, db: Session = Depends(get_db)):
+async def get_task(task_id: int, db: AsyncSession = Depends(get_db)):
     """Get a single task by ID"""
-    task = task_access.get_task_by_id(session=db, task_id=task_id)
+    task = await task_access.get_task_by_id(session=db, task_id=task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
@@ -39,12 +81,22 @@ async def get_task(task_id: int, db: Session = Depends(get_db)):
 async def update_task(
     task_id: int,
     request: TaskUpdateRequest,
-    db: Session = Depends(get_db_transactional),
+    include_subtasks: SubtaskInclusion = Query(
+        SubtaskInclusion.FULL,
+        description="Subtasks to return: true (full), summary (counts) or false",
+    ),
+    db: AsyncSession = Depends(get_db_transactional),
 ):
-    """Update a task"""
+    """Update a task
+
+    With include_subtasks=false the update is a single database round trip.
+    """
     update_data = request.model_dump(exclude_unset=True)
-    updated_task = task_access.update_task(
-        session=db, task_id=task_id, update_data=update_data
+    updated_task = await task_access.update_task(
+        session=db,
+        task_id=task_id,
+        update_data=update_data,
+        include_subtasks=include_subtasks,
     )
 
     if not updated_task:
@@ -54,9 +106,9 @@ async def update_task(
 
 
 @router.delete("/{task_id}")
-async def delete_task(task_id: int, db: Session = Depends(get_db_transactional)):
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_db_transactional)):
     """Delete a task"""
-    deleted = task_access.delete_task(session=db, task_id=task_id)
+    deleted = await task_access.delete_task(session=db, task_id=task_id)
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Task not found")
@@ -69,11 +121,11 @@ async def update_subtask(
     task_id: int,
     subtask_id: int,
     request: SubTaskUpdateRequest,
-    db: Session = Depends(get_db_transactional),
+    db: AsyncSession = Depends(get_db_transactional),
 ):
     """Update a subtask"""
     update_data = request.model_dump(exclude_unset=True)
-    updated_subtask = task_access.update_subtask(
+    updated_subtask = await task_access.update_subtask(
         session=db, subtask_id=subtask_id, update_data=update_data
     )
 
@@ -87,12 +139,46 @@ async def update_subtask(
 async def delete_subtask(
     task_id: int,
     subtask_id: int,
-    db: Session = Depends(get_db_transactional),
+    db: AsyncSession = Depends(get_db_transactional),
 ):
     """Delete a subtask"""
-    deleted = task_access.delete_subtask(session=db, subtask_id=subtask_id)
+    deleted = await task_access.delete_subtask(session=db, subtask_id=subtask_id)
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Subtask not found")
 
     return {"message": "Subtask deleted successfully"}
+
+
+@router.patch("/batch", response_model=BatchUpdateResponse[TaskResponse])
+async def update_tasks(
+    request: BatchUpdateRequest[TaskBatchUpdate],
+    include_subtasks: SubtaskInclusion = Query(
+        SubtaskInclusion.FULL,
+        description="Subtasks to return: true (full), summary (counts) or false",
+    ),
+    db: AsyncSession = Depends(get_db_transactional),
+):
+    """Update many tasks in one transaction
+
+    Tasks getting the same changes (e.g. completed: true) are updated by one
+    statement. Each id gets a result with status "updated" or "not_found".
+    """
+    updated = await task_access.update_tasks(
+        session=db,
+        updates=batch_changes(request),
+        include_subtasks=include_subtasks,
+    )
+    return batch_response(request, updated)
+
+
+@router.patch("/subtasks/batch", response_model=BatchUpdateResponse[SubTaskResponse])
+async def update_subtasks(
+    request: BatchUpdateRequest[SubTaskBatchUpdate],
+    db: AsyncSession = Depends(get_db_transactional),
+):
+    """Update many subtasks in one transaction"""
+    updated = await task_access.update_subtasks(
+        session=db, updates=batch_changes(request)
+    )
+    return batch_response(request, updated)
@@ -0,0 +1,94 @@
+"""
+Load test: POST /brain-dumps/ at a given concurrency against the replay backend
+
+Runs the full request path (routing, limiter, retries, parsing, database
+writes) in-process with the model replaced by ReplayChatModel, so no network
+or API key is needed. Latency of the stand-in model is set with the
+AI_REPLAY_* variables (see app.ai_backends); the database is DATABASE_URL.
+
+Usage (from diane-backend/):
+    AI_REPLAY_LATENCY_MS=800 AI_REPLAY_LATENCY_JITTER_MS=400 \\
+    AI_REPLAY_LATENCY_DISTRIBUTION=lognormal \\
+    python -m benchmarks.brain_dump_load [requests] [concurrency]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+os.environ.setdefault("AI_BACKEND", "replay")
+# Every request should reach the (stand-in) model
+os.environ.setdefault("BRAIN_DUMP_CACHE_BACKEND", "none")
+
+import httpx  # noqa: E402
+from app.database import engine, init_db  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run(requests: int, concurrency: int):
+    await init_db()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://load-test", timeout=120
+    ) as client:
+        response = await client.post(
+            "/auth/signup",
+            json={"email": "load-test@example.com", "first_name": "Load"},
+        )
+        user_id = response.json()["id"]
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = Counter()
+
+        async def send(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/brain-dumps/",
+                    json={
+                        "user_id": user_id,
+                        "text": f"Call the plumber about leak {i} and buy milk",
+                    },
+                )
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{requests} requests, concurrency {concurrency}: {elapsed:.2f}s")
+    print(f"throughput: {requests / elapsed:.1f} requests/s")
+    print(
+        "latency ms: "
+        f"p50 {statistics.median(latencies) * 1000:.0f}, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.0f}, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.0f}"
+    )
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    async def run_and_dispose():
+        try:
+            await run(requests, concurrency)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run_and_dispose())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Import-time benchmark: how long a fresh worker takes to import app.main
+
+Runs ``python -X importtime -c "import app.main"`` in fresh interpreters and
+reports the median total, the packages that cost the most, and whether the
+LangChain/Anthropic stack was loaded (it should only load on the first brain
+dump, or at startup with AI_WARM_UP=true).
+
+Usage (from diane-backend/):
+    python -m benchmarks.import_time [--runs 5] [--top 10] [--max-ms 1500]
+
+With --max-ms the exit status is 1 when the median exceeds it, so the check
+can gate CI against import-time regressions.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, Tuple
+
+# Packages that must not be imported just to start the app
+DEFERRED_PACKAGES = ("langchain_core", "langchain_anthropic", "anthropic")
+
+
+def measure_once() -> Tuple[float, Dict[str, float]]:
+    """Total microseconds to import app.main, and self time per top-level package"""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./import_time.db")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    total = 0.0
+    by_package: Dict[str, float] = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.strip()
+        by_package[module.split(".")[0]] += float(self_us)
+        if module == "app.main":
+            total = float(cumulative_us)
+    return total, by_package
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, help="fail above this median")
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(total for total, _ in runs) / 1000
+    packages = runs[-1][1]
+
+    print(f"import app.main: median {median_ms:.0f} ms over {args.runs} runs")
+    print("slowest packages (self time, last run):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[
+        : args.top
+    ]:
+        print(f"  {package:<30} {self_us / 1000:8.1f} ms")
+
+    loaded = [package for package in DEFERRED_PACKAGES if package in packages]
+    print(f"deferred packages loaded at import: {', '.join(loaded) or 'none'}")
+
+    if args.max_ms is not None and median_ms > args.max_ms:
+        print(f"FAIL: median {median_ms:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
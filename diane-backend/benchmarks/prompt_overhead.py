@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: per-request CPU cost of preparing the brain dump prompt
+
+Compares rebuilding the parser, format instructions and prompt template on
+every call (the old AIService behaviour) with the prompt AIService now builds
+once. No model calls are made.
+
+Usage (from diane-backend/):
+    python -m benchmarks.prompt_overhead [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from langchain_core.output_parsers import PydanticOutputParser  # noqa: E402
+from langchain_core.prompts import ChatPromptTemplate  # noqa: E402
+from app.ai_service import SYSTEM_PROMPT, AIService  # noqa: E402
+from app.models import ProcessedBrainDump  # noqa: E402
+
+TEXT = "Call the dentist, buy milk and eggs, soccer practice Thursday at 4pm"
+TODAY = "2026-10-18"
+
+# System prompt template as it was assembled before AIService precompiled it
+PER_REQUEST_TEMPLATE = (
+    SYSTEM_PROMPT + "\n\nCurrent date: {today}\n\n{format_instructions}"
+)
+
+
+def rebuild_per_request():
+    parser = PydanticOutputParser(pydantic_object=ProcessedBrainDump)
+    prompt = ChatPromptTemplate.from_messages(
+        [("system", PER_REQUEST_TEMPLATE), ("human", "{input}")]
+    )
+    return prompt.format_messages(
+        input=TEXT,
+        today=TODAY,
+        format_instructions=parser.get_format_instructions(),
+    )
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    service = AIService(cache=None)
+    prompt = service._chain_for(TODAY).first
+
+    def precompiled():
+        return prompt.format_messages(input=TEXT)
+
+    for name, func in [("before", rebuild_per_request), ("after", precompiled)]:
+        seconds = min(timeit.repeat(func, number=iterations, repeat=5))
+        print(f"{name:>6}: {seconds / iterations * 1e6:8.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
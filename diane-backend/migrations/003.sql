@@ -0,0 +1,25 @@
+-- Diane Backend Database Schema
+-- Migration 003: Composite and partial indexes for list queries
+-- Date: 2026-10-18
+-- Alembic Revision: 45be79dfb8d5
+
+-- Every list endpoint filters by user and reads rows in a fixed keyset order,
+-- so each index leads with user_id followed by the sort columns and the id
+-- tie-breaker. Descending orders (tasks by created_at) scan backwards.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_user_id_created_at ON tasks (user_id, created_at, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_user_id_due_date ON tasks (user_id, due_date, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shopping_items_user_id ON shopping_items (user_id, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_calendar_events_user_id_event_date ON calendar_events (user_id, event_date, event_time, id);
+
+-- Partial indexes over incomplete rows only (what the list screens filter on)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_incomplete_user_id_created_at ON tasks (user_id, created_at, id) WHERE completed = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_incomplete_user_id_due_date ON tasks (user_id, due_date, id) WHERE completed = false;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_shopping_items_incomplete_user_id ON shopping_items (user_id, id) WHERE completed = false;
+
+-- Listed in 002.sql but not created by Alembic revision 3aab0895a699
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_subtasks_parent_task_id ON subtasks (parent_task_id);
+
+-- Single-column user_id indexes are prefixes of the composites above
+DROP INDEX CONCURRENTLY IF EXISTS idx_tasks_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_shopping_items_user_id;
+DROP INDEX CONCURRENTLY IF EXISTS idx_calendar_events_user_id;
@@ -0,0 +1,41 @@
+-- Diane Backend Database Schema
+-- Migration 004: Store brain dump text once in brain_dumps
+-- Date: 2026-10-18
+-- Alembic Revision: 8c41d2e7a9f3
+
+-- The original text of each brain dump, previously copied onto every item
+-- extracted from it
+CREATE TABLE brain_dumps (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    raw_input TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+
+CREATE INDEX ix_brain_dumps_user_id ON brain_dumps(user_id);
+
+ALTER TABLE tasks ADD COLUMN brain_dump_id INTEGER REFERENCES brain_dumps(id) ON DELETE SET NULL;
+ALTER TABLE shopping_items ADD COLUMN brain_dump_id INTEGER REFERENCES brain_dumps(id) ON DELETE SET NULL;
+ALTER TABLE calendar_events ADD COLUMN brain_dump_id INTEGER REFERENCES brain_dumps(id) ON DELETE SET NULL;
+
+-- Existing items: one brain dump per (user_id, raw_input, created_at) group
+INSERT INTO brain_dumps (user_id, raw_input, created_at)
+SELECT user_id, raw_input, created_at FROM (
+    SELECT user_id, raw_input, created_at FROM tasks
+    UNION
+    SELECT user_id, raw_input, created_at FROM shopping_items
+    UNION
+    SELECT user_id, raw_input, created_at FROM calendar_events
+) AS items
+ORDER BY created_at;
+
+UPDATE tasks SET brain_dump_id = brain_dumps.id FROM brain_dumps
+WHERE brain_dumps.user_id = tasks.user_id AND brain_dumps.raw_input = tasks.raw_input AND brain_dumps.created_at = tasks.created_at;
+UPDATE shopping_items SET brain_dump_id = brain_dumps.id FROM brain_dumps
+WHERE brain_dumps.user_id = shopping_items.user_id AND brain_dumps.raw_input = shopping_items.raw_input AND brain_dumps.created_at = shopping_items.created_at;
+UPDATE calendar_events SET brain_dump_id = brain_dumps.id FROM brain_dumps
+WHERE brain_dumps.user_id = calendar_events.user_id AND brain_dumps.raw_input = calendar_events.raw_input AND brain_dumps.created_at = calendar_events.created_at;
+
+ALTER TABLE tasks DROP COLUMN raw_input;
+ALTER TABLE shopping_items DROP COLUMN raw_input;
+ALTER TABLE calendar_events DROP COLUMN raw_input;
@@ -0,0 +1,32 @@
+-- Diane Backend Database Schema
+-- Migration 005: updated_at columns and tombstones for delta sync
+-- Date: 2026-10-18
+-- Alembic Revision: d4e9a1c6b203
+
+-- Set on insert by the default and on every update by the application
+ALTER TABLE tasks ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL;
+ALTER TABLE subtasks ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL;
+ALTER TABLE shopping_items ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL;
+ALTER TABLE calendar_events ADD COLUMN updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL;
+
+-- Existing rows have not changed since they were created
+UPDATE tasks SET updated_at = created_at;
+UPDATE subtasks SET updated_at = created_at;
+UPDATE shopping_items SET updated_at = created_at;
+UPDATE calendar_events SET updated_at = created_at;
+
+CREATE INDEX ix_tasks_user_id_updated_at ON tasks(user_id, updated_at);
+CREATE INDEX ix_shopping_items_user_id_updated_at ON shopping_items(user_id, updated_at);
+CREATE INDEX ix_calendar_events_user_id_updated_at ON calendar_events(user_id, updated_at);
+
+-- One row per deleted task, subtask, shopping item or calendar event;
+-- entity_type is the table the row was deleted from
+CREATE TABLE tombstones (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    entity_type VARCHAR(32) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE DEFAULT NOW() NOT NULL
+);
+
+CREATE INDEX ix_tombstones_user_id_deleted_at ON tombstones(user_id, deleted_at);
@@ -0,0 +1,13 @@
+-- Diane Backend Database Schema
+-- Migration 006: Per-user list versions for ETags
+-- Date: 2026-10-18
+-- Alembic Revision: f2a7c8d05b14
+
+-- One counter per user and list (tasks, shopping_items, calendar_events),
+-- bumped by every write to that list; a missing row means version 0
+CREATE TABLE collection_versions (
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    collection VARCHAR(32) NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (user_id, collection)
+);
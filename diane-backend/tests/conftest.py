@@ -5,18 +5,29 @@ Pytest configuration and fixtures for testing
 import pytest
 from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.cache import InMemoryCache
 from app.db_models import Base, User
-from app.database import get_db, get_db_transactional
+from app.database import (
+    enable_sqlite_foreign_keys,
+    get_db,
+    get_db_transactional,
+    get_session_factory,
+)
+from app.routes.list_cache import get_list_cache
 
 
 # Use SQLite for testing - creates automatically, no setup needed
 # Use :memory: for in-memory database or specify a simple path
 TEST_DATABASE_URL = "sqlite:///./test_database.db"
+# The app itself talks to the same database through the async driver
+TEST_ASYNC_DATABASE_URL = "sqlite+aiosqlite:///./test_database.db"
 
 
 @pytest.fixture(scope="function")
@@ -28,6 +39,7 @@ def test_db_engine():
         connect_args={"check_same_thread": False},  # Needed for SQLite
         echo=False,
     )
+    enable_sqlite_foreign_keys(engine)
 
     # Create all tables
     Base.metadata.create_all(bind=engine)
@@ -54,7 +66,20 @@ def test_db_session(test_db_engine):
 
 
 @pytest.fixture(scope="function")
-def client(test_db_session):
+def test_async_session_factory(test_db_engine):
+    """Create an async session factory for the app, bound to the test database"""
+    # NullPool closes each aiosqlite connection as soon as its session ends,
+    # so nothing outlives the event loop that TestClient runs requests on
+    engine = create_async_engine(TEST_ASYNC_DATABASE_URL, poolclass=NullPool)
+    enable_sqlite_foreign_keys(engine.sync_engine)
+
+    yield async_sessionmaker(
+        bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+
+@pytest.fixture(scope="function")
+def client(test_async_session_factory):
     """Create a test client with overridden database dependency"""
 
     # Create a no-op lifespan for testing (doesn't connect to production DB)
@@ -64,25 +89,26 @@ def client(test_db_session):
         yield
         # No cleanup needed
 
-    def override_get_db():
-        try:
-            yield test_db_session
-        finally:
-            pass
-
-    def override_get_db_transactional():
-        try:
-            yield test_db_session
-            test_db_session.commit()
-        except Exception:
-            test_db_session.rollback()
-            raise
-        finally:
-            pass
+    async def override_get_db():
+        async with test_async_session_factory() as session:
+            yield session
+
+    async def override_get_db_transactional():
+        async with test_async_session_factory() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
 
     # Override database dependencies
     app.dependency_overrides[get_db] = override_get_db
     app.dependency_overrides[get_db_transactional] = override_get_db_transactional
+    app.dependency_overrides[get_session_factory] = lambda: test_async_session_factory
+    # Each test starts from an empty database, so list versions restart too
+    list_cache = InMemoryCache()
+    app.dependency_overrides[get_list_cache] = lambda: list_cache
 
     # Override lifespan context
     app.router.lifespan_context = test_lifespan
@@ -0,0 +1,105 @@
+"""
+Tests for the chat model backends
+"""
+
+import asyncio
+import json
+import statistics
+import pytest
+from app.ai_backends import DEFAULT_FIXTURES, ReplayChatModel, create_llm_from_env
+from app.ai_service import AIService
+from app.cache import InMemoryCache
+from app.models import ProcessedBrainDump, ProcessedShoppingItem
+
+RECORDED = ProcessedBrainDump(
+    shopping_items=[ProcessedShoppingItem(description="Oat milk")]
+)
+
+
+def _service(**options):
+    llm = ReplayChatModel(latency_ms=0, **options)
+    return AIService(llm=llm, cache=InMemoryCache(), fast_path=False)
+
+
+def test_replay_returns_recorded_result_through_ai_service():
+    service = _service(recorded={"Get oat milk": RECORDED})
+
+    assert asyncio.run(service.process_brain_dump("Get oat milk")) == RECORDED
+
+    other = asyncio.run(service.process_brain_dump("Something else"))
+    assert other in DEFAULT_FIXTURES
+    assert asyncio.run(service.process_brain_dump("Something else")) == other
+
+
+def test_replay_streams_items():
+    service = _service(fixtures=[DEFAULT_FIXTURES[1]])
+
+    async def collect():
+        return [item async for item in service.stream_brain_dump("Anything")]
+
+    assert [item.description for _, item in asyncio.run(collect())] == [
+        "Eggs",
+        "Bread",
+        "Soccer practice",
+    ]
+
+
+def test_replay_answers_batched_requests(monkeypatch):
+    monkeypatch.setenv("AI_BATCH_MAX_SIZE", "4")
+    service = _service(recorded={"Get oat milk": RECORDED})
+
+    async def run():
+        return await asyncio.gather(
+            *(service.process_brain_dump(text) for text in ["Get oat milk", "Other"])
+        )
+
+    recorded, other = asyncio.run(run())
+
+    assert recorded == RECORDED
+    assert other in DEFAULT_FIXTURES
+
+
+@pytest.mark.parametrize("distribution", ["fixed", "uniform", "lognormal"])
+def test_replay_latency_distributions(distribution):
+    llm = ReplayChatModel(
+        latency_ms=100,
+        latency_jitter_ms=50,
+        latency_distribution=distribution,
+        seed=1,
+    )
+
+    samples = [llm.sample_latency() for _ in range(2000)]
+
+    assert all(sample >= 0 for sample in samples)
+    assert statistics.median(samples) == pytest.approx(0.1, rel=0.1)
+    if distribution == "fixed":
+        assert set(samples) == {0.1}
+    if distribution == "uniform":
+        assert 0.05 <= min(samples) and max(samples) <= 0.15
+
+
+def test_replay_backend_from_env(monkeypatch, tmp_path):
+    fixtures = tmp_path / "fixtures.jsonl"
+    fixtures.write_text(
+        json.dumps({"text": "Get oat milk", "result": RECORDED.model_dump()})
+        + "\n"
+        + json.dumps({"result": DEFAULT_FIXTURES[0].model_dump()})
+        + "\n"
+    )
+    monkeypatch.setenv("AI_BACKEND", "replay")
+    monkeypatch.setenv("AI_REPLAY_FIXTURES", str(fixtures))
+    monkeypatch.setenv("AI_REPLAY_LATENCY_MS", "0")
+    monkeypatch.delenv("ANTHROPIC_API_KEY")
+
+    llm = create_llm_from_env()
+
+    assert isinstance(llm, ReplayChatModel)
+    assert llm.recorded == {"Get oat milk": RECORDED}
+    assert llm.fixtures == [DEFAULT_FIXTURES[0]]
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setenv("AI_BACKEND", "carrier-pigeon")
+
+    with pytest.raises(ValueError, match="Unknown AI_BACKEND"):
+        create_llm_from_env()
@@ -0,0 +1,130 @@
+"""
+Tests for the rule-based brain dump fast path
+"""
+
+import asyncio
+from datetime import date
+from unittest.mock import AsyncMock
+import pytest
+from app.ai_fast_path import classify
+from app.ai_service import AIService
+from app.cache import InMemoryCache
+from app.metrics import metrics
+
+# A Sunday
+TODAY = date(2026, 10, 18)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("milk, eggs, bread", ["Milk", "Eggs", "Bread"]),
+        ("Buy milk and eggs", ["Milk", "Eggs"]),
+        (
+            "grocery list: 2 gallons of whole milk; bananas",
+            ["2 gallons of whole milk", "Bananas"],
+        ),
+        ("need paper towels & ice cream", ["Paper towels", "Ice cream"]),
+    ],
+)
+def test_shopping_lists_are_classified(text, expected):
+    result = classify(text, TODAY)
+
+    assert [item.description for item in result.shopping_items] == expected
+    assert result.tasks == [] and result.calendar_events == []
+
+
+@pytest.mark.parametrize(
+    "text,description,event_date,event_time",
+    [
+        ("dentist Friday at 2pm", "Dentist", "2026-10-23", "14:00"),
+        (
+            "Soccer practice tomorrow at 4:30 pm",
+            "Soccer practice",
+            "2026-10-19",
+            "16:30",
+        ),
+        (
+            "Parent teacher meeting on Oct 22 at 15:00",
+            "Parent teacher meeting",
+            "2026-10-22",
+            "15:00",
+        ),
+        ("Haircut 1/5", "Haircut", "2027-01-05", None),
+        ("lunch with Sam today at noon", "Lunch with Sam", "2026-10-18", "12:00"),
+    ],
+)
+def test_simple_events_are_classified(text, description, event_date, event_time):
+    (event,) = classify(text, TODAY).calendar_events
+
+    assert event.description == description
+    assert event.event_date == event_date
+    assert event.event_time == event_time
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Call the dentist",
+        "call the dentist Friday at 2pm",  # a task, not the appointment itself
+        "dentist Sunday at 2pm",  # today or next week?
+        "dentist Friday at 2",  # am or pm?
+        "milk, eggs and call mom",
+        "dentist Friday at 2pm and milk",
+        "Remember the big client presentation next week",
+        # Tasks about groceries, not groceries to buy
+        "Make soup",
+        "Feed the fish",
+        "Order pizza",
+        "bake a cake",
+        "Defrost chicken",
+        "Pay water",
+        "Return soap",
+        "cook chicken and rice",
+        # Qualifiers that change the date, repeat or cancel the event
+        "dentist next Friday at 2pm",
+        "soccer practice every Tuesday at 4pm",
+        "Dentist Friday cancelled",
+        "no soccer practice tomorrow",
+        "",
+    ],
+)
+def test_ambiguous_dumps_are_left_to_the_model(text):
+    assert classify(text, TODAY) is None
+
+
+def test_fast_path_skips_the_model_and_records_metrics():
+    """Test that a trivial dump is answered locally and counted"""
+    service = AIService(cache=InMemoryCache(), fast_path=True)
+    service._extract = AsyncMock()
+    metrics.reset()
+    metrics.increment("ai_model_calls")
+    metrics.increment("ai_model_call_seconds_total", 2.0)
+
+    result = asyncio.run(service.process_brain_dump("milk, eggs"))
+
+    assert [item.description for item in result.shopping_items] == ["Milk", "Eggs"]
+    service._extract.assert_not_awaited()
+    assert metrics.get("ai_fast_path_hits") == 1
+    assert 1.9 < metrics.get("ai_fast_path_seconds_saved") <= 2.0
+
+
+def test_fast_path_miss_uses_the_model():
+    service = AIService(cache=InMemoryCache(), fast_path=True)
+    service._extract = AsyncMock(return_value=classify("milk", TODAY))
+    metrics.reset()
+
+    asyncio.run(service.process_brain_dump("Call the dentist"))
+
+    service._extract.assert_awaited_once()
+    assert metrics.get("ai_fast_path_misses") == 1
+    assert metrics.get("ai_model_calls") == 1
+
+
+def test_fast_path_can_be_disabled():
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    service._extract = AsyncMock(return_value=classify("milk", TODAY))
+
+    asyncio.run(service.process_brain_dump("milk"))
+
+    service._extract.assert_awaited_once()
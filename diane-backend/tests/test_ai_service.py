@@ -0,0 +1,499 @@
+"""
+Tests for AIService prompt construction and streaming
+"""
+
+import asyncio
+import re
+from typing import Callable, Optional
+from unittest.mock import AsyncMock
+import anthropic
+import httpx
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatResult
+from app.ai_errors import (
+    AICircuitOpenError,
+    AIOverloadedError,
+    AIProviderUnavailableError,
+    AIRateLimitedError,
+    AITimeoutError,
+)
+from app.ai_batching import BrainDumpBatcher
+from app.ai_limiter import ConcurrencyLimiter
+from app.ai_resilience import CircuitBreaker, RetryPolicy
+from app.ai_service import AIService
+from app.ai_streaming import BrainDumpStreamParser
+from app.cache import InMemoryCache
+from app.metrics import metrics
+from app.models import (
+    BatchedBrainDumps,
+    IndexedBrainDump,
+    ProcessedBrainDump,
+    ProcessedShoppingItem,
+)
+
+
+def test_chain_is_built_once_per_day():
+    """Test that the prompt chain is reused until the date changes"""
+    service = AIService()
+
+    chain = service._chain_for("2026-10-18")
+    assert service._chain_for("2026-10-18") is chain
+
+    next_day = service._chain_for("2026-10-19")
+    assert next_day is not chain
+
+    messages = next_day.first.format_messages(input="Buy milk")
+    static_block, date_block = messages[0].content
+    assert static_block == service.static_system_block
+    assert date_block["text"] == "Current date: 2026-10-19"
+    assert messages[1].content == "Buy milk"
+
+
+def test_static_system_prompt_is_cacheable():
+    """Test that the fixed instructions are sent as a cacheable prefix"""
+    service = AIService()
+
+    block = service.static_system_block
+    assert block["cache_control"] == {"type": "ephemeral"}
+    assert service.parser.get_format_instructions() in block["text"]
+    # Nothing date-dependent may be in the cached prefix
+    assert "{today}" not in block["text"]
+    assert "Current date" not in block["text"]
+
+
+def test_token_usage_is_recorded():
+    """Test that prompt cache reads and writes are counted"""
+    metrics.reset()
+    message = AIMessage(
+        content=ProcessedBrainDump().model_dump_json(),
+        usage_metadata={
+            "input_tokens": 2100,
+            "output_tokens": 50,
+            "total_tokens": 2150,
+            "input_token_details": {"cache_read": 2000, "cache_creation": 0},
+        },
+    )
+    service = AIService()
+    chain = AsyncMock()
+    chain.ainvoke = AsyncMock(return_value=message)
+    service._chain_for = lambda today: chain
+
+    result = asyncio.run(service._extract("Buy milk", "2026-10-18"))
+
+    assert result == ProcessedBrainDump()
+    assert metrics.get("ai_requests") == 1
+    assert metrics.get("ai_input_tokens") == 2100
+    assert metrics.get("ai_cache_read_input_tokens") == 2000
+    assert metrics.get("ai_cache_creation_input_tokens") == 0
+
+
+def test_stream_parser_emits_items_once_complete():
+    """Test that list elements are handed out as soon as they are complete"""
+    completion = (
+        '```json\n{"tasks": [{"description": "Call the dentist", '
+        '"estimated_time_minutes": 10, "should_decompose": false}], '
+        '"shopping_items": [{"description": "Milk"}, {"description": "Eggs"}], '
+        '"calendar_events": []}\n```'
+    )
+    parser = BrainDumpStreamParser()
+
+    # Feed one character at a time and note where each item comes out
+    emitted = []
+    for position, char in enumerate(completion):
+        for field, item in parser.feed(char):
+            emitted.append((field, item.description, position))
+    for field, item in parser.finish():
+        emitted.append((field, item.description, len(completion)))
+
+    assert [(field, description) for field, description, _ in emitted] == [
+        ("tasks", "Call the dentist"),
+        ("shopping_items", "Milk"),
+        ("shopping_items", "Eggs"),
+    ]
+    # Earlier items are available long before the completion ends
+    assert emitted[0][2] < completion.index("Milk")
+    assert emitted[1][2] < completion.index("Eggs")
+
+
+def test_stream_parser_ignores_brackets_inside_strings():
+    """Test that braces and escaped quotes in values do not end an element,
+    and that an element cut off by the end of the stream is still used"""
+    completion = (
+        '{"tasks": [{"description": "Fix the \\"}]\\" bug {soon}", '
+        '"estimated_time_minutes": 10, "should_decompose": false}], '
+        '"shopping_items": [{"description": "Milk"'
+    )
+    parser = BrainDumpStreamParser()
+
+    items = []
+    for start in range(0, len(completion), 7):
+        items.extend(parser.feed(completion[start : start + 7]))
+    items.extend(parser.finish())
+
+    assert [(field, item.description) for field, item in items] == [
+        ("tasks", 'Fix the "}]" bug {soon}'),
+        ("shopping_items", "Milk"),
+    ]
+
+
+def test_stream_brain_dump_yields_items_and_caches_result():
+    """Test streaming from the model and serving a repeat from the cache"""
+    completion = ProcessedBrainDump(
+        shopping_items=[
+            ProcessedShoppingItem(description="Milk"),
+            ProcessedShoppingItem(description="Eggs"),
+        ]
+    ).model_dump_json()
+
+    async def astream(inputs):
+        for start in range(0, len(completion), 7):
+            yield AIMessageChunk(content=completion[start : start + 7])
+
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    chain = AsyncMock()
+    chain.astream = astream
+    service._chain_for = lambda today: chain
+
+    async def collect():
+        return [item async for item in service.stream_brain_dump("Buy milk, eggs")]
+
+    first = asyncio.run(collect())
+    assert [(field, item.description) for field, item in first] == [
+        ("shopping_items", "Milk"),
+        ("shopping_items", "Eggs"),
+    ]
+
+    chain.astream = None  # a second model call would fail
+    assert asyncio.run(collect()) == first
+
+
+def test_stream_brain_dump_falls_back_when_model_fails():
+    """Test that a stream failing before any item yields the fallback task"""
+
+    async def astream(inputs):
+        raise RuntimeError("API unavailable")
+        yield
+
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    chain = AsyncMock()
+    chain.astream = astream
+    service._chain_for = lambda today: chain
+
+    async def collect():
+        return [item async for item in service.stream_brain_dump("Call the dentist")]
+
+    ((field, task),) = asyncio.run(collect())
+    assert field == "tasks"
+    assert task.reasoning == "Error occurred during processing"
+
+
+class FakeBrainDumpLLM(BaseChatModel):
+    """Chat model that answers after a delay and tracks concurrent calls"""
+
+    response: str = ProcessedBrainDump().model_dump_json()
+    # Builds the response from the prompt messages instead of ``response``
+    responder: Optional[Callable[[list], str]] = None
+    delay: float = 0.05
+    error: Optional[Exception] = None
+    # Raise ``error`` only for this many calls (None: every call)
+    failures: Optional[int] = None
+    calls: int = 0
+    active: int = 0
+    peak: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-brain-dump"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        content = self.responder(messages) if self.responder else self.response
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))]
+        )
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.error and (self.failures is None or self.calls <= self.failures):
+            raise self.error
+        return self._generate(messages)
+
+
+def _process_concurrently(service, count):
+    async def run():
+        return await asyncio.gather(
+            *(service.process_brain_dump(f"Brain dump {i}") for i in range(count)),
+            return_exceptions=True,
+        )
+
+    return asyncio.run(run())
+
+
+def test_limiter_caps_concurrent_model_calls():
+    """Test that no more than max_concurrent calls reach the model at once"""
+    metrics.reset()
+    llm = FakeBrainDumpLLM()
+    service = AIService(
+        fast_path=False,
+        llm=llm,
+        cache=InMemoryCache(),
+        limiter=ConcurrencyLimiter(max_concurrent=2, max_waiting=10),
+    )
+
+    results = _process_concurrently(service, 6)
+
+    assert all(isinstance(result, ProcessedBrainDump) for result in results)
+    assert llm.peak == 2
+    assert metrics.get("ai_queue_waits") == 6
+    # Four calls had to wait for at least one earlier call to finish
+    assert metrics.get("ai_queue_wait_seconds_total") >= 4 * llm.delay * 0.9
+
+
+def test_limiter_rejects_when_queue_is_full():
+    """Test that calls beyond the wait queue fail fast instead of piling up"""
+    metrics.reset()
+    service = AIService(
+        fast_path=False,
+        llm=FakeBrainDumpLLM(),
+        cache=InMemoryCache(),
+        limiter=ConcurrencyLimiter(max_concurrent=1, max_waiting=1),
+    )
+
+    results = _process_concurrently(service, 3)
+
+    rejected = [result for result in results if isinstance(result, AIOverloadedError)]
+    assert len(rejected) == 1
+    assert rejected[0].retry_after is not None
+    assert metrics.get("ai_queue_rejections") == 1
+
+
+def test_provider_rate_limit_is_not_hidden_by_fallback():
+    """Test that a provider 429 surfaces as AIRateLimitedError"""
+    response = httpx.Response(
+        429,
+        headers={"retry-after": "3"},
+        request=httpx.Request("POST", "https://api.anthropic.com/v1/messages"),
+    )
+    llm = FakeBrainDumpLLM(
+        error=anthropic.RateLimitError("rate limited", response=response, body=None)
+    )
+    service = AIService(
+        fast_path=False,
+        llm=llm,
+        cache=InMemoryCache(),
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+
+    with pytest.raises(AIRateLimitedError) as error:
+        asyncio.run(service.process_brain_dump("Buy milk"))
+    assert error.value.retry_after == 3
+
+
+def _provider_request():
+    return httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+
+
+def _overloaded_error():
+    response = httpx.Response(529, request=_provider_request())
+    return anthropic.InternalServerError("Overloaded", response=response, body=None)
+
+
+def test_transient_errors_are_retried():
+    """Test that overloads are retried with backoff until the call succeeds"""
+    metrics.reset()
+    llm = FakeBrainDumpLLM(delay=0, error=_overloaded_error(), failures=2)
+    service = AIService(
+        fast_path=False,
+        llm=llm,
+        cache=InMemoryCache(),
+        retry_policy=RetryPolicy(max_attempts=3, base_delay=0.001),
+    )
+
+    result = asyncio.run(service.process_brain_dump("Buy milk"))
+
+    assert not result.degraded
+    assert llm.calls == 3
+    assert metrics.get("ai_retries") == 2
+    assert not service.circuit_breaker.is_open
+
+
+def test_exhausted_retries_raise_provider_unavailable():
+    """Test that a provider still failing after the retries is reported so the
+    client can retry, rather than hidden behind the fallback"""
+    metrics.reset()
+    llm = FakeBrainDumpLLM(delay=0, error=_overloaded_error())
+    service = AIService(
+        fast_path=False,
+        llm=llm,
+        cache=InMemoryCache(),
+        retry_policy=RetryPolicy(max_attempts=2, base_delay=0.001),
+    )
+
+    with pytest.raises(AIProviderUnavailableError) as error:
+        asyncio.run(service.process_brain_dump("Call the dentist"))
+
+    assert error.value.retry_after >= 1
+    assert llm.calls == 2
+    assert metrics.get("ai_fallbacks") == 0
+
+
+def test_unparseable_output_returns_explicit_fallback():
+    """Test that the fallback is flagged as degraded and counted"""
+    metrics.reset()
+    service = AIService(fast_path=False, cache=InMemoryCache())
+    service._extract = AsyncMock(side_effect=OutputParserException("Not JSON"))
+
+    result = asyncio.run(service.process_brain_dump("Call the dentist"))
+
+    assert result.degraded
+    assert result.tasks[0].description == "Call the dentist"
+    assert service._extract.await_count == 1
+    assert metrics.get("ai_fallbacks") == 1
+
+
+def test_circuit_breaker_fails_fast_while_provider_is_down():
+    """Test that calls stop reaching the provider once the circuit opens"""
+    metrics.reset()
+    now = [0.0]
+    llm = FakeBrainDumpLLM(
+        delay=0, error=anthropic.APIConnectionError(request=_provider_request())
+    )
+    service = AIService(
+        fast_path=False,
+        llm=llm,
+        cache=InMemoryCache(),
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=2, reset_timeout=30, clock=lambda: now[0]
+        ),
+    )
+
+    for text in ["First", "Second"]:
+        with pytest.raises(AIProviderUnavailableError):
+            asyncio.run(service.process_brain_dump(text))
+    assert service.circuit_breaker.is_open
+    assert metrics.get("ai_circuit_opened") == 1
+
+    with pytest.raises(AICircuitOpenError) as error:
+        asyncio.run(service.process_brain_dump("Third"))
+    assert error.value.retry_after == 30
+    assert llm.calls == 2
+
+    # After the reset timeout one trial call goes through and closes it
+    now[0] = 31
+    llm.error = None
+    assert not asyncio.run(service.process_brain_dump("Fourth")).degraded
+    assert not service.circuit_breaker.is_open
+
+
+def test_latency_budget_bounds_the_call():
+    """Test that a slow model call is cut off at the latency budget"""
+    metrics.reset()
+    service = AIService(
+        fast_path=False,
+        llm=FakeBrainDumpLLM(delay=1),
+        cache=InMemoryCache(),
+        latency_budget=0.05,
+    )
+
+    with pytest.raises(AITimeoutError):
+        asyncio.run(service.process_brain_dump("Buy milk"))
+    assert metrics.get("ai_timeouts") == 1
+
+
+def test_batcher_groups_concurrent_submissions():
+    """Test that submissions within the window share one batch"""
+    batches = []
+
+    async def process_batch(texts):
+        batches.append(texts)
+        return [
+            ProcessedBrainDump(shopping_items=[ProcessedShoppingItem(description=text)])
+            for text in texts
+        ]
+
+    async def scenario():
+        batcher = BrainDumpBatcher(process_batch, max_batch_size=3, window_seconds=0.05)
+        submissions = asyncio.gather(
+            *(batcher.submit(text) for text in ["Milk", "Eggs", "Bread", "Cheese"])
+        )
+        await asyncio.sleep(0)
+        # The full batch's task is referenced until it finishes
+        assert len(batcher._tasks) == 1
+        results = await submissions
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+        return results
+
+    results = asyncio.run(scenario())
+
+    # A full batch goes out immediately, the rest once the window closes
+    assert batches == [["Milk", "Eggs", "Bread"], ["Cheese"]]
+    assert [result.shopping_items[0].description for result in results] == [
+        "Milk",
+        "Eggs",
+        "Bread",
+        "Cheese",
+    ]
+
+
+def test_batched_brain_dumps_use_one_model_request():
+    """Test that concurrent dumps are answered by one request and fanned out"""
+    metrics.reset()
+
+    def respond(messages):
+        documents = re.findall(
+            r'<brain_dump index="(\d+)">\n(.*?)\n</brain_dump>',
+            messages[-1].content,
+            re.S,
+        )
+        if not documents:
+            # Individual request for a dump the batch answer left out
+            return ProcessedBrainDump(
+                shopping_items=[ProcessedShoppingItem(description=messages[-1].content)]
+            ).model_dump_json()
+
+        return BatchedBrainDumps(
+            results=[
+                IndexedBrainDump(
+                    index=int(index),
+                    result=ProcessedBrainDump(
+                        shopping_items=[ProcessedShoppingItem(description=text)]
+                    ),
+                )
+                # The model "forgets" the second dump
+                for index, text in documents
+                if index != "1"
+            ]
+        ).model_dump_json()
+
+    llm = FakeBrainDumpLLM(responder=respond, delay=0)
+    service = AIService(llm=llm, cache=InMemoryCache(), fast_path=False)
+    service.batcher = BrainDumpBatcher(
+        service._process_batch, max_batch_size=3, window_seconds=1
+    )
+
+    async def scenario():
+        return await asyncio.gather(
+            *(service.process_brain_dump(text) for text in ["Milk", "Eggs", "Bread"])
+        )
+
+    results = asyncio.run(scenario())
+
+    assert [result.shopping_items[0].description for result in results] == [
+        "Milk",
+        "Eggs",
+        "Bread",
+    ]
+    # One batched request plus one individual retry for the missing dump
+    assert llm.calls == 2
+    assert metrics.get("ai_batches") == 1
+    assert metrics.get("ai_batched_dumps") == 2
@@ -2,9 +2,14 @@
 Test CRUD API endpoints for tasks, shopping items, and calendar events
 """
 
+import asyncio
 import pytest
 from datetime import date, datetime
-from app.db_models import Task, SubTask, ShoppingItem, CalendarEvent
+from sqlalchemy import event
+from app.access import task_access
+from app.db_models import Task, SubTask, ShoppingItem, CalendarEvent, User
+from app.metrics import metrics
+from app.routes.list_cache import get_list_cache
 
 
 # ==================== TEST FIXTURES ====================
@@ -18,7 +23,6 @@ def sample_task(test_db_session, test_user):
         description="Complete project report",
         due_date=date(2025, 12, 31),
         estimated_time_minutes=120,
-        raw_input="Complete project report",
         completed=False,
     )
     test_db_session.add(task)
@@ -33,7 +37,6 @@ def sample_task_with_subtasks(test_db_session, test_user):
     task = Task(
         user_id=test_user.id,
         description="Plan vacation",
-        raw_input="Plan vacation",
         completed=False,
     )
     test_db_session.add(task)
@@ -63,7 +66,6 @@ def sample_shopping_item(test_db_session, test_user):
     item = ShoppingItem(
         user_id=test_user.id,
         description="Milk",
-        raw_input="Buy milk",
         completed=False,
     )
     test_db_session.add(item)
@@ -80,7 +82,6 @@ def sample_calendar_event(test_db_session, test_user):
         description="Doctor appointment",
         event_date=date(2025, 12, 15),
         event_time=datetime.strptime("14:00", "%H:%M").time(),
-        raw_input="Doctor appointment on Dec 15",
     )
     test_db_session.add(event)
     test_db_session.commit()
@@ -128,6 +129,63 @@ def test_get_tasks_with_filtering(client, test_user, sample_task):
     assert response.json() == []
 
 
+def test_get_tasks_loads_subtasks_without_n_plus_one(
+    client, test_user, test_db_session, test_async_session_factory
+):
+    """Test that listing tasks issues a constant number of queries"""
+    for i in range(5):
+        task = Task(user_id=test_user.id, description=f"Task {i}")
+        task.subtasks = [SubTask(description=f"Step {n}", order=n) for n in range(1, 4)]
+        test_db_session.add(task)
+    test_db_session.commit()
+
+    statements = []
+    engine = test_async_session_factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.get(f"/tasks/{test_user.id}")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    tasks = response.json()
+    assert len(tasks) == 5
+    assert all(len(task["subtasks"]) == 3 for task in tasks)
+    # The list version, one query for the tasks and one for all of their
+    # subtasks
+    assert len(statements) == 3
+
+
+def test_get_tasks_without_subtasks(client, test_user, sample_task_with_subtasks):
+    """Test that include_subtasks=false skips subtasks entirely"""
+    response = client.get(f"/tasks/{test_user.id}?include_subtasks=false")
+
+    assert response.status_code == 200
+    task = response.json()[0]
+    assert task["subtasks"] is None
+    assert task["subtask_summary"] is None
+
+
+def test_get_tasks_with_subtask_summary(client, test_user, sample_task_with_subtasks):
+    """Test that include_subtasks=summary returns subtask counts"""
+    client.put(
+        f"/tasks/{sample_task_with_subtasks.id}/subtasks/"
+        f"{sample_task_with_subtasks.subtasks[0].id}",
+        json={"completed": True},
+    )
+
+    response = client.get(f"/tasks/{test_user.id}?include_subtasks=summary")
+
+    assert response.status_code == 200
+    task = response.json()[0]
+    assert task["subtasks"] is None
+    assert task["subtask_summary"] == {"total": 2, "completed": 1}
+
+
 def test_get_single_task(client, test_user, sample_task):
     """Test getting a single task by ID"""
     # Get the specific task
@@ -182,6 +240,81 @@ def test_update_task_not_found(client):
     assert response.status_code == 404
 
 
+def _statements_during(session_factory, call):
+    """SQL statements the app runs while ``call()`` executes"""
+    statements = []
+    engine = session_factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = call()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return response, statements
+
+
+def test_update_task_is_one_statement_without_subtasks(
+    client, sample_task_with_subtasks, test_async_session_factory
+):
+    """Test that toggling a task is a single UPDATE ... RETURNING plus the
+    list version bump"""
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.put(
+            f"/tasks/{sample_task_with_subtasks.id}?include_subtasks=false",
+            json={"completed": True},
+        ),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert response.json()["subtasks"] is None
+    assert len(statements) == 2
+    assert statements[0].startswith("UPDATE tasks")
+    assert statements[1].startswith("INSERT INTO collection_versions")
+
+
+def test_update_task_returns_subtasks(client, sample_task_with_subtasks):
+    """Test that subtasks are still returned by default"""
+    response = client.put(
+        f"/tasks/{sample_task_with_subtasks.id}", json={"completed": True}
+    )
+
+    assert response.status_code == 200
+    assert [subtask["description"] for subtask in response.json()["subtasks"]] == [
+        "Book flights",
+        "Reserve hotel",
+    ]
+
+    summary = client.put(
+        f"/tasks/{sample_task_with_subtasks.id}?include_subtasks=summary", json={}
+    ).json()
+    assert summary["completed"] is True
+    assert summary["subtask_summary"] == {"total": 2, "completed": 0}
+
+
+def test_update_task_ignores_columns_outside_whitelist(
+    test_user, sample_task, test_async_session_factory
+):
+    """Test that only whitelisted columns are written"""
+
+    async def update():
+        async with test_async_session_factory() as session:
+            return await task_access.update_task(
+                session,
+                sample_task.id,
+                {"user_id": test_user.id + 1, "description": "Renamed"},
+            )
+
+    updated = asyncio.run(update())
+
+    assert updated.description == "Renamed"
+    assert updated.user_id == test_user.id
+
+
 def test_delete_task(client, test_user, sample_task):
     """Test deleting a task"""
     # Delete the task
@@ -195,6 +328,28 @@ def test_delete_task(client, test_user, sample_task):
     assert get_response.status_code == 404
 
 
+def test_delete_task_cascades_in_one_statement(
+    client, test_db_session, sample_task_with_subtasks, test_async_session_factory
+):
+    """Test that the database, not the ORM, deletes a task's subtasks
+
+    The only other statements are the task's sync tombstone and the list
+    version bump.
+    """
+    task_id = sample_task_with_subtasks.id
+
+    response, statements = _statements_during(
+        test_async_session_factory, lambda: client.delete(f"/tasks/{task_id}")
+    )
+
+    assert response.status_code == 200
+    assert len(statements) == 3
+    assert statements[0].startswith("DELETE FROM tasks")
+    assert statements[1].startswith("INSERT INTO tombstones")
+    test_db_session.expire_all()
+    assert test_db_session.query(SubTask).filter_by(parent_task_id=task_id).count() == 0
+
+
 def test_delete_task_not_found(client):
     """Test deleting a non-existent task"""
     response = client.delete("/tasks/99999")
@@ -291,6 +446,50 @@ def test_update_shopping_item(client, test_user, sample_shopping_item):
     assert updated_item["description"] == "Buy organic bananas"
 
 
+def test_update_shopping_item_is_one_statement(
+    client, sample_shopping_item, test_async_session_factory
+):
+    """Test that checking off an item costs one UPDATE plus the list version
+    bump"""
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.put(
+            f"/shopping-items/{sample_shopping_item.id}", json={"completed": True}
+        ),
+    )
+
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert response.json()["description"] == "Milk"
+    assert len(statements) == 2
+
+
+def test_clear_completed_shopping_items(
+    client, test_user, test_db_session, test_async_session_factory
+):
+    """Test that completed items are deleted with a single statement, plus
+    one for their sync tombstones and one for the list version"""
+    items = [
+        ShoppingItem(user_id=test_user.id, description=name, completed=completed)
+        for name, completed in [("Milk", True), ("Eggs", False), ("Bread", True)]
+    ]
+    test_db_session.add_all(items)
+    test_db_session.commit()
+    completed_ids = [items[0].id, items[2].id]
+
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.delete(f"/shopping-items/{test_user.id}/completed"),
+    )
+
+    assert response.status_code == 200
+    assert sorted(response.json()["deleted_ids"]) == completed_ids
+    assert len(statements) == 3
+    assert statements[0].startswith("DELETE FROM shopping_items")
+    remaining = client.get(f"/shopping-items/{test_user.id}").json()
+    assert [item["description"] for item in remaining] == ["Eggs"]
+
+
 def test_update_shopping_item_not_found(client):
     """Test updating a non-existent shopping item"""
     response = client.put(
@@ -409,3 +608,417 @@ def test_delete_calendar_event_not_found(client):
     """Test deleting a non-existent calendar event"""
     response = client.delete("/calendar-events/99999")
     assert response.status_code == 404
+
+
+# ==================== PAGINATION TESTS ====================
+
+
+def _fetch_all_pages(client, url, limit, **query):
+    """Follow X-Next-Cursor until the last page, returning every page"""
+    pages = []
+    cursor = None
+    while True:
+        params = {**query, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(url, params=params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_get_tasks_paginated(client, test_user, test_db_session):
+    """Test that task pages cover every task exactly once in created_at order"""
+    test_db_session.add_all(
+        [Task(user_id=test_user.id, description=f"Task {i}") for i in range(7)]
+    )
+    test_db_session.commit()
+
+    pages = _fetch_all_pages(client, f"/tasks/{test_user.id}", limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    ids = [task["id"] for page in pages for task in page]
+    all_tasks = client.get(f"/tasks/{test_user.id}").json()
+    assert ids == [task["id"] for task in all_tasks]
+    assert len(set(ids)) == 7
+
+
+def test_get_tasks_paginated_by_due_date(client, test_user, test_db_session):
+    """Test due_date pagination with tasks that have no due date"""
+    due_dates = [date(2026, 1, 3), None, date(2026, 1, 1), None, date(2026, 1, 1)]
+    test_db_session.add_all(
+        [
+            Task(
+                user_id=test_user.id,
+                description=f"Task {i}",
+                due_date=due_date,
+            )
+            for i, due_date in enumerate(due_dates)
+        ]
+    )
+    test_db_session.commit()
+
+    pages = _fetch_all_pages(
+        client, f"/tasks/{test_user.id}", limit=2, sort_by="due_date"
+    )
+
+    tasks = [task for page in pages for task in page]
+    assert [task["due_date"] for task in tasks] == [
+        "2026-01-01",
+        "2026-01-01",
+        "2026-01-03",
+        None,
+        None,
+    ]
+    assert len({task["id"] for task in tasks}) == 5
+
+
+def test_get_tasks_invalid_cursor(client, test_user):
+    """Test that a malformed cursor is rejected"""
+    response = client.get(f"/tasks/{test_user.id}?limit=2&cursor=not-a-cursor")
+    assert response.status_code == 400
+
+
+def test_get_shopping_items_paginated(client, test_user, test_db_session):
+    """Test that shopping item pages follow insertion order"""
+    test_db_session.add_all(
+        [ShoppingItem(user_id=test_user.id, description=f"Item {i}") for i in range(5)]
+    )
+    test_db_session.commit()
+
+    pages = _fetch_all_pages(client, f"/shopping-items/{test_user.id}", limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    descriptions = [item["description"] for page in pages for item in page]
+    assert descriptions == [f"Item {i}" for i in range(5)]
+
+
+def test_get_calendar_events_paginated(client, test_user, test_db_session):
+    """Test calendar pagination across events with and without a time"""
+    events = [
+        (date(2026, 2, 1), None),
+        (date(2026, 2, 1), datetime.strptime("09:00", "%H:%M").time()),
+        (date(2026, 1, 15), datetime.strptime("18:30", "%H:%M").time()),
+        (date(2026, 2, 1), datetime.strptime("08:00", "%H:%M").time()),
+    ]
+    test_db_session.add_all(
+        [
+            CalendarEvent(
+                user_id=test_user.id,
+                description=f"Event {i}",
+                event_date=event_date,
+                event_time=event_time,
+            )
+            for i, (event_date, event_time) in enumerate(events)
+        ]
+    )
+    test_db_session.commit()
+
+    pages = _fetch_all_pages(client, f"/calendar-events/{test_user.id}", limit=3)
+
+    ordered = [
+        (event["event_date"], event["event_time"]) for page in pages for event in page
+    ]
+    assert ordered == [
+        ("2026-01-15", "18:30:00"),
+        ("2026-02-01", "08:00:00"),
+        ("2026-02-01", "09:00:00"),
+        ("2026-02-01", None),
+    ]
+
+
+# ==================== BATCH UPDATE TESTS ====================
+
+
+def test_batch_update_shopping_items(
+    client, test_user, test_db_session, test_async_session_factory
+):
+    """Test that checking off many items is one UPDATE with per-item results"""
+    items = [
+        ShoppingItem(user_id=test_user.id, description=name)
+        for name in ["Milk", "Eggs", "Bread"]
+    ]
+    test_db_session.add_all(items)
+    test_db_session.commit()
+    ids = [item.id for item in items]
+
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.patch(
+            "/shopping-items/batch",
+            json={
+                "updates": [{"id": item_id, "completed": True} for item_id in ids]
+                + [{"id": 99999, "completed": True}]
+            },
+        ),
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["id"] for result in results] == ids + [99999]
+    assert [result["status"] for result in results] == ["updated"] * 3 + ["not_found"]
+    assert all(result["item"]["completed"] for result in results[:3])
+    assert results[3]["item"] is None
+    # The UPDATE and one version bump for the owner
+    assert len(statements) == 2
+
+
+def test_batch_update_tasks(
+    client, sample_task, sample_task_with_subtasks, test_async_session_factory
+):
+    """Test that different changes per task are applied in one request"""
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.patch(
+            "/tasks/batch",
+            json={
+                "updates": [
+                    {"id": sample_task.id, "completed": True},
+                    {"id": sample_task_with_subtasks.id, "description": "Plan trip"},
+                ]
+            },
+        ),
+    )
+
+    assert response.status_code == 200
+    first, second = (result["item"] for result in response.json()["results"])
+    assert first["completed"] is True
+    assert first["subtasks"] == []
+    assert second["description"] == "Plan trip"
+    assert len(second["subtasks"]) == 2
+    # One UPDATE per distinct change, one version bump and one SELECT for
+    # all subtasks
+    assert len(statements) == 4
+
+
+def test_batch_update_returns_subtasks_in_order(client, test_user, test_db_session):
+    """Test that updated tasks list subtasks by their order, like GET does"""
+    task = Task(user_id=test_user.id, description="Plan vacation")
+    test_db_session.add(task)
+    test_db_session.flush()
+    test_db_session.add_all(
+        [
+            SubTask(parent_task_id=task.id, description="Reserve hotel", order=2),
+            SubTask(parent_task_id=task.id, description="Book flights", order=1),
+        ]
+    )
+    test_db_session.commit()
+
+    response = client.patch(
+        "/tasks/batch", json={"updates": [{"id": task.id, "completed": True}]}
+    )
+
+    (result,) = response.json()["results"]
+    assert [subtask["order"] for subtask in result["item"]["subtasks"]] == [1, 2]
+    assert (
+        result["item"]["subtasks"]
+        == client.get(f"/tasks/task/{task.id}").json()["subtasks"]
+    )
+
+
+def test_batch_update_subtasks_and_calendar_events(
+    client, sample_task_with_subtasks, sample_calendar_event
+):
+    """Test the subtask and calendar event batch endpoints"""
+    subtask_ids = [subtask.id for subtask in sample_task_with_subtasks.subtasks]
+    response = client.patch(
+        "/tasks/subtasks/batch",
+        json={"updates": [{"id": i, "completed": True} for i in subtask_ids]},
+    )
+    assert response.status_code == 200
+    assert all(r["item"]["completed"] for r in response.json()["results"])
+
+    response = client.patch(
+        "/calendar-events/batch",
+        json={"updates": [{"id": sample_calendar_event.id, "event_time": "09:30"}]},
+    )
+    assert response.status_code == 200
+    assert response.json()["results"][0]["item"]["event_time"] == "09:30:00"
+
+
+def test_batch_update_rejects_duplicate_ids(client, sample_shopping_item):
+    """Test that an id may only appear once per batch"""
+    response = client.patch(
+        "/shopping-items/batch",
+        json={
+            "updates": [
+                {"id": sample_shopping_item.id, "completed": True},
+                {"id": sample_shopping_item.id, "completed": False},
+            ]
+        },
+    )
+    assert response.status_code == 422
+
+
+# ==================== CONDITIONAL GET TESTS ====================
+
+
+def test_unchanged_task_list_is_not_modified(
+    client, test_user, sample_task, test_async_session_factory
+):
+    """Test that a matching If-None-Match is answered without reading tasks"""
+    first = client.get(f"/tasks/{test_user.id}")
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    response, statements = _statements_during(
+        test_async_session_factory,
+        lambda: client.get(f"/tasks/{test_user.id}", headers={"If-None-Match": etag}),
+    )
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert len(statements) == 1
+    assert "collection_versions" in statements[0]
+
+
+@pytest.mark.parametrize(
+    "if_none_match", ["W/{etag}", '"stale", {etag}', "*"], ids=["weak", "list", "any"]
+)
+def test_if_none_match_forms(client, test_user, sample_task, if_none_match):
+    etag = client.get(f"/tasks/{test_user.id}").headers["ETag"]
+
+    response = client.get(
+        f"/tasks/{test_user.id}",
+        headers={"If-None-Match": if_none_match.format(etag=etag)},
+    )
+
+    assert response.status_code == 304
+
+
+def test_task_list_etag_changes_on_writes(client, test_user, sample_task_with_subtasks):
+    """Test that task and subtask writes invalidate the task list's ETag"""
+    url = f"/tasks/{test_user.id}"
+    etag = client.get(url).headers["ETag"]
+
+    subtask = sample_task_with_subtasks.subtasks[0]
+    client.put(
+        f"/tasks/{sample_task_with_subtasks.id}/subtasks/{subtask.id}",
+        json={"completed": True},
+    )
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["subtasks"][0]["completed"] is True
+
+    etag = response.headers["ETag"]
+    client.delete(f"/tasks/{sample_task_with_subtasks.id}")
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_list_etag_depends_on_query(client, test_user, sample_task):
+    etag = client.get(f"/tasks/{test_user.id}").headers["ETag"]
+
+    response = client.get(
+        f"/tasks/{test_user.id}?completed=true", headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_shopping_and_calendar_etags_change_on_writes(
+    client, test_user, sample_shopping_item, sample_calendar_event
+):
+    shopping_url = f"/shopping-items/{test_user.id}"
+    calendar_url = f"/calendar-events/{test_user.id}"
+    shopping_etag = client.get(shopping_url).headers["ETag"]
+    calendar_etag = client.get(calendar_url).headers["ETag"]
+
+    client.put(f"/shopping-items/{sample_shopping_item.id}", json={"completed": True})
+
+    assert (
+        client.get(shopping_url, headers={"If-None-Match": shopping_etag}).status_code
+        == 200
+    )
+    # Other lists keep their version
+    assert (
+        client.get(calendar_url, headers={"If-None-Match": calendar_etag}).status_code
+        == 304
+    )
+
+    client.delete(f"/calendar-events/{sample_calendar_event.id}")
+    assert (
+        client.get(calendar_url, headers={"If-None-Match": calendar_etag}).status_code
+        == 200
+    )
+
+
+# ==================== LIST CACHE TESTS ====================
+
+
+def test_repeated_list_is_served_from_cache(
+    client, test_user, test_db_session, test_async_session_factory
+):
+    """Test that a repeated query costs only the version lookup"""
+    test_db_session.add_all(
+        [ShoppingItem(user_id=test_user.id, description=name) for name in "ABC"]
+    )
+    test_db_session.commit()
+    url = f"/shopping-items/{test_user.id}?limit=2"
+    metrics.reset()
+
+    first = client.get(url)
+    second, statements = _statements_during(
+        test_async_session_factory, lambda: client.get(url)
+    )
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert [item["description"] for item in second.json()] == ["A", "B"]
+    assert second.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(statements) == 1
+    assert "collection_versions" in statements[0]
+    assert metrics.get("list_cache_misses") == 1
+    assert metrics.get("list_cache_hits") == 1
+
+
+def test_list_cache_is_invalidated_by_writes(
+    client, test_user, test_db_session, sample_shopping_item
+):
+    """Test that the user's writes, and only theirs, replace cached lists"""
+    other_user = User(email="other@example.com", first_name="Other")
+    test_db_session.add(other_user)
+    test_db_session.flush()
+    other_item = ShoppingItem(user_id=other_user.id, description="Eggs")
+    test_db_session.add(other_item)
+    test_db_session.commit()
+    url = f"/shopping-items/{test_user.id}"
+    client.get(url)
+    metrics.reset()
+
+    client.put(f"/shopping-items/{sample_shopping_item.id}", json={"completed": True})
+    assert client.get(url).json()[0]["completed"] is True
+
+    client.put(f"/shopping-items/{other_item.id}", json={"completed": True})
+    client.get(url)
+
+    assert metrics.get("list_cache_misses") == 1
+    assert metrics.get("list_cache_hits") == 1
+
+
+def test_lists_work_without_cache(client, test_user, sample_task):
+    client.app.dependency_overrides[get_list_cache] = lambda: None
+    metrics.reset()
+
+    for _ in range(2):
+        response = client.get(f"/tasks/{test_user.id}")
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()] == [sample_task.id]
+
+    assert metrics.get("list_cache_hits") == metrics.get("list_cache_misses") == 0
+
+
+def test_get_metrics(client):
+    """Test that the worker's counters are exposed"""
+    metrics.reset()
+    metrics.increment("ai_cache_read_input_tokens", 2000)
+
+    response = client.get("/metrics/")
+    assert response.status_code == 200
+    assert response.json() == {"ai_cache_read_input_tokens": 2000}
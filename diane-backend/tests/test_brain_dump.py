@@ -5,8 +5,30 @@ Brain dumps can now contain multiple categories and multiple items.
 All items are automatically saved to the database.
 """
 
+import asyncio
+import json
+import math
+import httpx
 import pytest
-from unittest.mock import AsyncMock, patch
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock
+from langchain_core.messages import AIMessageChunk
+from sqlalchemy import event as sqlalchemy_event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from app.ai_errors import (
+    AICircuitOpenError,
+    AIOverloadedError,
+    AIProviderUnavailableError,
+    AIRateLimitedError,
+    AITimeoutError,
+)
+from app.ai_service import AIService
+from app.cache import InMemoryCache
+from app.database import get_session_factory
+from app.metrics import metrics
+from app.routes.brain_dumps import get_ai_service
+from app.main import app
 from app.models import (
     ProcessedBrainDump,
     ProcessedTask,
@@ -14,13 +36,16 @@ from app.models import (
     ProcessedCalendarEvent,
     SubTask,
 )
+from tests.conftest import TEST_ASYNC_DATABASE_URL
 
 
 @pytest.fixture
 def mock_ai_service():
     """Fixture to mock the AIService"""
-    with patch("app.routes.brain_dumps.ai_service") as mock:
-        yield mock
+    mock = MagicMock()
+    app.dependency_overrides[get_ai_service] = lambda: mock
+    yield mock
+    app.dependency_overrides.pop(get_ai_service, None)
 
 
 def test_shopping_items_multiple(client, test_user, mock_ai_service):
@@ -65,7 +90,7 @@ def test_shopping_items_multiple(client, test_user, mock_ai_service):
         assert "id" in item
         assert "user_id" in item
         assert "description" in item
-        assert "raw_input" in item
+        assert item["brain_dump_id"] == result["brain_dump"]["id"]
         assert "created_at" in item
         assert item["user_id"] == test_user.id
 
@@ -150,7 +175,7 @@ def test_task_simple(client, test_user, mock_ai_service):
     assert "description" in task
     assert "estimated_time_minutes" in task
     assert "completed" in task
-    assert "raw_input" in task
+    assert task["brain_dump_id"] == result["brain_dump"]["id"]
     assert "created_at" in task
     assert task["user_id"] == test_user.id
 
@@ -244,7 +269,7 @@ def test_calendar_event_with_time(client, test_user, mock_ai_service):
     assert "description" in event
     assert "event_date" in event
     assert "event_time" in event
-    assert "raw_input" in event
+    assert event["brain_dump_id"] == result["brain_dump"]["id"]
     assert "created_at" in event
     assert event["user_id"] == test_user.id
 
@@ -531,3 +556,373 @@ def test_multiple_tasks(client, test_user, mock_ai_service):
         assert "id" in task
         assert "user_id" in task
         assert task["user_id"] == test_user.id
+
+
+def test_bulk_persistence_uses_one_insert_per_table(
+    client, test_user, mock_ai_service, test_async_session_factory
+):
+    """Test that a large dump is saved with one INSERT per table"""
+    mock_ai_service.process_brain_dump = AsyncMock(
+        return_value=ProcessedBrainDump(
+            tasks=[
+                ProcessedTask(
+                    description=f"Project {i}",
+                    estimated_time_minutes=60,
+                    should_decompose=True,
+                    subtasks=[
+                        SubTask(description=f"Project {i} step {n}", order=n)
+                        for n in range(1, 4)
+                    ],
+                )
+                for i in range(5)
+            ],
+            shopping_items=[
+                ProcessedShoppingItem(description=f"Item {i}") for i in range(8)
+            ],
+            calendar_events=[
+                ProcessedCalendarEvent(
+                    description=f"Event {i}",
+                    event_date="2025-11-14",
+                    event_time="09:30",
+                )
+                for i in range(4)
+            ],
+        )
+    )
+
+    inserts = []
+    engine = test_async_session_factory.kw["bind"].sync_engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT"):
+            inserts.append(statement)
+
+    sqlalchemy_event.listen(engine, "before_cursor_execute", record)
+    try:
+        response = client.post(
+            "/brain-dumps/",
+            json={"text": "A very long brain dump", "user_id": test_user.id},
+        )
+    finally:
+        sqlalchemy_event.remove(engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert len(result["tasks"]) == 5
+    assert len(result["shopping_items"]) == 8
+    assert len(result["calendar_events"]) == 4
+    # brain_dumps, tasks, subtasks, shopping_items, calendar_events and one
+    # upsert bumping the three list versions
+    assert len(inserts) == 6
+
+    # Subtasks are attached to the right parent
+    for i, task in enumerate(result["tasks"]):
+        assert task["description"] == f"Project {i}"
+        assert [subtask["description"] for subtask in task["subtasks"]] == [
+            f"Project {i} step {n}" for n in range(1, 4)
+        ]
+        assert all(
+            subtask["parent_task_id"] == task["id"] for subtask in task["subtasks"]
+        )
+
+    # Everything was committed
+    tasks = client.get(f"/tasks/{test_user.id}").json()
+    assert sum(len(task["subtasks"]) for task in tasks) == 15
+
+
+def test_get_brain_dump_source(client, test_user, mock_ai_service):
+    """Test that items point back to the stored brain dump text"""
+    mock_ai_service.process_brain_dump = AsyncMock(
+        return_value=ProcessedBrainDump(
+            tasks=[
+                ProcessedTask(
+                    description="Call the dentist",
+                    estimated_time_minutes=10,
+                    should_decompose=False,
+                )
+            ],
+            shopping_items=[ProcessedShoppingItem(description="Milk")],
+        )
+    )
+
+    text = "Call the dentist and pick up milk"
+    result = client.post(
+        "/brain-dumps/", json={"text": text, "user_id": test_user.id}
+    ).json()
+    brain_dump_id = result["brain_dump"]["id"]
+    assert result["brain_dump"]["raw_input"] == text
+
+    response = client.get(f"/brain-dumps/{brain_dump_id}")
+    assert response.status_code == 200
+    assert response.json()["raw_input"] == text
+    assert response.json()["user_id"] == test_user.id
+
+    # The text is stored once, not copied onto each item
+    task = client.get(f"/tasks/{test_user.id}").json()[0]
+    assert task["brain_dump_id"] == brain_dump_id
+    assert "raw_input" not in task
+
+
+def test_get_brain_dump_not_found(client):
+    """Test getting a brain dump that doesn't exist"""
+    response = client.get("/brain-dumps/99999")
+    assert response.status_code == 404
+
+
+def _read_stream(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_stream_brain_dump(client, test_user, mock_ai_service):
+    """Test that each item is saved and streamed as a separate event"""
+
+    async def stream(text):
+        yield (
+            "tasks",
+            ProcessedTask(
+                description="Plan birthday party",
+                estimated_time_minutes=60,
+                should_decompose=True,
+                subtasks=[
+                    SubTask(description="Make guest list", order=1),
+                    SubTask(description="Order cake", order=2),
+                ],
+            ),
+        )
+        yield "shopping_items", ProcessedShoppingItem(description="Milk")
+        yield (
+            "calendar_events",
+            ProcessedCalendarEvent(
+                description="Soccer practice", event_date="2026-10-22"
+            ),
+        )
+
+    mock_ai_service.stream_brain_dump = stream
+
+    text = "Plan the birthday party, buy milk, soccer practice Thursday"
+    response = client.post(
+        "/brain-dumps/stream", json={"text": text, "user_id": test_user.id}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    events = _read_stream(response)
+    assert [event["type"] for event in events] == [
+        "brain_dump",
+        "task",
+        "shopping_item",
+        "calendar_event",
+        "done",
+    ]
+
+    brain_dump = events[0]["data"]
+    assert brain_dump["raw_input"] == text
+    task = events[1]["data"]
+    assert task["id"] is not None
+    assert task["brain_dump_id"] == brain_dump["id"]
+    assert [subtask["description"] for subtask in task["subtasks"]] == [
+        "Make guest list",
+        "Order cake",
+    ]
+    assert events[2]["data"]["description"] == "Milk"
+    assert events[3]["data"]["event_date"] == "2026-10-22"
+    assert events[4]["data"] == {"brain_dump_id": brain_dump["id"]}
+
+    # Streamed items were committed
+    tasks = client.get(f"/tasks/{test_user.id}").json()
+    assert [saved["id"] for saved in tasks] == [task["id"]]
+    assert len(client.get(f"/shopping-items/{test_user.id}").json()) == 1
+
+
+def test_stream_brain_dump_keeps_items_saved_before_error(
+    client, test_user, mock_ai_service
+):
+    """Test that a failure mid-stream reports an error without losing earlier items"""
+
+    async def stream(text):
+        yield "shopping_items", ProcessedShoppingItem(description="Milk")
+        raise RuntimeError("connection reset")
+
+    mock_ai_service.stream_brain_dump = stream
+
+    response = client.post(
+        "/brain-dumps/stream", json={"text": "Buy milk and", "user_id": test_user.id}
+    )
+
+    events = _read_stream(response)
+    assert [event["type"] for event in events] == [
+        "brain_dump",
+        "shopping_item",
+        "error",
+    ]
+    assert "connection reset" in events[-1]["data"]["detail"]
+    assert len(client.get(f"/shopping-items/{test_user.id}").json()) == 1
+
+
+def test_stream_brain_dump_reports_model_failure_after_partial_output(
+    client, test_user
+):
+    """Test that the model failing mid-stream ends with an error event rather
+    than "done", so a truncated result is not mistaken for a complete one"""
+    completion = '{"tasks": [], "shopping_items": [{"description": "Milk"}, {"desc'
+
+    async def astream(inputs):
+        for start in range(0, len(completion), 9):
+            yield AIMessageChunk(content=completion[start : start + 9])
+        raise RuntimeError("connection reset")
+
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    chain = MagicMock()
+    chain.astream = astream
+    service._chain_for = lambda today: chain
+    app.dependency_overrides[get_ai_service] = lambda: service
+    metrics.reset()
+
+    response = client.post(
+        "/brain-dumps/stream",
+        json={"text": "Buy milk and eggs", "user_id": test_user.id},
+    )
+
+    events = _read_stream(response)
+    assert [event["type"] for event in events] == [
+        "brain_dump",
+        "shopping_item",
+        "error",
+    ]
+    assert "connection reset" in events[-1]["data"]["detail"]
+    assert metrics.get("ai_stream_errors") == 1
+    assert metrics.get("ai_fallbacks") == 0
+    assert len(client.get(f"/shopping-items/{test_user.id}").json()) == 1
+
+
+def test_brain_dumps_do_not_hold_connections_during_ai_call(test_user, mock_ai_service):
+    """Test that many in-flight dumps share a small connection pool"""
+    in_flight = 10
+    calls = []
+    release = None
+
+    async def slow_ai(text):
+        calls.append(text)
+        await release.wait()
+        return ProcessedBrainDump(
+            shopping_items=[ProcessedShoppingItem(description=text)]
+        )
+
+    mock_ai_service.process_brain_dump = slow_ai
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+
+        # Far fewer connections than concurrent requests; a request holding
+        # one across the AI call would leave the others waiting on the pool
+        engine = create_async_engine(
+            TEST_ASYNC_DATABASE_URL, pool_size=2, max_overflow=0, pool_timeout=5
+        )
+        pool = engine.sync_engine.pool
+        peak = 0
+
+        def on_checkout(*args):
+            nonlocal peak
+            peak = max(peak, pool.checkedout())
+
+        sqlalchemy_event.listen(engine.sync_engine, "checkout", on_checkout)
+        session_factory = async_sessionmaker(
+            bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            ) as client:
+                requests = [
+                    asyncio.create_task(
+                        client.post(
+                            "/brain-dumps/",
+                            json={"text": f"Item {i}", "user_id": test_user.id},
+                        )
+                    )
+                    for i in range(in_flight)
+                ]
+
+                # Wait until every request is blocked on the AI call
+                while len(calls) < in_flight:
+                    await asyncio.sleep(0.01)
+                checked_out_during_ai = pool.checkedout()
+
+                release.set()
+                responses = await asyncio.gather(*requests)
+        finally:
+            app.dependency_overrides.clear()
+            await engine.dispose()
+
+        return checked_out_during_ai, peak, responses
+
+    checked_out_during_ai, peak, responses = asyncio.run(scenario())
+
+    assert checked_out_during_ai == 0
+    assert peak <= 2
+    assert [response.status_code for response in responses] == [200] * in_flight
+
+
+@pytest.mark.parametrize(
+    "error, status_code",
+    [
+        (AIOverloadedError("Too many brain dumps", retry_after=1), 503),
+        (AIRateLimitedError("AI provider rate limit reached", retry_after=2.5), 429),
+        (AICircuitOpenError("AI provider is unavailable", retry_after=12), 503),
+        (AIProviderUnavailableError("AI provider is unavailable", retry_after=1), 503),
+        (AITimeoutError("Took too long", retry_after=1), 504),
+    ],
+)
+def test_brain_dump_ai_unavailable(
+    client, test_user, mock_ai_service, error, status_code
+):
+    """Test that overload and rate limits are reported instead of degraded"""
+    mock_ai_service.process_brain_dump = AsyncMock(side_effect=error)
+
+    response = client.post(
+        "/brain-dumps/", json={"text": "Buy milk", "user_id": test_user.id}
+    )
+
+    assert response.status_code == status_code
+    assert response.headers["retry-after"] == str(math.ceil(error.retry_after))
+    assert client.get(f"/shopping-items/{test_user.id}").json() == []
+
+
+def test_degraded_brain_dump_is_flagged(client, test_user, mock_ai_service):
+    """Test that a fallback result is marked as degraded in the response"""
+    mock_ai_service.process_brain_dump = AsyncMock(
+        return_value=ProcessedBrainDump(
+            degraded=True,
+            tasks=[
+                ProcessedTask(
+                    description="Call the dentist",
+                    estimated_time_minutes=15,
+                    should_decompose=False,
+                )
+            ],
+        )
+    )
+
+    result = client.post(
+        "/brain-dumps/", json={"text": "Call the dentist", "user_id": test_user.id}
+    ).json()
+
+    assert result["degraded"] is True
+    assert result["tasks"][0]["description"] == "Call the dentist"
+
+
+def test_app_import_defers_langchain():
+    """Test that starting the app does not import the AI stack"""
+    code = (
+        "import sys, app.main; "
+        "print(sorted({'langchain_core', 'anthropic'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "[]"
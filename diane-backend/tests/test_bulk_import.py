@@ -0,0 +1,149 @@
+"""
+Tests for bulk brain dump imports
+"""
+
+import asyncio
+import json
+from app.bulk_import import import_brain_dumps, write_checkpoint
+from app.db_models import BrainDump, ShoppingItem, SubTask, Task
+from app.models import (
+    ProcessedBrainDump,
+    ProcessedShoppingItem,
+    ProcessedTask,
+    SubTask as SubTaskData,
+)
+
+
+class FakeAIService:
+    """Turns "buy X" into a shopping item and anything else into a task"""
+
+    def __init__(self):
+        self.texts = []
+
+    async def process_brain_dump(self, text):
+        self.texts.append(text)
+        if text == "fail":
+            raise RuntimeError("AI unavailable")
+        if text.startswith("buy "):
+            return ProcessedBrainDump(
+                shopping_items=[ProcessedShoppingItem(description=text[4:])]
+            )
+        return ProcessedBrainDump(
+            tasks=[
+                ProcessedTask(
+                    description=text,
+                    estimated_time_minutes=30,
+                    should_decompose=True,
+                    subtasks=[SubTaskData(description=f"{text} step", order=1)],
+                )
+            ]
+        )
+
+
+def _write_jsonl(path, entries):
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+def test_bulk_import_saves_dumps_and_checkpoints(
+    tmp_path, test_user, test_db_session, test_async_session_factory
+):
+    """Test importing a file in chunks, skipping and recording failures"""
+    path = tmp_path / "dumps.jsonl"
+    _write_jsonl(
+        path,
+        [
+            {"text": "buy milk"},
+            {"text": "plan party", "user_id": test_user.id},
+            {"text": "fail"},
+            {"text": "buy eggs"},
+            {"text": "clean garage"},
+        ],
+    )
+    ai_service = FakeAIService()
+
+    summary = asyncio.run(
+        import_brain_dumps(
+            str(path),
+            ai_service,
+            test_async_session_factory,
+            default_user_id=test_user.id,
+            chunk_size=2,
+        )
+    )
+
+    assert (summary.imported, summary.failed, summary.skipped) == (4, 1, 0)
+    assert test_db_session.query(BrainDump).count() == 4
+    assert sorted(item.description for item in test_db_session.query(ShoppingItem)) == [
+        "eggs",
+        "milk",
+    ]
+    assert test_db_session.query(Task).count() == 2
+    assert test_db_session.query(SubTask).count() == 2
+    assert (tmp_path / "dumps.jsonl.failed").read_text() == '{"text": "fail"}\n'
+    assert json.loads((tmp_path / "dumps.jsonl.checkpoint").read_text()) == {
+        "next_line": 5
+    }
+
+    # Running again finds nothing left to do
+    summary = asyncio.run(
+        import_brain_dumps(
+            str(path),
+            ai_service,
+            test_async_session_factory,
+            default_user_id=test_user.id,
+        )
+    )
+    assert (summary.imported, summary.skipped) == (0, 5)
+    assert len(ai_service.texts) == 5
+
+
+def test_bulk_import_resumes_from_checkpoint(
+    tmp_path, test_user, test_db_session, test_async_session_factory
+):
+    """Test that lines before the checkpoint are not processed again"""
+    path = tmp_path / "dumps.jsonl"
+    _write_jsonl(path, [{"text": f"buy item {i}"} for i in range(5)])
+    write_checkpoint(str(tmp_path / "dumps.jsonl.checkpoint"), 3)
+    ai_service = FakeAIService()
+
+    summary = asyncio.run(
+        import_brain_dumps(
+            str(path),
+            ai_service,
+            test_async_session_factory,
+            default_user_id=test_user.id,
+        )
+    )
+
+    assert (summary.imported, summary.skipped) == (2, 3)
+    assert ai_service.texts == ["buy item 3", "buy item 4"]
+    assert test_db_session.query(ShoppingItem).count() == 2
+
+
+def test_bulk_import_records_lines_that_cannot_be_saved(
+    tmp_path, test_user, test_db_session, test_async_session_factory
+):
+    """Test that a line with an unknown user_id goes to the failed file
+    without blocking the rest of its chunk or the checkpoint"""
+    path = tmp_path / "dumps.jsonl"
+    bad_line = {"text": "buy eggs", "user_id": test_user.id + 1000}
+    _write_jsonl(path, [{"text": "buy milk"}, bad_line, {"text": "plan party"}])
+
+    summary = asyncio.run(
+        import_brain_dumps(
+            str(path),
+            FakeAIService(),
+            test_async_session_factory,
+            default_user_id=test_user.id,
+        )
+    )
+
+    assert (summary.imported, summary.failed) == (2, 1)
+    assert [item.description for item in test_db_session.query(ShoppingItem)] == [
+        "milk"
+    ]
+    assert test_db_session.query(Task).count() == 1
+    assert (tmp_path / "dumps.jsonl.failed").read_text() == json.dumps(bad_line) + "\n"
+    assert json.loads((tmp_path / "dumps.jsonl.checkpoint").read_text()) == {
+        "next_line": 3
+    }
@@ -0,0 +1,133 @@
+"""
+Tests for the brain dump result cache
+"""
+
+import asyncio
+import sys
+from unittest.mock import AsyncMock
+import pytest
+from app.ai_service import AIService, brain_dump_cache_key
+from app.cache import CacheBackend, InMemoryCache, create_cache_from_env
+from app.models import ProcessedBrainDump, ProcessedShoppingItem
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_in_memory_cache_expires_entries():
+    """Test that entries are dropped once their TTL has passed"""
+    clock = FakeClock()
+    cache = InMemoryCache(ttl_seconds=10, clock=clock)
+
+    asyncio.run(cache.set("key", "value"))
+    clock.now = 9
+    assert asyncio.run(cache.get("key")) == "value"
+
+    clock.now = 10
+    assert asyncio.run(cache.get("key")) is None
+    assert len(cache) == 0
+
+
+def test_in_memory_cache_evicts_least_recently_used():
+    """Test that the least recently read entry is evicted first"""
+    cache = InMemoryCache(max_entries=2)
+
+    async def fill():
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+
+    asyncio.run(fill())
+    assert asyncio.run(cache.get("a")) == "1"
+    assert asyncio.run(cache.get("b")) is None
+    assert asyncio.run(cache.get("c")) == "3"
+
+
+def test_in_memory_cache_stays_within_byte_budget():
+    """Test that least recently used entries are evicted to fit max_bytes"""
+    value = "x" * 1000
+    entry_bytes = sys.getsizeof("a") + sys.getsizeof(value)
+    cache = InMemoryCache(max_bytes=2 * entry_bytes)
+
+    async def fill():
+        await cache.set("a", value)
+        await cache.set("b", value)
+        await cache.get("a")
+        await cache.set("c", value)
+        # Larger than the whole budget, so never stored
+        await cache.set("d", value * 3)
+
+    asyncio.run(fill())
+    assert asyncio.run(cache.get("b")) is None
+    assert asyncio.run(cache.get("d")) is None
+    assert len(cache) == 2
+    assert cache.size_bytes == 2 * entry_bytes
+
+    asyncio.run(cache.set("a", "short"))
+    assert cache.size_bytes == entry_bytes + sys.getsizeof("a") + sys.getsizeof("short")
+
+
+def test_cache_size_from_env(monkeypatch):
+    monkeypatch.setenv("LIST_CACHE_MAX_BYTES", "4096")
+    monkeypatch.delenv("LIST_CACHE_BACKEND", raising=False)
+
+    cache = create_cache_from_env("LIST_CACHE", max_entries=10, max_bytes=1)
+
+    assert cache.max_entries == 10
+    assert cache.max_bytes == 4096
+
+
+def test_cache_backend_requires_get_and_set():
+    """Test that a backend missing part of the interface cannot be created"""
+
+    class GetOnlyCache(CacheBackend):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
+
+
+def test_cache_key_normalizes_whitespace():
+    """Test that resubmitted text with different spacing shares a key"""
+    key = brain_dump_cache_key("Buy milk and eggs", "2026-10-18")
+    assert brain_dump_cache_key("  Buy milk\nand   eggs ", "2026-10-18") == key
+    assert brain_dump_cache_key("Buy milk and eggs", "2026-10-19") != key
+    assert brain_dump_cache_key("Buy milk and bread", "2026-10-18") != key
+
+
+def test_repeated_brain_dump_skips_model_call():
+    """Test that an identical brain dump is served from the cache"""
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    processed = ProcessedBrainDump(
+        shopping_items=[ProcessedShoppingItem(description="Milk")]
+    )
+    service._extract = AsyncMock(return_value=processed)
+
+    first = asyncio.run(service.process_brain_dump("Buy milk"))
+    second = asyncio.run(service.process_brain_dump("Buy milk "))
+
+    assert first == processed
+    assert second == processed
+    assert service._extract.await_count == 1
+
+
+def test_fallback_result_is_not_cached():
+    """Test that a failed model call is retried on the next request"""
+    service = AIService(cache=InMemoryCache(), fast_path=False)
+    service._extract = AsyncMock(side_effect=RuntimeError("API unavailable"))
+
+    fallback = asyncio.run(service.process_brain_dump("Call the dentist"))
+    assert fallback.tasks[0].reasoning == "Error occurred during processing"
+
+    processed = ProcessedBrainDump(
+        shopping_items=[ProcessedShoppingItem(description="Milk")]
+    )
+    service._extract = AsyncMock(return_value=processed)
+    assert asyncio.run(service.process_brain_dump("Call the dentist")) == processed
@@ -0,0 +1,229 @@
+"""
+Tests for the background job queue
+"""
+
+import asyncio
+import socket
+import time
+from datetime import datetime, timezone
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.callback_urls import UnsafeCallbackURLError, resolve_callback_host
+from app.jobs import Job, JobQueue, QueueFullError, get_job_queue
+from app.main import app
+from app.routes.brain_dumps import get_ai_service
+from app.models import JobStatus, ProcessedBrainDump, ProcessedShoppingItem
+
+
+def test_job_queue_runs_work_and_stores_result():
+    """Test that submitted work runs in the background"""
+
+    async def scenario():
+        queue = JobQueue(workers=1)
+        job = await queue.submit(
+            AsyncMock(return_value=ProcessedShoppingItem(description="Milk"))
+        )
+        assert job.status == JobStatus.PENDING
+
+        await queue._queue.join()
+        finished = await queue.get(job.id)
+        await queue.stop()
+        return finished
+
+    job = asyncio.run(scenario())
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"description": "Milk"}
+    assert job.completed_at is not None
+
+
+def test_job_queue_records_failures():
+    """Test that an exception from the work marks the job failed"""
+
+    async def scenario():
+        queue = JobQueue(workers=1)
+        job = await queue.submit(AsyncMock(side_effect=RuntimeError("boom")))
+        await queue._queue.join()
+        finished = await queue.get(job.id)
+        await queue.stop()
+        return finished
+
+    job = asyncio.run(scenario())
+    assert job.status == JobStatus.FAILED
+    assert job.error == "boom"
+
+
+def test_job_queue_rejects_when_full():
+    """Test that the queue is bounded"""
+
+    async def scenario():
+        queue = JobQueue(workers=1, max_queue_size=2)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+            return ProcessedBrainDump()
+
+        # One job is picked up by the worker, two more fill the queue
+        await queue.submit(blocked)
+        await asyncio.sleep(0)
+        await queue.submit(blocked)
+        await queue.submit(blocked)
+        with pytest.raises(QueueFullError):
+            await queue.submit(blocked)
+
+        release.set()
+        await queue._queue.join()
+        await queue.stop()
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def job_queue(client):
+    """A fresh job queue for the app, stopped after the test"""
+    queue = JobQueue(workers=2, max_queue_size=1)
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    yield queue
+    client.portal.call(queue.stop)
+
+
+@pytest.fixture
+def ai_service(client):
+    """A mock AIService for the brain dump routes"""
+    mock = MagicMock()
+    app.dependency_overrides[get_ai_service] = lambda: mock
+    return mock
+
+
+def _wait_for_job(client, job_id):
+    for _ in range(100):
+        job = client.get(f"/brain-dumps/jobs/{job_id}").json()
+        if job["status"] in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_brain_dump_job(client, test_user, job_queue, ai_service):
+    """Test that a job returns immediately and its result can be polled"""
+    ai_service.process_brain_dump = AsyncMock(
+        return_value=ProcessedBrainDump(
+            shopping_items=[ProcessedShoppingItem(description="Milk")]
+        )
+    )
+
+    response = client.post(
+        "/brain-dumps/jobs", json={"text": "Buy milk", "user_id": test_user.id}
+    )
+    assert response.status_code == 202
+    assert response.json()["status"] == "pending"
+
+    job = _wait_for_job(client, response.json()["id"])
+
+    assert job["status"] == "succeeded"
+    assert job["result"]["brain_dump"]["raw_input"] == "Buy milk"
+    assert job["result"]["shopping_items"][0]["description"] == "Milk"
+    assert len(client.get(f"/shopping-items/{test_user.id}").json()) == 1
+
+
+def test_brain_dump_job_queue_full(client, test_user, job_queue, ai_service):
+    """Test that a full queue rejects new jobs with 503"""
+    job_queue.workers = 1
+    release = asyncio.Event()
+
+    async def slow(text):
+        await release.wait()
+        return ProcessedBrainDump()
+
+    ai_service.process_brain_dump = slow
+
+    statuses = [
+        client.post(
+            "/brain-dumps/jobs", json={"text": "Buy milk", "user_id": test_user.id}
+        ).status_code
+        for _ in range(3)
+    ]
+    client.portal.call(release.set)
+
+    assert statuses[:2] == [202, 202]
+    assert statuses[2] == 503
+
+
+def test_get_brain_dump_job_not_found(client, job_queue):
+    """Test polling a job that doesn't exist"""
+    response = client.get("/brain-dumps/jobs/unknown")
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize(
+    "callback_url",
+    [
+        "http://example.com/callback",
+        "https://169.254.169.254/latest/meta-data/",
+        "https://127.0.0.1/callback",
+        "https://10.0.0.5/callback",
+        "https://[::1]/callback",
+        "https://[::ffff:192.168.0.1]/callback",
+    ],
+)
+def test_brain_dump_job_rejects_internal_callback(
+    client, test_user, job_queue, ai_service, callback_url
+):
+    """Test that callbacks must be https to a public address"""
+    response = client.post(
+        "/brain-dumps/jobs",
+        json={
+            "text": "Buy milk",
+            "user_id": test_user.id,
+            "callback_url": callback_url,
+        },
+    )
+    assert response.status_code == 422
+    ai_service.process_brain_dump.assert_not_called()
+
+
+def test_callback_host_must_be_allowed(client, test_user, job_queue, monkeypatch):
+    monkeypatch.setenv("CALLBACK_ALLOWED_HOSTS", "hooks.example.com")
+
+    response = client.post(
+        "/brain-dumps/jobs",
+        json={
+            "text": "Buy milk",
+            "user_id": test_user.id,
+            "callback_url": "https://other.example.com/callback",
+        },
+    )
+    assert response.status_code == 422
+
+
+def _resolves_to(address):
+    async def getaddrinfo(host, port, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    return getaddrinfo
+
+
+def test_callback_host_resolving_to_internal_address_is_refused():
+    """Test that a public-looking name pointing at an internal address is
+    refused when the job calls back, without sending anything"""
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, "getaddrinfo", _resolves_to("169.254.169.254")):
+            with pytest.raises(UnsafeCallbackURLError):
+                await resolve_callback_host("https://hooks.example.com/callback")
+
+            job = Job(
+                id="1",
+                status=JobStatus.SUCCEEDED,
+                callback_url="https://hooks.example.com/callback",
+                created_at=datetime.now(timezone.utc),
+            )
+            with patch("httpx.AsyncClient.post") as post:
+                await JobQueue()._notify(job)
+            post.assert_not_called()
+
+        with patch.object(loop, "getaddrinfo", _resolves_to("93.184.216.34")):
+            return await resolve_callback_host("https://hooks.example.com/callback")
+
+    assert asyncio.run(scenario()) == "93.184.216.34"
@@ -0,0 +1,152 @@
+"""
+Tests for the delta sync endpoint
+"""
+
+import pytest
+from datetime import date, datetime
+from app.access.sync_access import decode_sync_token, encode_sync_token
+from app.db_models import (
+    Task,
+    SubTask,
+    ShoppingItem,
+    CalendarEvent,
+    Tombstone,
+    User,
+)
+
+# Rows are aged to LONG_AGO so that only what a test changes is newer than
+# the token for SINCE
+LONG_AGO = datetime(2000, 1, 1)
+SINCE = encode_sync_token(datetime(2000, 1, 2))
+
+
+@pytest.fixture
+def synced(test_db_session, test_user):
+    """A task with two subtasks, a shopping item and a calendar event, all
+    last written long before SINCE"""
+    task = Task(user_id=test_user.id, description="Plan vacation")
+    test_db_session.add(task)
+    test_db_session.flush()
+    rows = {
+        "task": task,
+        "subtasks": [
+            SubTask(parent_task_id=task.id, description="Book flights", order=1),
+            SubTask(parent_task_id=task.id, description="Reserve hotel", order=2),
+        ],
+        "shopping_item": ShoppingItem(user_id=test_user.id, description="Milk"),
+        "calendar_event": CalendarEvent(
+            user_id=test_user.id,
+            description="Doctor appointment",
+            event_date=date(2025, 12, 15),
+        ),
+    }
+    test_db_session.add_all(
+        rows["subtasks"] + [rows["shopping_item"], rows["calendar_event"]]
+    )
+    test_db_session.flush()
+    for model in (Task, SubTask, ShoppingItem, CalendarEvent):
+        test_db_session.query(model).update({model.updated_at: LONG_AGO})
+    test_db_session.commit()
+    return rows
+
+
+def test_sync_without_token_returns_everything(client, test_user, synced):
+    response = client.get(f"/sync/{test_user.id}")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [task["description"] for task in data["tasks"]] == ["Plan vacation"]
+    assert [subtask["order"] for subtask in data["subtasks"]] == [1, 2]
+    assert len(data["shopping_items"]) == 1
+    assert len(data["calendar_events"]) == 1
+    assert all(ids == [] for ids in data["deleted"].values())
+    assert decode_sync_token(data["next_since"])
+
+
+def test_sync_returns_only_changes_since_token(
+    client, test_user, test_db_session, synced
+):
+    """Test that creates, updates and deletes after the token are returned
+    and nothing else"""
+    item_id = synced["shopping_item"].id
+    event_id = synced["calendar_event"].id
+    task_id = synced["task"].id
+    kept_subtask_id, deleted_subtask_id = [s.id for s in synced["subtasks"]]
+
+    assert (
+        client.put(f"/shopping-items/{item_id}", json={"completed": True}).status_code
+        == 200
+    )
+    assert client.delete(f"/calendar-events/{event_id}").status_code == 200
+    assert (
+        client.delete(f"/tasks/{task_id}/subtasks/{deleted_subtask_id}").status_code
+        == 200
+    )
+    new_task = Task(user_id=test_user.id, description="Call plumber")
+    test_db_session.add(new_task)
+    test_db_session.commit()
+
+    data = client.get(f"/sync/{test_user.id}", params={"since": SINCE}).json()
+
+    assert [task["id"] for task in data["tasks"]] == [new_task.id]
+    assert data["subtasks"] == []
+    (item,) = data["shopping_items"]
+    assert item["id"] == item_id and item["completed"] is True
+    assert datetime.fromisoformat(item["updated_at"]) > LONG_AGO
+    assert data["calendar_events"] == []
+    assert data["deleted"] == {
+        "tasks": [],
+        "subtasks": [deleted_subtask_id],
+        "shopping_items": [],
+        "calendar_events": [event_id],
+    }
+    assert kept_subtask_id not in data["deleted"]["subtasks"]
+
+
+def test_sync_reports_deleted_task_and_updated_subtask(client, test_user, synced):
+    subtask = synced["subtasks"][0]
+    client.put(
+        f"/tasks/{subtask.parent_task_id}/subtasks/{subtask.id}",
+        json={"completed": True},
+    )
+    data = client.get(f"/sync/{test_user.id}", params={"since": SINCE}).json()
+    assert [s["id"] for s in data["subtasks"]] == [subtask.id]
+
+    client.delete(f"/tasks/{synced['task'].id}")
+    data = client.get(f"/sync/{test_user.id}", params={"since": SINCE}).json()
+
+    # The cascaded subtasks are covered by their parent's tombstone
+    assert data["deleted"]["tasks"] == [synced["task"].id]
+    assert data["deleted"]["subtasks"] == []
+    assert data["subtasks"] == []
+
+
+def test_sync_is_scoped_to_the_user(client, test_user, test_db_session, synced):
+    other = User(email="other@example.com", first_name="Other")
+    test_db_session.add(other)
+    test_db_session.commit()
+    client.delete(f"/shopping-items/{synced['shopping_item'].id}")
+
+    data = client.get(f"/sync/{other.id}", params={"since": SINCE}).json()
+
+    assert data["tasks"] == data["shopping_items"] == []
+    assert data["deleted"]["shopping_items"] == []
+    assert test_db_session.query(Tombstone).filter_by(user_id=test_user.id).count()
+
+
+def test_next_token_skips_older_changes(client, test_user, synced):
+    client.put(
+        f"/shopping-items/{synced['shopping_item'].id}", json={"completed": True}
+    )
+    later = encode_sync_token(datetime(2999, 1, 1))
+
+    data = client.get(f"/sync/{test_user.id}", params={"since": later}).json()
+
+    assert data["shopping_items"] == []
+    assert decode_sync_token(data["next_since"]) < datetime(2999, 1, 1)
+
+
+def test_sync_rejects_invalid_token(client, test_user):
+    response = client.get(f"/sync/{test_user.id}", params={"since": "not-a-token"})
+
+    assert response.status_code == 400
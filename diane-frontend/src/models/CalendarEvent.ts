@@ -6,7 +6,7 @@ export class CalendarEvent {
   description: string;
   eventDate: string;
   eventTime?: string;
-  rawInput: string;
+  brainDumpId?: number;
   createdAt: Date;
 
   constructor(data: CalendarEventResponse) {
@@ -15,7 +15,7 @@ export class CalendarEvent {
     this.description = data.description;
     this.eventDate = data.event_date;
     this.eventTime = data.event_time;
-    this.rawInput = data.raw_input;
+    this.brainDumpId = data.brain_dump_id;
     this.createdAt = new Date(data.created_at);
   }
 }
@@ -5,7 +5,7 @@ export class ShoppingItem {
   userId: number;
   description: string;
   completed: boolean;
-  rawInput: string;
+  brainDumpId?: number;
   createdAt: Date;
 
   constructor(data: ShoppingItemResponse) {
@@ -13,7 +13,7 @@ export class ShoppingItem {
     this.userId = data.user_id;
     this.description = data.description;
     this.completed = data.completed;
-    this.rawInput = data.raw_input;
+    this.brainDumpId = data.brain_dump_id;
     this.createdAt = new Date(data.created_at);
   }
 }
@@ -29,7 +29,7 @@ export class Task {
   dueDate?: string;
   estimatedTimeMinutes?: number;
   completed: boolean;
-  rawInput: string;
+  brainDumpId?: number;
   subtasks: SubTask[];
   createdAt: Date;
 
@@ -40,7 +40,7 @@ export class Task {
     this.dueDate = data.due_date;
     this.estimatedTimeMinutes = data.estimated_time_minutes;
     this.completed = data.completed;
-    this.rawInput = data.raw_input;
+    this.brainDumpId = data.brain_dump_id;
     this.subtasks = data.subtasks?.map((st) => new SubTask(st)) ?? [];
     this.createdAt = new Date(data.created_at);
   }
@@ -7,6 +7,7 @@ export interface SubTaskResponse {
   order: number;
   completed: boolean;
   created_at: string;
+  updated_at: string;
 }
 
 export interface TaskResponse {
@@ -16,9 +17,10 @@ export interface TaskResponse {
   due_date?: string;
   estimated_time_minutes?: number;
   completed: boolean;
-  raw_input: string;
+  brain_dump_id?: number;
   subtasks?: SubTaskResponse[];
   created_at: string;
+  updated_at: string;
 }
 
 export interface ShoppingItemResponse {
@@ -26,8 +28,9 @@ export interface ShoppingItemResponse {
   user_id: number;
   description: string;
   completed: boolean;
-  raw_input: string;
+  brain_dump_id?: number;
   created_at: string;
+  updated_at: string;
 }
 
 export interface CalendarEventResponse {
@@ -36,12 +39,22 @@ export interface CalendarEventResponse {
   description: string;
   event_date: string;
   event_time?: string;
+  brain_dump_id?: number;
+  created_at: string;
+  updated_at: string;
+}
+
+export interface BrainDumpSourceResponse {
+  id: number;
+  user_id: number;
   raw_input: string;
   created_at: string;
 }
 
 export interface BrainDumpResponse {
+  brain_dump?: BrainDumpSourceResponse;
   tasks: TaskResponse[];
   shopping_items: ShoppingItemResponse[];
   calendar_events: CalendarEventResponse[];
+  degraded?: boolean;
 }